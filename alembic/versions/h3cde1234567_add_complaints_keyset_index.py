@@ -0,0 +1,23 @@
+"""add_complaints_keyset_index
+
+Revision ID: h3cde1234567
+Revises: g2bcd1234567
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'h3cde1234567'
+down_revision = 'g2bcd1234567'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_complaints_created_at_id', 'complaints', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_complaints_created_at_id', table_name='complaints')
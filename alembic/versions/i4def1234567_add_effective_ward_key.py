@@ -0,0 +1,38 @@
+"""add_effective_ward_key
+
+Revision ID: i4def1234567
+Revises: h3cde1234567
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'i4def1234567'
+down_revision = 'h3cde1234567'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('complaints', sa.Column('effective_ward_key', sa.String(), nullable=True))
+
+    # Backfill with the same normalisation the queries used to apply on every read
+    op.execute(
+        "UPDATE complaints SET effective_ward_key = "
+        "replace(coalesce(nullif(lower(incident_ward), ''), lower(ward)), ' ', '')"
+    )
+
+    op.create_index(
+        'ix_complaints_effective_ward_key',
+        'complaints',
+        ['effective_ward_key', 'created_at', 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_complaints_effective_ward_key', table_name='complaints')
+    op.drop_column('complaints', 'effective_ward_key')
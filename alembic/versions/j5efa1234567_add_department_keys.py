@@ -0,0 +1,53 @@
+"""add_department_keys
+
+Revision ID: j5efa1234567
+Revises: i4def1234567
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from services.ai import resolve_department_key
+
+
+# revision identifiers, used by Alembic.
+revision = 'j5efa1234567'
+down_revision = 'i4def1234567'
+branch_labels = None
+depends_on = None
+
+
+def _backfill(bind, table: str, source_sql: str):
+    # Resolution needs the alias table, so distinct labels are resolved in Python
+    # and written back with one UPDATE per label.
+    labels = bind.execute(sa.text(f"SELECT DISTINCT {source_sql} AS label FROM {table}")).scalars()
+    for label in list(labels):
+        bind.execute(
+            sa.text(f"UPDATE {table} SET department_key = :key WHERE {source_sql} = :label"),
+            {"key": resolve_department_key(label), "label": label},
+        )
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('department_key', sa.String(), nullable=True))
+    op.add_column('complaints', sa.Column('department_key', sa.String(), nullable=True))
+
+    bind = op.get_bind()
+    _backfill(bind, 'users', "department")
+    _backfill(bind, 'complaints', "coalesce(assigned_department, category, 'General')")
+
+    op.create_index(op.f('ix_users_department_key'), 'users', ['department_key'], unique=False)
+    op.create_index(
+        'ix_complaints_ward_department_status',
+        'complaints',
+        ['effective_ward_key', 'department_key', 'status'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_complaints_ward_department_status', table_name='complaints')
+    op.drop_index(op.f('ix_users_department_key'), table_name='users')
+    op.drop_column('complaints', 'department_key')
+    op.drop_column('users', 'department_key')
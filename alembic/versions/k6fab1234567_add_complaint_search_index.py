@@ -0,0 +1,57 @@
+"""add_complaint_search_index
+
+Revision ID: k6fab1234567
+Revises: j5efa1234567
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'k6fab1234567'
+down_revision = 'j5efa1234567'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.add_column('complaints', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+        op.execute(
+            "UPDATE complaints SET search_vector = "
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+        )
+        op.create_index(
+            'ix_complaints_search_vector',
+            'complaints',
+            ['search_vector'],
+            unique=False,
+            postgresql_using='gin',
+        )
+    else:
+        op.add_column('complaints', sa.Column('search_vector', sa.String(), nullable=True))
+        if dialect == 'sqlite':
+            op.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS complaints_fts "
+                "USING fts5(title, description, tokenize='porter unicode61')"
+            )
+            op.execute(
+                "INSERT INTO complaints_fts (rowid, title, description) "
+                "SELECT id, coalesce(title, ''), coalesce(description, '') FROM complaints"
+            )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.drop_index('ix_complaints_search_vector', table_name='complaints')
+    elif dialect == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS complaints_fts")
+    op.drop_column('complaints', 'search_vector')
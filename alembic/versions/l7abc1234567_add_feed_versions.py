@@ -0,0 +1,29 @@
+"""add_feed_versions
+
+Revision ID: l7abc1234567
+Revises: k6fab1234567
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'l7abc1234567'
+down_revision = 'k6fab1234567'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'feed_versions',
+        sa.Column('scope', sa.String(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('scope'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('feed_versions')
@@ -0,0 +1,75 @@
+"""atomic_upvotes
+
+Revision ID: m8bcd1234567
+Revises: l7abc1234567
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'm8bcd1234567'
+down_revision = 'l7abc1234567'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+# Reporter points credited per upvote when the duplicate votes were cast
+POINTS_PER_UPVOTE = 5
+
+# Every vote after the first one of a (complaint, user) pair
+_DUPLICATE_VOTES = (
+    "complaint_upvotes.id NOT IN ("
+    "SELECT MIN(id) FROM complaint_upvotes GROUP BY complaint_id, user_id)"
+)
+
+
+def upgrade() -> None:
+    # Earlier read-then-insert upvotes could race; keep the first vote of each pair and take
+    # back the counter increments and reporter points the duplicates earned
+    bind = op.get_bind()
+    recounted = [
+        complaint_id for (complaint_id,) in bind.execute(sa.text(
+            f"SELECT DISTINCT complaint_id FROM complaint_upvotes WHERE {_DUPLICATE_VOTES}"
+        ))
+    ]
+    overpaid = bind.execute(sa.text(
+        "SELECT complaints.citizen_id, COUNT(*) FROM complaint_upvotes "
+        "JOIN complaints ON complaints.id = complaint_upvotes.complaint_id "
+        f"WHERE complaints.citizen_id IS NOT NULL AND {_DUPLICATE_VOTES} "
+        "GROUP BY complaints.citizen_id"
+    )).all()
+    op.execute(f"DELETE FROM complaint_upvotes WHERE {_DUPLICATE_VOTES}")
+
+    for citizen_id, duplicates in overpaid:
+        bind.execute(
+            sa.text("UPDATE users SET points = points - :points WHERE id = :id"),
+            {"points": POINTS_PER_UPVOTE * duplicates, "id": citizen_id},
+        )
+    for start in range(0, len(recounted), BATCH_SIZE):
+        bind.execute(
+            sa.text(
+                "UPDATE complaints SET upvotes = ("
+                "SELECT COUNT(*) FROM complaint_upvotes "
+                "WHERE complaint_upvotes.complaint_id = complaints.id) "
+                "WHERE id IN :ids"
+            ).bindparams(sa.bindparam('ids', expanding=True)),
+            {"ids": recounted[start:start + BATCH_SIZE]},
+        )
+
+    op.create_index(
+        'uq_complaint_upvotes_complaint_user',
+        'complaint_upvotes',
+        ['complaint_id', 'user_id'],
+        unique=True,
+    )
+
+    # Left NULL: the upvote paths compute a missing baseline from the complaint text
+    op.add_column('complaints', sa.Column('ai_baseline_priority', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('complaints', 'ai_baseline_priority')
+    op.drop_index('uq_complaint_upvotes_complaint_user', table_name='complaint_upvotes')
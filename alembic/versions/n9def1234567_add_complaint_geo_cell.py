@@ -0,0 +1,44 @@
+"""add_complaint_geo_cell
+
+Revision ID: n9def1234567
+Revises: m8bcd1234567
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'n9def1234567'
+down_revision = 'm8bcd1234567'
+branch_labels = None
+depends_on = None
+
+# Mirrors services.geo.geo_cell: 100 cells per degree, 36000 longitude cells per row.
+# Both operands are shifted to be non-negative, so SQLite's truncating CAST equals FLOOR.
+_BACKFILL = {
+    'postgresql': (
+        "UPDATE complaints SET geo_cell = "
+        "CAST(FLOOR((latitude + 90) * 100) AS INTEGER) * 36000 + "
+        "LEAST(CAST(FLOOR((longitude + 180) * 100) AS INTEGER), 35999) "
+        "WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+    ),
+    'sqlite': (
+        "UPDATE complaints SET geo_cell = "
+        "CAST((latitude + 90) * 100 AS INTEGER) * 36000 + "
+        "MIN(CAST((longitude + 180) * 100 AS INTEGER), 35999) "
+        "WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+    ),
+}
+
+
+def upgrade() -> None:
+    op.add_column('complaints', sa.Column('geo_cell', sa.Integer(), nullable=True))
+    op.execute(_BACKFILL[op.get_bind().dialect.name])
+    op.create_index('ix_complaints_geo_cell', 'complaints', ['geo_cell'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_complaints_geo_cell', table_name='complaints')
+    op.drop_column('complaints', 'geo_cell')
@@ -0,0 +1,61 @@
+"""add_complaint_map_cells
+
+Revision ID: o0efa1234567
+Revises: n9def1234567
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'o0efa1234567'
+down_revision = 'n9def1234567'
+branch_labels = None
+depends_on = None
+
+# Mirrors services.map_clusters.LEVEL_CELLS_PER_DEGREE
+_LEVEL_CELLS_PER_DEGREE = (1, 10, 100, 1000)
+# Shifted coordinates are non-negative, so SQLite's truncating CAST equals FLOOR
+_INDEX = {
+    'postgresql': "CAST(FLOOR(({column} + {shift}) * {cells}) AS INTEGER)",
+    'sqlite': "CAST(({column} + {shift}) * {cells} AS INTEGER)",
+}
+_BACKFILL = (
+    "INSERT INTO complaint_map_cells (level, ilat, ilng, priority, count, sum_lat, sum_lng) "
+    "SELECT {level}, ilat, ilng, priority, COUNT(*), SUM(latitude), SUM(longitude) "
+    "FROM (SELECT {ilat} AS ilat, {ilng} AS ilng, COALESCE(priority, 0) AS priority, "
+    "latitude, longitude FROM complaints "
+    "WHERE latitude IS NOT NULL AND longitude IS NOT NULL "
+    "AND (is_merged IS NULL OR is_merged = {false}) "
+    "AND (status IS NULL OR status NOT IN ('Resolved', 'Closed'))) AS open_complaints "
+    "GROUP BY ilat, ilng, priority"
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'complaint_map_cells',
+        sa.Column('level', sa.Integer(), nullable=False),
+        sa.Column('ilat', sa.Integer(), nullable=False),
+        sa.Column('ilng', sa.Integer(), nullable=False),
+        sa.Column('priority', sa.Integer(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('sum_lat', sa.Float(), nullable=False),
+        sa.Column('sum_lng', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('level', 'ilat', 'ilng', 'priority'),
+    )
+    dialect = op.get_bind().dialect.name
+    index = _INDEX[dialect]
+    for level, cells in enumerate(_LEVEL_CELLS_PER_DEGREE):
+        op.execute(_BACKFILL.format(
+            level=level,
+            ilat=index.format(column='latitude', shift=90, cells=cells),
+            ilng=index.format(column='longitude', shift=180, cells=cells),
+            false='false' if dialect == 'postgresql' else '0',
+        ))
+
+
+def downgrade() -> None:
+    op.drop_table('complaint_map_cells')
@@ -0,0 +1,28 @@
+"""add_complaint_activities_timeline_index
+
+Revision ID: p1fab1234567
+Revises: o0efa1234567
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'p1fab1234567'
+down_revision = 'o0efa1234567'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_complaint_activities_complaint_created_id',
+        'complaint_activities',
+        ['complaint_id', 'created_at', 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_complaint_activities_complaint_created_id', table_name='complaint_activities')
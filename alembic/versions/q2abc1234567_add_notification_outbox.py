@@ -0,0 +1,46 @@
+"""add_notification_outbox
+
+Revision ID: q2abc1234567
+Revises: p1fab1234567
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'q2abc1234567'
+down_revision = 'p1fab1234567'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'notification_outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('recipient', sa.String(), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('last_error', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_notification_outbox_id'), 'notification_outbox', ['id'], unique=False)
+    op.create_index(
+        'ix_notification_outbox_status_next_attempt',
+        'notification_outbox',
+        ['status', 'next_attempt_at'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notification_outbox_status_next_attempt', table_name='notification_outbox')
+    op.drop_index(op.f('ix_notification_outbox_id'), table_name='notification_outbox')
+    op.drop_table('notification_outbox')
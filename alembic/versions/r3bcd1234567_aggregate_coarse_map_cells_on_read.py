@@ -0,0 +1,36 @@
+"""aggregate_coarse_map_cells_on_read
+
+Revision ID: r3bcd1234567
+Revises: q2abc1234567
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'r3bcd1234567'
+down_revision = 'q2abc1234567'
+branch_labels = None
+depends_on = None
+
+
+# Levels 0 and 1 are now grouped from level 2 (100 cells per degree) when read
+_COARSE_FACTORS = {0: 100, 1: 10}
+_REBUILD = (
+    "INSERT INTO complaint_map_cells (level, ilat, ilng, priority, count, sum_lat, sum_lng) "
+    "SELECT {level}, ilat / {factor}, ilng / {factor}, priority, "
+    "SUM(count), SUM(sum_lat), SUM(sum_lng) "
+    "FROM complaint_map_cells WHERE level = 2 AND count > 0 "
+    "GROUP BY ilat / {factor}, ilng / {factor}, priority"
+)
+
+
+def upgrade() -> None:
+    op.execute(sa.text("DELETE FROM complaint_map_cells WHERE level < 2"))
+
+
+def downgrade() -> None:
+    for level, factor in _COARSE_FACTORS.items():
+        op.execute(_REBUILD.format(level=level, factor=factor))
@@ -0,0 +1,66 @@
+"""
+Rendering cost of status-change email fan-outs.
+
+Renders `count` notifications (distinct titles and recipient names, as in a bulk status
+change) through notifications.render_email, which substitutes into templates compiled once
+at import, and the console preview lines send_email prints. Also times the layout alone via
+str.format, which re-parses the ~2 KB document on every call, for comparison.
+
+Run from the repository root:
+    python benchmarks/bench_email_render.py [count] [repeats]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import notifications  # noqa: E402
+from services.notifications import _EMAIL_LAYOUT, _preview_line, render_email  # noqa: E402
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+    events = list(notifications.STATUS_EMAIL_BODIES)
+    jobs = [
+        (f"Ticket Update #{i}", events[i % len(events)], f"Overflowing drain near school #{i}", f"Citizen {i}")
+        for i in range(count)
+    ]
+    layout_source = "".join(
+        literal + ("{" + field + "}" if field is not None else "")
+        for literal, field in _EMAIL_LAYOUT._parts
+    )
+    body_html = render_email("Ticket Update", "", "resolved", "Overflowing drain", "Citizen")[0]
+
+    def compiled():
+        for subject, event, title, name in jobs:
+            render_email(subject, "", event, title, name)
+
+    def compiled_with_preview():
+        for subject, event, title, name in jobs:
+            _, lines = render_email(subject, "", event, title, name)
+            for line in lines:
+                _preview_line(line)
+
+    def layout_format():
+        for subject, _, _, name in jobs:
+            layout_source.format(subject=subject, citizen_name=name, body_html=body_html)
+
+    def layout_compiled():
+        for subject, _, _, name in jobs:
+            _EMAIL_LAYOUT.render(subject=subject, citizen_name=name, body_html=body_html)
+
+    print(f"{count} notifications, best of {repeats}\n")
+    for label, run in (
+        ("render_email", compiled),
+        ("render_email + preview lines", compiled_with_preview),
+        ("layout only, str.format", layout_format),
+        ("layout only, compiled", layout_compiled),
+    ):
+        best = min(timeit.repeat(run, number=1, repeat=repeats))
+        print(f"{label:<30} {best * 1000:8.2f} ms total  {best / count * 1e6:6.2f} µs/email")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Connection reuse of the Brevo sender under a burst of OTP emails.
+
+Posts `count` OTP payloads to a local keep-alive mock of the Brevo API and reports the wall
+time and the number of TCP connections the server accepted for:
+  * a module-level requests.post() per email (the previous sender),
+  * the pooled Session from services.http_client, sequentially and from a thread pool
+    (as the notification outbox workers use it).
+Every accepted connection is one TCP handshake, and against api.brevo.com also a TLS
+handshake, so the connection count is the saving to look at; the local timings only show
+the TCP part.
+
+Run from the repository root:
+    python benchmarks/bench_http_client.py [count] [threads]
+"""
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests  # noqa: E402
+
+from services import http_client  # noqa: E402
+
+PAYLOAD = json.dumps({
+    "sender": {"name": "JanSetu Support", "email": "no-reply@jansetu.gov.in"},
+    "to": [{"email": "citizen@example.com"}],
+    "subject": "Your JanSetu Verification Code",
+    "htmlContent": "<p>Your code is <b>123456</b></p>" * 20,
+})
+HEADERS = {"content-type": "application/json", "api-key": "bench"}
+
+
+class MockBrevo(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, Nagle plus delayed ACKs
+    # add ~40 ms to every request on a reused connection
+    disable_nagle_algorithm = True
+    connections = 0
+
+    def setup(self):
+        MockBrevo.connections += 1
+        super().setup()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(201)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+class MockServer(ThreadingHTTPServer):
+    # The unpooled case opens connections in bursts
+    request_queue_size = 128
+
+
+def measure(label, run):
+    MockBrevo.connections = 0
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed * 1000:9.1f} ms   {MockBrevo.connections:5d} connections")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    server = MockServer(("127.0.0.1", 0), MockBrevo)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/v3/smtp/email"
+    print(f"{count} OTP emails, {threads} threads for the pooled/threaded case\n")
+
+    def unpooled():
+        for _ in range(count):
+            requests.post(url, headers=HEADERS, data=PAYLOAD, timeout=15)
+
+    def pooled():
+        for _ in range(count):
+            http_client.post(url, headers=HEADERS, data=PAYLOAD)
+
+    def pooled_threads():
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(lambda _: http_client.post(url, headers=HEADERS, data=PAYLOAD), range(count)))
+
+    measure("requests.post per email", unpooled)
+    measure("pooled Session", pooled)
+    measure(f"pooled Session, {threads} threads", pooled_threads)
+
+    http_client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
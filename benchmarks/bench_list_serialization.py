@@ -0,0 +1,95 @@
+"""
+Per-row serialization cost of the complaint list endpoints.
+
+Compares FastAPI's default response path (from_attributes validation of ORM objects,
+jsonable_encoder, json.dumps) with the projected-row path used by the list endpoints
+(one validation through the cached ComplaintListAdapter, then dump_json to bytes).
+
+Run from the repository root:
+    python benchmarks/bench_list_serialization.py [rows] [repeats]
+"""
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from schemas import ComplaintListAdapter, ComplaintOut  # noqa: E402
+
+
+def make_rows(count):
+    now = datetime(2026, 10, 19, 9, 30, tzinfo=timezone.utc)
+    rows = []
+    for i in range(count):
+        rows.append({
+            "id": i + 1,
+            "title": f"Streetlight not working #{i}",
+            "description": "The streetlight near the bus stop has been off for a week. " * 8,
+            "ward": "560001",
+            "incident_ward": "560001",
+            "category": "Electricity",
+            "priority": 2,
+            "priority_label": "Medium",
+            "reports_count": 1,
+            "upvotes": i % 17,
+            "impact_score": 42.5,
+            "status": "In Progress",
+            "photo_url": None,
+            "latitude": 12.9716,
+            "longitude": 77.5946,
+            "citizen_id": 7,
+            "merged_into_id": None,
+            "is_merged": False,
+            "assigned_to": "Officer A",
+            "assigned_department": "Electricity Board",
+            "assigned_at": now,
+            "ai_confidence_score": 0.91,
+            "ai_similarity_score": None,
+            "is_sla_breached": False,
+            "escalation_level": 0,
+            "created_at": now - timedelta(minutes=i),
+            "updated_at": now,
+            "expected_resolution_date": now + timedelta(days=3),
+            "resolved_at": None,
+        })
+    return rows
+
+
+def default_path(objects):
+    models = [ComplaintOut.model_validate(obj) for obj in objects]
+    return JSONResponse(content=jsonable_encoder(models)).body
+
+
+def fast_path(rows):
+    return ComplaintListAdapter.dump_json(ComplaintListAdapter.validate_python(rows))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    rows = make_rows(count)
+    objects = [SimpleNamespace(**row) for row in rows]
+    assert default_path(objects) == fast_path(rows), "serializers disagree"
+
+    results = {
+        "default (from_attributes + jsonable_encoder)": min(
+            timeit.repeat(lambda: default_path(objects), number=repeats, repeat=3)
+        ),
+        "fast (TypeAdapter.dump_json)": min(
+            timeit.repeat(lambda: fast_path(rows), number=repeats, repeat=3)
+        ),
+    }
+    print(f"{count} rows x {repeats} iterations")
+    for name, total in results.items():
+        per_row_us = total / (repeats * count) * 1e6
+        print(f"  {name:<46} {per_row_us:8.2f} us/row")
+
+
+if __name__ == "__main__":
+    main()
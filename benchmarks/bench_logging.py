@@ -0,0 +1,77 @@
+"""
+Request-thread cost of notification previews on a slow log pipe.
+
+Emits `count` simulated status emails and times the calling thread when the preview is:
+  * printed line by line to the stream (the previous send_email),
+  * logged through logging_config's queue (the listener thread does the writing),
+  * turned off with a per-module level (LOG_LEVELS=JanSetu.preview=WARNING).
+The stream sleeps `delay_us` per write to stand in for a terminal or container log pipe
+that is not keeping up.
+
+Run from the repository root:
+    python benchmarks/bench_logging.py [count] [delay_us]
+"""
+import io
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logging_config import PREVIEW_LOGGER, configure_logging, shutdown_logging  # noqa: E402
+from services import notifications  # noqa: E402
+from services.notifications import _preview_line, render_email  # noqa: E402
+
+
+class SlowStream(io.StringIO):
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+
+    def write(self, text):
+        time.sleep(self.delay)
+        return super().write(text)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    delay = (int(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1e6
+    notifications.BREVO_API_KEY = ""
+    jobs = [(f"citizen{i}@example.com", f"Ticket Update #{i}", f"Overflowing drain #{i}") for i in range(count)]
+
+    def printed(stream):
+        for email, subject, title in jobs:
+            _, lines = render_email(subject, "", "resolved", title, "Citizen")
+            print("\n" + "═" * 70, file=stream)
+            print("📧  JanSetu EMAIL DISPATCHED", file=stream)
+            print(f"  To      : {email}", file=stream)
+            print(f"  Subject : {subject}", file=stream)
+            for line in lines:
+                print(f"  | {_preview_line(line)}", file=stream)
+            print("═" * 70 + "\n", file=stream)
+
+    def logged(_):
+        for email, subject, title in jobs:
+            notifications.send_email(email, subject, "", "resolved", title)
+
+    print(f"{count} simulated emails, {delay * 1e6:.0f} µs per stream write\n")
+    for label, run, levels in (
+        ("print() banners", printed, ""),
+        ("queue logging", logged, ""),
+        ("queue logging, previews off", logged, f"{PREVIEW_LOGGER}=WARNING"),
+    ):
+        stream = SlowStream(delay)
+        configure_logging(level="INFO", fmt="text", levels=levels, stream=stream)
+        logging.getLogger(PREVIEW_LOGGER).setLevel(levels.partition("=")[2] or "NOTSET")
+        start = time.perf_counter()
+        run(stream)
+        elapsed = time.perf_counter() - start
+        shutdown_logging()
+        total = time.perf_counter() - start
+        print(f"{label:<30} {elapsed * 1000:8.1f} ms in caller  {elapsed / count * 1e6:7.1f} µs/email"
+              f"  ({total * 1000:.0f} ms until flushed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,13 @@ Database configuration and connection management.
 Sets up the SQLAlchemy engine, session maker, and standard dependency
 for yielding database sessions to HTTP routes.
 """
+import contextvars
 import os
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -26,3 +29,32 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def dialect_insert(bind, table):
+    """
+    INSERT construct for `bind`'s dialect, exposing on_conflict_do_nothing/do_update.
+    Both supported backends (Postgres in production, SQLite locally) implement ON CONFLICT.
+    """
+    if bind.dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
+# Per-request SQL statement counter, reported by the debug query-count middleware in main.py.
+# Holds a mutable list so increments made in threadpool workers are visible to the request.
+_query_counter: contextvars.ContextVar = contextvars.ContextVar("query_counter", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = _query_counter.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def start_query_count() -> list:
+    """Starts counting statements for the current request context; returns the live counter."""
+    counter = [0]
+    _query_counter.set(counter)
+    return counter
@@ -0,0 +1,132 @@
+"""
+Application logging.
+Handlers that write to stdout/stderr block the calling thread on the terminal or container
+log pipe. configure_logging() installs a single QueueHandler on the root logger instead:
+request threads only format the message and put the record on an in-memory queue, and a
+QueueListener thread does the actual writing.
+
+Tuning (environment):
+    LOG_LEVEL   root level                                          (default INFO)
+    LOG_FORMAT  "text" or "json" (one JSON object per line)         (default text)
+    LOG_LEVELS  per-logger levels, e.g.
+                "JanSetu.preview=WARNING,sqlalchemy.engine=INFO"    (default none)
+
+Dev-mode previews of simulated emails and SMS go to the "JanSetu.preview" logger, so
+LOG_LEVELS=JanSetu.preview=WARNING turns them off.
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+PREVIEW_LOGGER = "JanSetu.preview"
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including any `extra=` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = record.stack_info
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _RecordQueueHandler(QueueHandler):
+    """
+    Resolves the message (and traceback) in the logging thread, since args and exc_info may
+    not survive the hand-off, but leaves layout to the listener's formatter so JSON output
+    keeps the message and traceback as separate fields.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+def parse_levels(spec: str) -> dict:
+    """"a=WARNING, b.c=debug" -> {"a": "WARNING", "b.c": "DEBUG"}; malformed entries are skipped."""
+    levels = {}
+    for item in spec.split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(
+    level: Optional[str] = None,
+    fmt: Optional[str] = None,
+    levels: Optional[str] = None,
+    stream=None,
+):
+    """
+    Routes the root logger through a queue to a listener thread writing to `stream`
+    (stderr by default). Arguments default to the environment; calling it again replaces
+    the previous configuration.
+    """
+    global _listener
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    fmt = (fmt or os.getenv("LOG_FORMAT", "text")).lower()
+    levels = os.getenv("LOG_LEVELS", "") if levels is None else levels
+
+    shutdown_logging()
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, _RecordQueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(_RecordQueueHandler(log_queue))
+    root.setLevel(level)
+    for name, logger_level in parse_levels(levels).items():
+        logging.getLogger(name).setLevel(logger_level)
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Stops the listener after it has written every queued record."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
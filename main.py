@@ -8,8 +8,12 @@ from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from sqlalchemy.exc import SQLAlchemyError
 
+from database import start_query_count
+from logging_config import configure_logging
 from rate_limiter import limiter
+from security import password_hashing_stats
 from routes import admin, auth, complaints, dashboard, transparency
+from services import outbox, upvote_buffer
 
 app = FastAPI(title="JanSetu PS-CRM")
 app.state.limiter = limiter
@@ -29,10 +33,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Query-Count", "ETag"],
 )
 
+# Debug aid: report how many SQL statements each request issued (catches N+1 regressions)
+if os.getenv("DEBUG_QUERY_COUNT") == "1":
+
+    @app.middleware("http")
+    async def query_count_header(request: Request, call_next):
+        counter = start_query_count()
+        response = await call_next(request)
+        response.headers["X-Query-Count"] = str(counter[0])
+        return response
+
+
 logger = logging.getLogger("JanSetu")
-logging.basicConfig(level=logging.INFO)
+# Queue-backed, so request threads never block on the log stream (LOG_LEVEL, LOG_FORMAT, LOG_LEVELS)
+configure_logging()
 
 
 @app.get("/api/health", tags=["System"])
@@ -40,8 +57,9 @@ def health_check():
     """
     Basic health check endpoint to verify backend uptime and versioning.
     Used by Render to confirm successful deployment.
+    Also reports the password hashing pool's queue depth and rejections.
     """
-    return {"status": "ok", "version": "1.0.0"}
+    return {"status": "ok", "version": "1.0.0", "password_hashing": password_hashing_stats()}
 
 
 @app.on_event("startup")
@@ -87,6 +105,18 @@ def on_startup():
     finally:
         db.close()
 
+    # Write-behind upvote counters (UPVOTE_FLUSH_INTERVAL=0 keeps upvotes write-through)
+    upvote_buffer.start(SessionLocal)
+    # Notification delivery workers (OUTBOX_WORKERS=0 drains the outbox per request instead)
+    outbox.start(SessionLocal)
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    """Applies any buffered upvote deltas and lets in-flight notifications finish before exit."""
+    upvote_buffer.stop()
+    outbox.stop()
+
 
 @app.exception_handler(SQLAlchemyError)
 async def sqlalchemy_exception_handler(_: Request, exc: SQLAlchemyError):
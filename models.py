@@ -2,12 +2,34 @@
 SQLAlchemy ORM Models.
 Defines the structure of the database tables, relationships, and SLA tracking features.
 """
-from sqlalchemy import (Boolean, Column, DateTime, Float, ForeignKey, Integer,
-                        String)
-from sqlalchemy.orm import relationship
+import os
+from typing import Optional
+
+from sqlalchemy import (JSON, Boolean, Column, DateTime, Float, ForeignKey, Index,
+                        Integer, String, event)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import column_property, deferred, relationship
 from sqlalchemy.sql import func
 
 from database import Base
+from services.ai import resolve_department_key
+from services.geo import geo_cell
+
+# Strict loading (enabled in tests): any relationship that was not eagerly loaded by an explicit
+# selectinload()/joinedload() raises instead of silently issuing an N+1 query.
+STRICT_LOADING = os.getenv("SQLALCHEMY_STRICT_LOADING") == "1"
+DEFAULT_LAZY = "raise" if STRICT_LOADING else "select"
+
+
+def ward_key(ward: Optional[str], incident_ward: Optional[str] = None) -> Optional[str]:
+    """
+    Canonical ward used for every ward comparison: the incident ward when known,
+    otherwise the reporter's ward, lower-cased with spaces removed.
+    """
+    raw = incident_ward or ward
+    if raw is None:
+        return None
+    return raw.lower().replace(" ", "")
 
 
 class User(Base):
@@ -24,6 +46,8 @@ class User(Base):
     role = Column(String, nullable=False, default="citizen", index=True)
     ward = Column(String, nullable=True, index=True)
     department = Column(String, nullable=True, index=True)
+    # Canonical key of `department`, see services.ai.resolve_department_key
+    department_key = Column(String, nullable=True, index=True)
     phone = Column(String, nullable=True, index=True)
     points = Column(Integer, default=0)
     is_active = Column(Boolean, default=True)
@@ -31,9 +55,14 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     complaints = relationship(
-        "Complaint", back_populates="citizen", foreign_keys="Complaint.citizen_id"
+        "Complaint",
+        back_populates="citizen",
+        foreign_keys="Complaint.citizen_id",
+        lazy=DEFAULT_LAZY,
+    )
+    activities = relationship(
+        "ComplaintActivity", back_populates="actor_user", lazy=DEFAULT_LAZY
     )
-    activities = relationship("ComplaintActivity", back_populates="actor_user")
 
 
 class Complaint(Base):
@@ -48,28 +77,37 @@ class Complaint(Base):
     description = Column(String)
     ward = Column(String, index=True)
     incident_ward = Column(String, index=True, nullable=True)
+    # Precomputed ward_key(ward, incident_ward); maintained on write so filters can use an index
+    effective_ward_key = Column(String, nullable=True)
     citizen_id = Column(
         Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True
     )
     merged_into_id = Column(
         Integer, ForeignKey("complaints.id"), nullable=True, index=True
     )
-    is_merged = Column(Boolean, default=False, index=True)
+    # active_history: services.map_clusters needs the replaced value even after expiry
+    is_merged = column_property(Column(Boolean, default=False, index=True), active_history=True)
     category = Column(String, default="General", index=True)
     photo_url = Column(String, nullable=True)
-    latitude = Column(Float, nullable=True)
-    longitude = Column(Float, nullable=True)
-    priority = Column(Integer, default=0)
+    latitude = column_property(Column(Float, nullable=True), active_history=True)
+    longitude = column_property(Column(Float, nullable=True), active_history=True)
+    # 0.01° grid cell of (latitude, longitude), derived on write; see services.geo
+    geo_cell = Column(Integer, nullable=True)
+    priority = column_property(Column(Integer, default=0), active_history=True)
     priority_label = Column(String, default="Low", index=True)
     reports_count = Column(Integer, default=1)
     upvotes = Column(Integer, default=0)
     impact_score = Column(Float, default=0)
-    status = Column(String, default="Submitted")
+    status = column_property(Column(String, default="Submitted"), active_history=True)
     assigned_to = Column(String, nullable=True, index=True)
     assigned_department = Column(String, nullable=True, index=True)
+    # Canonical key of assigned_department (falling back to category), resolved on write
+    department_key = Column(String, nullable=True)
     assigned_at = Column(DateTime(timezone=True), nullable=True)
 
     # AI Metadata
+    # Keyword-derived priority from the text alone; upvote escalation builds on it
+    ai_baseline_priority = Column(Integer, nullable=True)
     ai_confidence_score = Column(Float, nullable=True)
     ai_similarity_score = Column(Float, nullable=True)
 
@@ -84,16 +122,62 @@ class Complaint(Base):
     expected_resolution_date = Column(DateTime(timezone=True), nullable=True)
     resolved_at = Column(DateTime(timezone=True), nullable=True)
 
+    # Full-text search document (Postgres only; SQLite uses the complaints_fts table)
+    search_vector = deferred(
+        Column(String().with_variant(TSVECTOR(), "postgresql"), nullable=True)
+    )
+
     citizen = relationship(
-        "User", back_populates="complaints", foreign_keys=[citizen_id]
+        "User", back_populates="complaints", foreign_keys=[citizen_id], lazy=DEFAULT_LAZY
     )
     activities = relationship(
-        "ComplaintActivity", back_populates="complaint", cascade="all, delete-orphan"
+        "ComplaintActivity",
+        back_populates="complaint",
+        cascade="all, delete-orphan",
+        lazy=DEFAULT_LAZY,
     )
     updates = relationship(
-        "ComplaintUpdate", back_populates="complaint", cascade="all, delete-orphan"
+        "ComplaintUpdate",
+        back_populates="complaint",
+        cascade="all, delete-orphan",
+        lazy=DEFAULT_LAZY,
     )
-    merged_into = relationship("Complaint", remote_side=[id])
+    merged_into = relationship("Complaint", remote_side=[id], lazy=DEFAULT_LAZY)
+
+    __table_args__ = (
+        # Keyset pagination: newest-first listings seek on (created_at, id)
+        Index("ix_complaints_created_at_id", "created_at", "id"),
+        # Ward feeds: equality on the ward key, already ordered for keyset pagination
+        Index("ix_complaints_effective_ward_key", "effective_ward_key", "created_at", "id"),
+        # Nearby search: indexed range scans over grid cells
+        Index("ix_complaints_geo_cell", "geo_cell"),
+        # Officer scoping: ward + department (+ status) equality
+        Index(
+            "ix_complaints_ward_department_status",
+            "effective_ward_key",
+            "department_key",
+            "status",
+        ),
+        Index(
+            "ix_complaints_search_vector", "search_vector", postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+@event.listens_for(Complaint, "before_insert")
+@event.listens_for(Complaint, "before_update")
+def _sync_complaint_keys(mapper, connection, target):
+    target.effective_ward_key = ward_key(target.ward, target.incident_ward)
+    target.department_key = resolve_department_key(
+        target.assigned_department or target.category or "General"
+    )
+    target.geo_cell = geo_cell(target.latitude, target.longitude)
+
+
+@event.listens_for(User, "before_insert")
+@event.listens_for(User, "before_update")
+def _sync_user_department_key(mapper, connection, target):
+    target.department_key = resolve_department_key(target.department)
 
 
 class ComplaintActivity(Base):
@@ -113,8 +197,13 @@ class ComplaintActivity(Base):
     )
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    complaint = relationship("Complaint", back_populates="activities")
-    actor_user = relationship("User", back_populates="activities")
+    complaint = relationship("Complaint", back_populates="activities", lazy=DEFAULT_LAZY)
+    actor_user = relationship("User", back_populates="activities", lazy=DEFAULT_LAZY)
+
+    __table_args__ = (
+        # Timeline pages and the latest-N detail embed seek on (created_at, id) per complaint
+        Index("ix_complaint_activities_complaint_created_id", "complaint_id", "created_at", "id"),
+    )
 
 
 class ComplaintUpdate(Base):
@@ -132,11 +221,15 @@ class ComplaintUpdate(Base):
     )
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    complaint = relationship("Complaint", back_populates="updates")
+    complaint = relationship("Complaint", back_populates="updates", lazy=DEFAULT_LAZY)
 
 
 class ComplaintUpvote(Base):
     __tablename__ = "complaint_upvotes"
+    __table_args__ = (
+        # One vote per citizen per complaint; upvotes insert with ON CONFLICT DO NOTHING
+        Index("uq_complaint_upvotes_complaint_user", "complaint_id", "user_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     complaint_id = Column(
@@ -148,6 +241,35 @@ class ComplaintUpvote(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
+class FeedVersion(Base):
+    """
+    Monotonic change counter per cache scope ("complaint:<id>", "ward:<key>", "citizen:<id>",
+    "global"). ETags are derived from these, so a conditional GET is one indexed lookup.
+    Maintained by services.versions.
+    """
+    __tablename__ = "feed_versions"
+
+    scope = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+class ComplaintMapCell(Base):
+    """
+    Open complaints aggregated per map grid cell, level and priority (see services.map_clusters).
+    Coordinate sums give the cluster centroid; one row per priority lets the worst priority
+    be recomputed when a complaint leaves the cell.
+    """
+    __tablename__ = "complaint_map_cells"
+
+    level = Column(Integer, primary_key=True)
+    ilat = Column(Integer, primary_key=True)
+    ilng = Column(Integer, primary_key=True)
+    priority = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    sum_lat = Column(Float, nullable=False, default=0)
+    sum_lng = Column(Float, nullable=False, default=0)
+
+
 class EmailOTP(Base):
     __tablename__ = "email_otps"
 
@@ -158,3 +280,27 @@ class EmailOTP(Base):
     is_used = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+
+class NotificationOutbox(Base):
+    """
+    Outgoing notifications, written in the same transaction as the change that triggers them
+    and delivered after commit by the worker pool in services.outbox.
+    """
+    __tablename__ = "notification_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)
+    recipient = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    # pending -> sent, or dead once every retry has failed
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Workers claim due rows: status equality, then oldest due first
+        Index("ix_notification_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
@@ -0,0 +1,60 @@
+"""
+Keyset (cursor) pagination helpers.
+A cursor is an opaque token encoding the (created_at, id) of the last row served, so the
+next page is fetched with an indexed range predicate instead of an ever-growing OFFSET.
+"""
+import base64
+import binascii
+import json
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import String, and_, literal, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at, row_id: int) -> str:
+    raw = json.dumps({"c": created_at.isoformat(sep=" "), "i": row_id})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return str(data["c"]), int(data["i"])
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor"
+        )
+
+
+def apply_keyset(query, created_col, id_col, cursor: Optional[str]):
+    """
+    Orders `query` newest-first on (created_at, id) and, when a cursor is given,
+    seeks past the last row of the previous page.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        # Bound as text: SQLite stores CURRENT_TIMESTAMP without fractional seconds, so
+        # comparing against the isoformat of the value read back keeps equality exact.
+        # Postgres coerces the untyped literal to timestamptz.
+        boundary = literal(created_at, String)
+        query = query.filter(
+            or_(
+                created_col < boundary,
+                and_(created_col == boundary, id_col < row_id),
+            )
+        )
+    return query.order_by(created_col.desc(), id_col.desc())
+
+
+def next_cursor(rows, limit: int) -> Optional[str]:
+    """Returns the cursor for the page after `rows`, or None on the last page."""
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    if last.created_at is None:
+        return None
+    return encode_cursor(last.created_at, last.id)
@@ -1,15 +1,25 @@
+import logging
+import os
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from sqlalchemy import func, insert, literal, select, update
+from sqlalchemy.orm import Session, joinedload
 
-from database import get_db
+from database import SessionLocal, get_db
 from dependencies import require_role
-from models import Complaint, User
+from models import Complaint, ComplaintActivity, User
 from routes.complaints import add_activity
 from schemas import APIMessage
+from logging_config import PREVIEW_LOGGER
+from services import jobs, user_cache, versions
 
 router = APIRouter(prefix="/api/admin", tags=["Admin"])
+preview_logger = logging.getLogger(PREVIEW_LOGGER)
+
+REASSIGNABLE_STATUSES = ["Submitted", "Pending", "Assigned", "In Progress"]
+# Above this many complaints, officer approval hands the reassignment to a background job
+REASSIGN_ASYNC_THRESHOLD = int(os.getenv("REASSIGN_ASYNC_THRESHOLD", "2000"))
 
 
 @router.post("/scan-slas", response_model=APIMessage)
@@ -70,11 +80,10 @@ def get_admin_performance_metrics(
     """
     import statistics
 
-    from models import ComplaintActivity
-
     # Get all "Resolved" actions
     resolution_activities = (
         db.query(ComplaintActivity)
+        .options(joinedload(ComplaintActivity.complaint))
         .filter(
             ComplaintActivity.action == "Status Updated",
             ComplaintActivity.new_value == "Resolved",
@@ -179,13 +188,78 @@ def get_pending_officers(
     officers = db.query(User).filter(User.role == "officer", User.is_active.is_(False)).all()
     return officers
 
+def _reassignment_criteria(officer: User):
+    return (
+        Complaint.ward == officer.ward,
+        Complaint.assigned_department == officer.department,
+        Complaint.status.in_(REASSIGNABLE_STATUSES),
+    )
+
+
+def reassign_officer_complaints(db: Session, officer: User) -> int:
+    """
+    Hands every active complaint in the officer's ward and department over to them.
+    Runs as two set-based statements instead of a per-row loop: the timeline entries are
+    written with INSERT ... SELECT (capturing the previous assignee), then a single UPDATE
+    moves the assignment. Returns the number of complaints reassigned.
+    """
+    criteria = _reassignment_criteria(officer)
+
+    details = (
+        literal("Automatically transitioned from ")
+        + func.coalesce(Complaint.assigned_to, "Unassigned")
+        + literal(f" to new officer {officer.full_name}")
+    )
+    activity_rows = select(
+        Complaint.id,
+        literal("System Reassignment"),
+        details,
+        literal("System"),
+    ).where(*criteria)
+    db.execute(
+        insert(ComplaintActivity).from_select(
+            ["complaint_id", "action", "details", "actor"], activity_rows
+        )
+    )
+
+    result = db.execute(
+        update(Complaint)
+        .where(*criteria)
+        .values(assigned_to=officer.full_name)
+        .execution_options(synchronize_session=False)
+    )
+    # Bypasses the ORM flush, so cached views are invalidated explicitly
+    versions.bump_global(db)
+    return result.rowcount
+
+
+def run_reassignment_job(officer_id: int) -> dict:
+    """Background Task: performs a large officer reassignment in its own session."""
+    db = SessionLocal()
+    try:
+        officer = db.query(User).filter(User.id == officer_id).first()
+        if not officer:
+            return {"reassigned": 0}
+        reassigned = reassign_officer_complaints(db, officer)
+        db.commit()
+        return {"reassigned": reassigned}
+    finally:
+        db.close()
+
+
 @router.post("/approve-officer/{user_id}")
 def approve_officer(
     user_id: int,
+    background_tasks: BackgroundTasks,
+    async_mode: bool = Query(default=False, description="Reassign complaints in a background job"),
     db: Session = Depends(get_db),
     admin_user: User = Depends(get_super_admin)
 ):
-    """Approve a pending officer, granting them login access."""
+    """
+    Approve a pending officer, granting them login access.
+    Active complaints in the officer's ward and department are reassigned to them. Very large
+    reassignments (or `async_mode=true`) run as a background job whose id is returned for polling.
+    """
     officer = db.query(User).filter(User.id == user_id, User.role == "officer").first()
     
     if not officer:
@@ -195,38 +269,54 @@ def approve_officer(
         raise HTTPException(status_code=400, detail="Officer is already approved")
         
     officer.is_active = True
-    
-    # Auto-reassign active complaints in this area to the new officer
-    complaints_to_reassign = db.query(Complaint).filter(
-        Complaint.ward == officer.ward,
-        Complaint.assigned_department == officer.department,
-        Complaint.status.in_(["Submitted", "Pending", "Assigned", "In Progress"])
-    ).all()
+    user_cache.invalidate_after_commit(db, officer.id)
 
-    for comp in complaints_to_reassign:
-        old_assignee = comp.assigned_to
-        comp.assigned_to = officer.full_name
-        add_activity(
-            db,
-            complaint_id=comp.id,
-            action="System Reassignment",
-            details=f"Automatically transitioned from {old_assignee or 'Unassigned'} to new officer {officer.full_name}",
-            actor="System",
-            actor_id=None
+    if not async_mode:
+        pending = (
+            db.query(func.count(Complaint.id))
+            .filter(*_reassignment_criteria(officer))
+            .scalar()
         )
+        async_mode = pending > REASSIGN_ASYNC_THRESHOLD
+
+    job_id = None
+    reassigned = None
+    if async_mode:
+        job_id = jobs.create_job("officer_reassignment", officer_id=officer.id)
+        background_tasks.add_task(jobs.run_job, job_id, run_reassignment_job, officer.id)
+    else:
+        # Auto-reassign active complaints in this area to the new officer
+        reassigned = reassign_officer_complaints(db, officer)
 
     db.commit()
     
     # Simulate sending an approval email
-    print(f"\n[{'='*40}]")
-    print("📧 MOCK NOTIFICATION SYSTEM")
-    print(f"To: {officer.email}")
-    print("Subject: Application Approved - JanSetu Officer")
-    print(f"Body: Hello {officer.full_name}, your application to be the {officer.department} Officer for PIN {officer.ward} has been approved by the Sudo User.")
-    print("Link: You may now log in to the officer portal.")
-    print(f"[{'='*40}]\n")
+    preview_logger.info(
+        "📧 MOCK NOTIFICATION SYSTEM\nTo: %s\nSubject: Application Approved - JanSetu Officer\n"
+        "Body: Hello %s, your application to be the %s Officer for PIN %s has been approved by the Sudo User.\n"
+        "Link: You may now log in to the officer portal.",
+        officer.email, officer.full_name, officer.department, officer.ward,
+        extra={"channel": "email", "to": officer.email},
+    )
     
-    return {"message": "Officer successfully approved", "officer_email": officer.email}
+    response = {"message": "Officer successfully approved", "officer_email": officer.email}
+    if job_id:
+        response["job_id"] = job_id
+    else:
+        response["reassigned_complaints"] = reassigned
+    return response
+
+
+@router.get("/jobs/{job_id}")
+def get_background_job(
+    job_id: str,
+    admin_user: User = Depends(get_super_admin)
+):
+    """Poll the status of a background job started by an admin action."""
+    job = jobs.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
 @router.delete("/reject-officer/{user_id}")
 def reject_officer(
@@ -240,6 +330,7 @@ def reject_officer(
         raise HTTPException(status_code=404, detail="Pending Officer not found")
         
     db.delete(officer)
+    user_cache.invalidate_after_commit(db, officer.id)
     db.commit()
     return {"message": "Pending officer request rejected and account deleted."}
 
@@ -255,6 +346,7 @@ def delete_officer(
         raise HTTPException(status_code=404, detail="Officer not found")
         
     db.delete(officer)
+    user_cache.invalidate_after_commit(db, officer.id)
     db.commit()
     return {"message": "Officer account deleted from the system."}
 
@@ -270,6 +362,7 @@ def suspend_officer(
         raise HTTPException(status_code=404, detail="Officer not found")
         
     officer.is_suspended = True
+    user_cache.invalidate_after_commit(db, officer.id)
     db.commit()
     return {"message": "Officer account suspended."}
 
@@ -285,5 +378,6 @@ def unsuspend_officer(
         raise HTTPException(status_code=404, detail="Officer not found")
         
     officer.is_suspended = False
+    user_cache.invalidate_after_commit(db, officer.id)
     db.commit()
     return {"message": "Officer account unsuspended."}
@@ -6,31 +6,40 @@ import random
 import string
 from datetime import datetime, timedelta, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from database import get_db
+from database import SessionLocal, get_db
 from dependencies import get_current_user
 from models import EmailOTP, User
 from rate_limiter import limiter
 from schemas import (RefreshTokenRequest, TokenResponse, UserLogin, UserOut,
                      UserRegister)
 from security import (create_access_token, create_refresh_token, decode_token,
-                      hash_password, verify_password)
-from services.notifications import send_otp_email
+                      hash_password_async, verify_password_async)
+from services import outbox
 
 router = APIRouter(prefix="/api/auth", tags=["Auth"])
 
 
 @router.post("/register", response_model=UserOut, status_code=status.HTTP_201_CREATED)
 @limiter.limit("5/minute")
-def register(request: Request, payload: UserRegister, db: Session = Depends(get_db)):
+async def register(request: Request, payload: UserRegister, db: Session = Depends(get_db)):
     """
     Registers a new Citizen or Officer.
     For Officers, it enforces PIN code logic and restricts creation to 
     1 administrative officer per department per ward.
+    Async so the bcrypt hash is awaited without holding a request thread; the database
+    work runs on the threadpool.
     """
+    await run_in_threadpool(_check_registration, db, payload)
+    password_hash = await hash_password_async(payload.password)
+    return await run_in_threadpool(_create_user, db, payload, password_hash)
+
+
+def _check_registration(db: Session, payload: UserRegister):
     existing = db.query(User).filter(func.lower(User.email) == payload.email.lower()).first()
     if existing:
         raise HTTPException(
@@ -67,10 +76,12 @@ def register(request: Request, payload: UserRegister, db: Session = Depends(get_
                 detail=f"An officer for '{payload.department}' already exists in PIN code {payload.ward}."
             )
 
+
+def _create_user(db: Session, payload: UserRegister, password_hash: str) -> User:
     user = User(
         full_name=payload.full_name,
         email=payload.email.lower(),
-        password_hash=hash_password(payload.password),
+        password_hash=password_hash,
         role=payload.role,
         ward=payload.ward,
         department=payload.department,
@@ -85,14 +96,14 @@ def register(request: Request, payload: UserRegister, db: Session = Depends(get_
 
 @router.post("/login", response_model=TokenResponse)
 @limiter.limit("10/minute")
-def login(request: Request, payload: UserLogin, db: Session = Depends(get_db)):
+async def login(request: Request, payload: UserLogin, db: Session = Depends(get_db)):
     """
     Authenticates a user via email and password.
     Returns short-lived Access Tokens and long-lived Refresh Tokens.
     Blocks login if the account is suspended or awaiting Super Admin approval.
     """
-    user = db.query(User).filter(func.lower(User.email) == payload.email.lower()).first()
-    if not user or not verify_password(payload.password, user.password_hash):
+    user = await run_in_threadpool(_find_user, db, payload.email)
+    if not user or not await verify_password_async(payload.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials"
         )
@@ -124,6 +135,10 @@ def login(request: Request, payload: UserLogin, db: Session = Depends(get_db)):
     )
 
 
+def _find_user(db: Session, email: str):
+    return db.query(User).filter(func.lower(User.email) == email.lower()).first()
+
+
 @router.post("/refresh", response_model=TokenResponse)
 @limiter.limit("20/minute")
 def refresh_token(
@@ -157,8 +172,9 @@ def refresh_token(
 
 
 @router.get("/me", response_model=UserOut)
-def me(current_user: User = Depends(get_current_user)):
-    return current_user
+def me(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    """The caller's profile, read fresh: points change without going through the user cache."""
+    return db.get(User, current_user.id) or current_user
 
 
 # ─────────────────────────────────────────────────────────
@@ -177,7 +193,12 @@ class OTPVerify(BaseModel):
 
 @router.post("/send-email-otp", status_code=status.HTTP_200_OK)
 @limiter.limit("3/minute")
-def send_email_otp(request: Request, payload: OTPRequest, db: Session = Depends(get_db)):
+def send_email_otp(
+    request: Request,
+    payload: OTPRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+):
     """
     Generates a secure 6-digit OTP, stores it with a 5-minute expiration,
     and dispatches it via the configured Email provider (e.g., Brevo API).
@@ -200,10 +221,10 @@ def send_email_otp(request: Request, payload: OTPRequest, db: Session = Depends(
         expires_at=expires,
     )
     db.add(otp_record)
+    # Delivered by the notification outbox once the OTP row is committed
+    outbox.enqueue(db, "otp_email", payload.email, otp_code=code)
     db.commit()
-
-    # Send via Gmail SMTP
-    send_otp_email(payload.email, code)
+    outbox.schedule(background_tasks, SessionLocal)
 
     return {"message": "OTP sent successfully. Valid for 5 minutes."}
 
@@ -255,7 +276,12 @@ class ResetPasswordRequest(BaseModel):
 
 @router.post("/forgot-password", status_code=status.HTTP_200_OK)
 @limiter.limit("3/minute")
-def forgot_password(request: Request, payload: ForgotPasswordRequest, db: Session = Depends(get_db)):
+def forgot_password(
+    request: Request,
+    payload: ForgotPasswordRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+):
     """
     Sends a password-reset OTP to the registered email.
     Works for Citizens AND Officers.
@@ -282,8 +308,9 @@ def forgot_password(request: Request, payload: ForgotPasswordRequest, db: Sessio
             expires_at=expires,
         )
         db.add(otp_record)
+        outbox.enqueue(db, "otp_email", payload.email, otp_code=code)
         db.commit()
-        send_otp_email(payload.email, code)
+        outbox.schedule(background_tasks, SessionLocal)
 
     # Always return 200 to prevent email enumeration
     return {"message": "If that email is registered, an OTP has been sent."}
@@ -291,10 +318,19 @@ def forgot_password(request: Request, payload: ForgotPasswordRequest, db: Sessio
 
 @router.post("/reset-password", status_code=status.HTTP_200_OK)
 @limiter.limit("5/minute")
-def reset_password(request: Request, payload: ResetPasswordRequest, db: Session = Depends(get_db)):
+async def reset_password(request: Request, payload: ResetPasswordRequest, db: Session = Depends(get_db)):
     """
     Validates OTP and sets a new password for the account.
     """
+    record, user = await run_in_threadpool(_reset_target, db, payload)
+    password_hash = await hash_password_async(payload.new_password)
+    await run_in_threadpool(_apply_reset, db, record, user, password_hash)
+
+    return {"message": "Password reset successfully. You may now log in."}
+
+
+def _reset_target(db: Session, payload: ResetPasswordRequest):
+    """The unused OTP record and the account it resets; raises if either is not valid."""
     record = db.query(EmailOTP).filter(
         EmailOTP.email == payload.email.lower(),
         EmailOTP.otp_code == payload.otp_code,
@@ -307,7 +343,7 @@ def reset_password(request: Request, payload: ResetPasswordRequest, db: Session
             detail="Invalid or expired OTP.",
         )
 
-    user = db.query(User).filter(func.lower(User.email) == payload.email.lower()).first()
+    user = _find_user(db, payload.email)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found.")
         
@@ -316,9 +352,10 @@ def reset_password(request: Request, payload: ResetPasswordRequest, db: Session
             status_code=status.HTTP_403_FORBIDDEN, 
             detail="Sudo password cannot be reset dynamically."
         )
+    return record, user
+
 
-    user.password_hash = hash_password(payload.new_password)
+def _apply_reset(db: Session, record: EmailOTP, user: User, password_hash: str):
+    user.password_hash = password_hash
     record.is_used = True
     db.commit()
-
-    return {"message": "Password reset successfully. You may now log in."}
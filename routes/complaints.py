@@ -1,33 +1,64 @@
+import math
 import re
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from html import escape
+from typing import List, Literal, Optional
 
 from fastapi import (APIRouter, BackgroundTasks, Depends, HTTPException, Query,
-                     Request, status, UploadFile, File)
-from sqlalchemy import func, or_
-from sqlalchemy.orm import Session
+                     Request, Response, status, UploadFile, File)
+from sqlalchemy import case, func, insert, literal, or_, select, union_all, update
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
-from database import SessionLocal, get_db
+from database import SessionLocal, dialect_insert, get_db
 from dependencies import require_role
 from models import (Complaint, ComplaintActivity, ComplaintUpdate,
-                    ComplaintUpvote, User)
+                    ComplaintUpvote, User, ward_key)
+from pagination import NEXT_CURSOR_HEADER, apply_keyset, next_cursor
 from rate_limiter import limiter
-from schemas import (APIMessage, ComplaintAdminUpdate, ComplaintAssign,
+from schemas import (APIMessage, BulkActionOut, BulkAssignOut, BulkItemResult,
+                     ComplaintActivityOut, ComplaintAdminUpdate,
+                     ComplaintAssign, ComplaintBatchItem,
+                     ComplaintBulkAssign, ComplaintBulkStatusUpdate,
                      ComplaintCreate, ComplaintDetailOut,
-                     ComplaintMergeRequest, ComplaintOut,
+                     COMPLAINT_OUT_FIELDS, COMPLAINT_SUMMARY_FIELDS, complaint_list_adapter,
+                     ComplaintMergeRequest, ComplaintNearbyOut, ComplaintOut,
                      ComplaintProgressUpdateCreate, ComplaintProgressUpdateOut,
-                     ComplaintStatusUpdate)
+                     ComplaintSearchResult, ComplaintStatusUpdate, MapCluster)
 import os
 from groq import Groq
-from services import ai
-from services.ai import (CATEGORY_TO_DEPARTMENT, calculate_impact_score,
-                         cosine_similarity, predict_category, predict_priority,
-                         predict_resolution_deadline)
-from services.notifications import send_email, send_sms
+from services import ai, geo, map_clusters, outbox, search, upvote_buffer, user_cache, versions
+from services.ai import (CATEGORY_TO_DEPARTMENT, PRIORITY_LABELS,
+                         calculate_impact_score, cosine_similarity,
+                         escalated_priority, predict_category, predict_priority,
+                         predict_resolution_deadline, resolve_department_key)
+from services.notifications import send_sms
 
 router = APIRouter(prefix="/api/complaints", tags=["Complaints"])
 RESOLVED_STATUS = "Resolved"
 DUPLICATE_THRESHOLD = 0.80
+MAX_BATCH_IDS = 100
+MAX_NEARBY_RADIUS_M = 10_000
+# Candidates read per requested result before the exact haversine re-rank
+NEARBY_CANDIDATE_FACTOR = 4
+# Detail views embed only the latest activities; the full timeline is paged via /activities
+DETAIL_ACTIVITIES_LIMIT = 50
+MAX_ACTIVITIES_PAGE = 200
+# Notification event key and email subject per status transition
+STATUS_EVENTS = {
+    "In Progress": "in_progress",
+    "Assigned": "assigned",
+    "Resolved": "resolved",
+    "Closed": "closed",
+    "Rejected": "rejected",
+}
+STATUS_SUBJECTS = {
+    "In Progress": "🔧 Your Complaint Is In Progress — JanSetu",
+    "Assigned": "📋 Complaint Assigned — JanSetu",
+    "Resolved": "✅ Complaint Resolved — JanSetu",
+    "Closed": "🎉 Complaint Closed — JanSetu",
+    "Rejected": "⚠️ Complaint Re-escalated — JanSetu",
+}
 
 
 def add_activity(
@@ -129,8 +160,8 @@ def run_auto_duplicate_detection(complaint_id: int):
             .filter(
                 Complaint.id != complaint.id,
                 (
-                    func.lower(Complaint.ward) == func.lower(complaint.ward)
-                    if complaint.ward
+                    Complaint.effective_ward_key == complaint.effective_ward_key
+                    if complaint.effective_ward_key
                     else False
                 ),
                 Complaint.is_merged.is_(False),
@@ -197,6 +228,7 @@ def categorize_and_update(complaint_id: int):
             hours=predicted_hours
         )
 
+        complaint.ai_baseline_priority = priority_score
         complaint.priority = manual_priority
         complaint.priority_label = priority_label
         complaint.category = final_category
@@ -249,9 +281,9 @@ def create_complaint(
     """
     # Synchronous Duplicate Check (Proactive Prevention)
     # Check for existing complaints in the same ward with high similarity
-    query_ward = (payload.ward or "").replace(' ', '').lower()
+    query_ward = ward_key(payload.ward, payload.incident_ward)
     candidates = db.query(Complaint).filter(
-        func.replace(func.lower(Complaint.ward), ' ', '') == query_ward,
+        Complaint.effective_ward_key == query_ward,
         Complaint.is_merged.is_(False),
         Complaint.status.in_(["Submitted", "Assigned", "In Progress"])
     ).all()
@@ -304,6 +336,8 @@ def create_complaint(
     )
 
     db.add(complaint)
+    db.flush()
+    search.index_complaint(db, complaint)
     db.commit()
     db.refresh(complaint)
 
@@ -315,30 +349,115 @@ def create_complaint(
         actor=current_user.full_name,
         actor_id=current_user.id,
     )
-    db.commit()
-    
     # Send Automated Notifications (Disabled SMS only)
     # if current_user.phone:
     #     send_sms(current_user.phone, "", event="registered", title=complaint.title)
-    send_email(
+    outbox.enqueue(
+        db,
+        "email",
         current_user.email,
-        "✅ Complaint Registered — JanSetu",
-        "",
+        subject="✅ Complaint Registered — JanSetu",
+        message="",
         event="registered",
         title=complaint.title,
         citizen_name=current_user.full_name,
     )
+    db.commit()
+    outbox.schedule(background_tasks, SessionLocal)
 
     background_tasks.add_task(run_auto_duplicate_detection, complaint.id)
     background_tasks.add_task(categorize_and_update, complaint.id)
     return complaint
 
 
+def _list_projection(fields: Optional[str], view: str):
+    """
+    Resolves the `fields` / `view` list parameters to the columns to SELECT and the cached
+    adapter that serializes them. `id` is always returned; `created_at` is always fetched
+    because the keyset cursor is built from it. `fields` takes precedence over `view`.
+    """
+    if fields:
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = requested.difference(COMPLAINT_OUT_FIELDS)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+            )
+        requested.add("id")
+        names = tuple(name for name in COMPLAINT_OUT_FIELDS if name in requested)
+    elif view == "summary":
+        names = COMPLAINT_SUMMARY_FIELDS
+    else:
+        names = COMPLAINT_OUT_FIELDS
+
+    columns = [getattr(Complaint, name) for name in names]
+    if "created_at" not in names:
+        columns.append(Complaint.created_at)
+    return columns, complaint_list_adapter(names)
+
+
+def _list_etag(db: Session, request: Request, current_user: User, scope: Optional[str]):
+    """
+    ETag for a list whose rows all fall inside `scope`: the scope's change version plus
+    everything else the response depends on (query string and the caller's scoping).
+    Lists that are not confined to one scope get no ETag.
+    """
+    if not scope:
+        return None
+    return versions.make_etag(
+        *versions.get_versions(db, [scope, versions.GLOBAL_SCOPE]),
+        upvote_buffer.generation(),
+        request.url.query,
+        current_user.id,
+        current_user.role,
+        current_user.ward,
+        current_user.department_key,
+    )
+
+
+def _paginate(
+    query, adapter, cursor: Optional[str], offset: int, limit: int, etag: Optional[str] = None
+):
+    """
+    Pages a complaint listing newest-first. With a `cursor` the page is fetched by seeking
+    on (created_at, id), so deep pages cost the same as the first; otherwise the legacy
+    OFFSET is honoured. The cursor for the following page is returned in X-Next-Cursor,
+    and `etag` (from _list_etag) in ETag.
+
+    `query` selects the columns from _list_projection. The rows are validated once through
+    the matching cached adapter and dumped straight to JSON bytes, bypassing FastAPI's
+    from_attributes validation and generic encoder (the output bytes are identical).
+    """
+    query = apply_keyset(query, Complaint.created_at, Complaint.id, cursor)
+    if not cursor and offset:
+        query = query.offset(offset)
+    rows = query.limit(limit).all()
+
+    headers = {"ETag": etag} if etag else {}
+    token = next_cursor(rows, limit)
+    if token:
+        headers[NEXT_CURSOR_HEADER] = token
+
+    data = [row._asdict() for row in rows]
+    upvote_buffer.overlay_rows(data)
+    items = adapter.validate_python(data)
+    return Response(
+        content=adapter.dump_json(items),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
 @router.get("/community", response_model=List[ComplaintOut])
 def list_community_complaints(
+    request: Request,
     ward: str = Query(..., description="The ward to load community complaints for"),
     limit: int = Query(default=50, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="Opaque keyset cursor from X-Next-Cursor"),
+    fields: Optional[str] = Query(default=None, description="Comma-separated ComplaintOut fields to return"),
+    view: Literal["full", "summary"] = Query(default="full", description="`summary` returns only feed-card fields"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role("citizen", "officer", "sudo")),
 ):
@@ -346,6 +465,9 @@ def list_community_complaints(
     Returns public complaints for a specific ward.
     Unlike the main list endpoint, this does NOT filter by the current citizen's ID,
     allowing them to see and upvote other users' complaints in their community.
+    Supports keyset pagination via `cursor`; offset pagination is kept for older clients.
+    `fields` / `view=summary` restrict both the SELECT and the payload to the named columns.
+    Honours If-None-Match: an unchanged ward feed is answered with 304 from its version alone.
     """
     user_ward = (current_user.ward or "").replace(' ', '').lower()
     query_ward = (ward or "").replace(' ', '').lower()
@@ -356,15 +478,21 @@ def list_community_complaints(
             detail="You can only view community issues in your own locality.",
         )
 
-    query = db.query(Complaint).filter(
+    columns, adapter = _list_projection(fields, view)
+    etag = _list_etag(db, request, current_user, versions.ward_scope(query_ward))
+    if etag and versions.etag_matches(request, etag):
+        return versions.not_modified(etag)
+
+    query = db.query(*columns).filter(
         Complaint.is_merged.is_(False), 
-        func.coalesce(func.lower(Complaint.incident_ward), func.lower(Complaint.ward)) == query_ward
+        Complaint.effective_ward_key == query_ward
     )
-    return query.order_by(Complaint.created_at.desc()).offset(offset).limit(limit).all()
+    return _paginate(query, adapter, cursor, offset, limit, etag)
 
 
 @router.get("", response_model=List[ComplaintOut])
 def list_complaints(
+    request: Request,
     status: Optional[str] = Query(default=None),
     ward: Optional[str] = Query(default=None),
     priority: Optional[int] = Query(default=None, ge=0, le=5),
@@ -373,13 +501,20 @@ def list_complaints(
     out_of_bound: bool = Query(default=False),
     limit: int = Query(default=50, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="Opaque keyset cursor from X-Next-Cursor"),
+    fields: Optional[str] = Query(default=None, description="Comma-separated ComplaintOut fields to return"),
+    view: Literal["full", "summary"] = Query(default="full", description="`summary` returns only feed-card fields"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role("citizen", "officer", "sudo")),
 ):
-    query = db.query(Complaint)
+    columns, adapter = _list_projection(fields, view)
+    query = db.query(*columns)
+    # The single version scope every row of this listing belongs to, if there is one
+    scope = None
 
     if current_user.role == "citizen":
         query = query.filter(Complaint.citizen_id == current_user.id)
+        scope = versions.citizen_scope(current_user.id)
     
     if not include_merged and current_user.role != "citizen":
         query = query.filter(Complaint.is_merged.is_(False))
@@ -393,57 +528,375 @@ def list_complaints(
         tw = target_ward.replace(' ', '').lower()
         if out_of_bound:
             # Out-of-Bound: Not in my ward (incident) but assigned to my department
-            query = query.filter(
-                func.replace(func.coalesce(func.nullif(func.lower(Complaint.incident_ward), ''), func.lower(Complaint.ward)), ' ', '') != tw
-            )
+            query = query.filter(Complaint.effective_ward_key != tw)
         else:
             # Actionable: incident happened here
-            query = query.filter(
-                func.replace(func.coalesce(func.nullif(func.lower(Complaint.incident_ward), ''), func.lower(Complaint.ward)), ' ', '') == tw
-            )
+            query = query.filter(Complaint.effective_ward_key == tw)
+            scope = scope or versions.ward_scope(tw)
     if priority is not None:
         query = query.filter(Complaint.priority == priority)
-    if current_user.role == "officer":
-        dept = current_user.department
-        if dept:
-            # Fuzzy match: match where category/department-label matches
-            # Allow shorter words to catch standard departments
-            words = [w for w in re.split(r'[^a-zA-Z0-9]', dept) if len(w) >= 2]
-            if words:
-                conds = []
-                for w in words:
-                    conds.append(func.coalesce(Complaint.assigned_department, '').ilike(f"%{w}%"))
-                    conds.append(func.coalesce(Complaint.category, '').ilike(f"%{w}%"))
-                query = query.filter(or_(*conds))
+    if current_user.role == "officer" and current_user.department_key:
+        # Department names are resolved to canonical keys on write, so this is an indexed equality
+        query = query.filter(Complaint.department_key == current_user.department_key)
+
+    etag = _list_etag(db, request, current_user, scope)
+    if etag and versions.etag_matches(request, etag):
+        return versions.not_modified(etag)
+    return _paginate(query, adapter, cursor, offset, limit, etag)
 
-    return query.order_by(Complaint.created_at.desc()).offset(offset).limit(limit).all()
+
+def _can_view(current_user: User, complaint: Complaint) -> bool:
+    # A citizen can view if they own it, OR if it's a public complaint in their ward
+    if current_user.role == "citizen" and complaint.citizen_id != current_user.id:
+        user_ward = (current_user.ward or "").replace(' ', '').lower()
+        comp_ward = (complaint.incident_ward or complaint.ward or "").replace(' ', '').lower()
+        return bool(user_ward) and comp_ward == user_ward
+    return True
+
+
+def _latest_activity_ids(complaint_id: int, limit: int):
+    """Ids of a complaint's newest `limit` activities: a bounded seek on the timeline index."""
+    return (
+        select(ComplaintActivity.id)
+        .where(ComplaintActivity.complaint_id == complaint_id)
+        .order_by(ComplaintActivity.created_at.desc(), ComplaintActivity.id.desc())
+        .limit(limit)
+    )
+
+
+def _attach_latest_activities(db: Session, complaints: List[Complaint], limit: int):
+    """
+    Loads the latest `limit` activities of each complaint (oldest first, as the timeline is
+    shown) and sets them as `complaint.activities`. Each complaint's timeline is read with
+    ORDER BY created_at DESC, id DESC LIMIT `limit` on the (complaint_id, created_at, id)
+    index, so the cost does not grow with its length; a batch combines one such read per
+    complaint with UNION ALL into a single query.
+    """
+    by_complaint = {complaint.id: [] for complaint in complaints}
+    if by_complaint and limit:
+        if len(by_complaint) == 1:
+            [complaint_id] = by_complaint
+            activities = (
+                db.query(ComplaintActivity)
+                .filter(ComplaintActivity.complaint_id == complaint_id)
+                .order_by(ComplaintActivity.created_at.desc(), ComplaintActivity.id.desc())
+                .limit(limit)
+                .all()
+            )
+            activities.reverse()
+        else:
+            latest = union_all(*(
+                select(per_complaint.c.id).select_from(per_complaint)
+                for per_complaint in (
+                    _latest_activity_ids(complaint_id, limit).subquery() for complaint_id in by_complaint
+                )
+            )).subquery()
+            activities = (
+                db.query(ComplaintActivity)
+                .filter(ComplaintActivity.id.in_(select(latest.c.id)))
+                .order_by(ComplaintActivity.created_at, ComplaintActivity.id)
+            )
+        for activity in activities:
+            by_complaint[activity.complaint_id].append(activity)
+    for complaint in complaints:
+        set_committed_value(complaint, "activities", by_complaint[complaint.id])
+
+
+@router.get("/batch", response_model=List[ComplaintBatchItem])
+def get_complaints_batch(
+    ids: str = Query(..., description=f"Comma-separated complaint ids (at most {MAX_BATCH_IDS})"),
+    db: Session = Depends(get_db),
+    activities_limit: int = Query(default=DETAIL_ACTIVITIES_LIMIT, ge=0, le=MAX_ACTIVITIES_PAGE),
+    current_user: User = Depends(require_role("citizen", "officer", "sudo")),
+):
+    """
+    Multi-get for notification inboxes: one IN query (timelines batched in one query each)
+    instead of one GET per complaint. Results follow the order of `ids`; ids that are
+    missing or not visible to the caller get the 404/403 their single GET would return.
+    """
+    try:
+        requested = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="ids must be comma-separated integers"
+        )
+    if not requested:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No complaint ids given")
+    if len(requested) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BATCH_IDS} ids per request",
+        )
+
+    found = {
+        complaint.id: complaint
+        for complaint in db.query(Complaint)
+        .options(selectinload(Complaint.updates))
+        .filter(Complaint.id.in_(set(requested)))
+    }
+    _attach_latest_activities(db, list(found.values()), activities_limit)
+    upvote_buffer.overlay(found.values())
+
+    results = []
+    for complaint_id in requested:
+        complaint = found.get(complaint_id)
+        if complaint is None:
+            results.append(ComplaintBatchItem(
+                id=complaint_id, status_code=status.HTTP_404_NOT_FOUND, detail="Complaint not found"
+            ))
+        elif not _can_view(current_user, complaint):
+            results.append(ComplaintBatchItem(
+                id=complaint_id,
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not allowed to view this complaint",
+            ))
+        else:
+            results.append(ComplaintBatchItem(
+                id=complaint_id,
+                status_code=status.HTTP_200_OK,
+                complaint=ComplaintDetailOut.model_validate(complaint),
+            ))
+    return results
+
+
+def _visibility_filters(current_user: User) -> list:
+    """
+    SQL filters for the complaints `current_user` may browse outside their own lists:
+    citizens see their own complaints and public ones in their ward, officers their ward and
+    department, sudo everything. Merged duplicates are always excluded.
+    """
+    filters = [Complaint.is_merged.is_(False)]
+    user_ward = ward_key(current_user.ward)
+    if current_user.role == "citizen":
+        if user_ward:
+            filters.append(
+                or_(
+                    Complaint.citizen_id == current_user.id,
+                    Complaint.effective_ward_key == user_ward,
+                )
+            )
+        else:
+            filters.append(Complaint.citizen_id == current_user.id)
+    elif current_user.role == "officer":
+        filters += _officer_scope_filters(current_user)
+    return filters
+
+
+def _officer_scope_filters(current_user: User) -> list:
+    """SQL filters for the complaints an officer may see and manage: their ward and department."""
+    filters = []
+    user_ward = ward_key(current_user.ward)
+    if user_ward:
+        filters.append(Complaint.effective_ward_key == user_ward)
+    if current_user.department_key:
+        filters.append(Complaint.department_key == current_user.department_key)
+    return filters
+
+
+@router.get("/nearby", response_model=List[ComplaintNearbyOut])
+def list_nearby_complaints(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_m: float = Query(default=1000, gt=0, le=MAX_NEARBY_RADIUS_M),
+    limit: int = Query(default=50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role("citizen", "officer", "sudo")),
+):
+    """
+    Complaints within `radius_m` metres of (lat, lng), nearest first, with their distance.
+    Candidates come from indexed geo_cell ranges plus a bounding box, so only the few cells
+    around the point are read. The database orders them by an equirectangular squared
+    distance (accurate to well under a metre at these radii) and returns at most
+    NEARBY_CANDIDATE_FACTOR * `limit` list columns; only those get the exact haversine check.
+    Visibility follows search (citizens: own complaints and their ward).
+    """
+    min_lat, max_lat, min_lng, max_lng = geo.bounding_box(lat, lng, radius_m)
+    cells = or_(*(
+        Complaint.geo_cell.between(low, high)
+        for low, high in geo.cell_ranges(min_lat, max_lat, min_lng, max_lng)
+    ))
+    # Squared distance in degrees of latitude; longitude shrinks by cos(latitude)
+    dlat = Complaint.latitude - lat
+    dlng = (Complaint.longitude - lng) * max(math.cos(math.radians(lat)), 1e-6)
+    approx_distance = dlat * dlat + dlng * dlng
+    radius_deg = radius_m / geo.METERS_PER_DEGREE_LAT
+    columns, _ = _list_projection(None, "full")
+    candidates = (
+        db.query(*columns)
+        .filter(
+            cells,
+            Complaint.latitude.between(min_lat, max_lat),
+            Complaint.longitude.between(min_lng, max_lng),
+            # Drops the bounding box's corners; the slack covers the approximation
+            approx_distance <= (radius_deg * 1.01) ** 2,
+            *_visibility_filters(current_user),
+        )
+        .order_by(approx_distance, Complaint.id.desc())
+        .limit(limit * NEARBY_CANDIDATE_FACTOR)
+        .all()
+    )
+
+    nearby = []
+    for row in candidates:
+        distance = geo.haversine_m(lat, lng, row.latitude, row.longitude)
+        if distance <= radius_m:
+            nearby.append({**row._asdict(), "distance_m": round(distance, 1)})
+    nearby.sort(key=lambda item: (item["distance_m"], -item["id"]))
+    nearby = nearby[:limit]
+    upvote_buffer.overlay_rows(nearby)
+    return nearby
+
+
+@router.get("/clusters", response_model=List[MapCluster])
+def list_map_clusters(
+    min_lat: float = Query(..., ge=-90, le=90),
+    max_lat: float = Query(..., ge=-90, le=90),
+    min_lng: float = Query(..., ge=-180, le=180),
+    max_lng: float = Query(..., ge=-180, le=180),
+    zoom: int = Query(..., ge=0, le=22, description="Web-map zoom level of the viewport"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role("citizen", "officer", "sudo")),
+):
+    """
+    Open complaints in the viewport aggregated into clusters for zoomed-out map views:
+    count, centroid and worst priority per grid cell. Served from the incrementally
+    maintained complaint_map_cells grid at the resolution matching `zoom`, so the cost
+    depends on the number of visible cells, not on the number of complaints.
+    """
+    if min_lat > max_lat or min_lng > max_lng:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Viewport minimum exceeds maximum"
+        )
+    level = map_clusters.level_for_zoom(zoom)
+    return [
+        MapCluster(
+            latitude=round(row.sum_lat / row.count, 6),
+            longitude=round(row.sum_lng / row.count, 6),
+            count=row.count,
+            worst_priority=row.worst_priority,
+            worst_priority_label=PRIORITY_LABELS.get(row.worst_priority, "Medium"),
+        )
+        for row in map_clusters.clusters(db, level, min_lat, max_lat, min_lng, max_lng)
+    ]
+
+
+@router.get("/search", response_model=List[ComplaintSearchResult])
+def search_complaints(
+    q: str = Query(..., min_length=2, max_length=200, description="Free-text search query"),
+    limit: int = Query(default=20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role("citizen", "officer", "sudo")),
+):
+    """
+    Ranked full-text search over complaint titles and descriptions, with highlighted snippets.
+    Scoping mirrors the rest of the API: citizens see their own complaints and public ones in
+    their ward, officers their ward and department, sudo everything.
+    """
+    hits = search.search_complaints(db, q, _visibility_filters(current_user), limit)
+    upvote_buffer.overlay(complaint for complaint, _, _ in hits)
+    return [
+        ComplaintSearchResult(
+            **ComplaintOut.model_validate(complaint).model_dump(),
+            rank=round(rank, 4),
+            snippet=snippet,
+        )
+        for complaint, rank, snippet in hits
+    ]
 
 
 @router.get("/{complaint_id}", response_model=ComplaintDetailOut)
 def get_complaint(
     complaint_id: int,
+    request: Request,
+    response: Response,
+    activities_limit: int = Query(
+        default=DETAIL_ACTIVITIES_LIMIT,
+        ge=0,
+        le=MAX_ACTIVITIES_PAGE,
+        description="Latest activities to embed (0 for none); page the rest via /activities",
+    ),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role("citizen", "officer", "sudo")),
 ):
+    """
+    Returns a complaint with its latest `activities_limit` timeline entries and its progress
+    updates. The ETag changes whenever the complaint, its activities or its updates change; a
+    matching If-None-Match is answered with 304 (after authorization) without loading the timeline.
+    """
     complaint = db.query(Complaint).filter(Complaint.id == complaint_id).first()
     if not complaint:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Complaint not found"
         )
 
-    if current_user.role == "citizen":
-        # A citizen can view if they own it, OR if it's a public complaint in their ward
-        if complaint.citizen_id != current_user.id:
-            user_ward = (current_user.ward or "").replace(' ', '').lower()
-            comp_ward = (complaint.incident_ward or complaint.ward or "").replace(' ', '').lower()
-            if not user_ward or comp_ward != user_ward:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Not allowed to view this complaint",
-                )
+    if not _can_view(current_user, complaint):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not allowed to view this complaint",
+        )
+
+    etag = versions.make_etag(
+        complaint.id,
+        complaint.updated_at,
+        upvote_buffer.pending(complaint.id),
+        activities_limit,
+        *versions.get_versions(
+            db, [versions.complaint_scope(complaint.id), versions.GLOBAL_SCOPE]
+        ),
+    )
+    if versions.etag_matches(request, etag):
+        return versions.not_modified(etag)
+    response.headers["ETag"] = etag
+
+    updates = (
+        db.query(ComplaintUpdate)
+        .filter(ComplaintUpdate.complaint_id == complaint.id)
+        .order_by(ComplaintUpdate.id)
+        .all()
+    )
+    set_committed_value(complaint, "updates", updates)
+    _attach_latest_activities(db, [complaint], activities_limit)
+    upvote_buffer.overlay([complaint])
     return complaint
 
 
+@router.get("/{complaint_id}/activities", response_model=List[ComplaintActivityOut])
+def list_complaint_activities(
+    complaint_id: int,
+    response: Response,
+    limit: int = Query(default=DETAIL_ACTIVITIES_LIMIT, ge=1, le=MAX_ACTIVITIES_PAGE),
+    cursor: Optional[str] = Query(default=None, description="Opaque keyset cursor from X-Next-Cursor"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role("citizen", "officer", "sudo")),
+):
+    """
+    A complaint's full activity timeline, newest first, paged by seeking on
+    (created_at, id) over the (complaint_id, created_at, id) index.
+    The cursor for the following page is returned in X-Next-Cursor.
+    """
+    complaint = db.query(Complaint).filter(Complaint.id == complaint_id).first()
+    if not complaint:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Complaint not found"
+        )
+    if not _can_view(current_user, complaint):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not allowed to view this complaint",
+        )
+
+    query = db.query(ComplaintActivity).filter(ComplaintActivity.complaint_id == complaint_id)
+    activities = (
+        apply_keyset(query, ComplaintActivity.created_at, ComplaintActivity.id, cursor)
+        .limit(limit)
+        .all()
+    )
+    token = next_cursor(activities, limit)
+    if token:
+        response.headers[NEXT_CURSOR_HEADER] = token
+    return activities
+
+
 def is_same_dept(user_dept: Optional[str], comp_dept: str) -> bool:
     if not user_dept: return True
     # Word-based fuzzy matching with prefix/substring support
@@ -485,6 +938,7 @@ def admin_update_complaint(
         predicted_priority, predicted_label = predict_priority(
             complaint.title, complaint.description
         )
+        complaint.ai_baseline_priority = predicted_priority
         complaint.priority = max(complaint.priority, predicted_priority)
         complaint.priority_label = predicted_label
         complaint.impact_score = calculate_impact_score(
@@ -494,6 +948,8 @@ def admin_update_complaint(
         complaint.category = payload.category
     if payload.ward is not None:
         complaint.ward = payload.ward
+    if payload.title is not None or payload.description is not None:
+        search.index_complaint(db, complaint)
 
     add_activity(
         db,
@@ -544,35 +1000,226 @@ def assign_complaint(
     return complaint
 
 
-@router.patch("/{complaint_id}/status", response_model=ComplaintOut)
-def update_complaint_status(
-    complaint_id: int,
-    payload: ComplaintStatusUpdate,
+@router.post("/bulk/assign", response_model=BulkAssignOut)
+def bulk_assign_complaints(
+    payload: ComplaintBulkAssign,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role("officer", "sudo")),
 ):
-    complaint = db.query(Complaint).filter(Complaint.id == complaint_id).first()
-    if not complaint:
+    """
+    Assigns every complaint selected by `complaint_ids` or by `filter` (ward, category,
+    status; merged duplicates excluded) in two set-based statements, so the cost does not
+    grow with one round-trip per ticket: an INSERT ... SELECT writes the "Complaint Assigned"
+    timeline entries (capturing each previous assignee), then one UPDATE moves them.
+    Officers only reach complaints in their own ward and department; ids outside that scope
+    count as not found.
+    """
+    if (payload.complaint_ids is None) == (payload.filter is None):
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Complaint not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide either complaint_ids or filter",
+        )
+
+    if payload.complaint_ids is not None:
+        requested = set(payload.complaint_ids)
+        criteria = [Complaint.id.in_(requested)]
+    else:
+        requested = None
+        criteria = [Complaint.is_merged.is_(False)]
+        if payload.filter.ward:
+            criteria.append(Complaint.effective_ward_key == ward_key(payload.filter.ward))
+        if payload.filter.category:
+            criteria.append(Complaint.category == payload.filter.category)
+        if payload.filter.status:
+            criteria.append(Complaint.status == payload.filter.status)
+        if len(criteria) == 1:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="filter needs at least one of ward, category or status",
+            )
+    if current_user.role == "officer":
+        criteria += _officer_scope_filters(current_user)
+
+    activity_rows = select(
+        Complaint.id,
+        literal("Complaint Assigned"),
+        literal(f"Assigned to {payload.assigned_to} in {payload.assigned_department}"),
+        func.coalesce(Complaint.assigned_to, "Unassigned"),
+        literal(payload.assigned_to),
+        literal(payload.actor or current_user.full_name),
+        literal(current_user.id),
+    ).where(*criteria)
+    db.execute(
+        insert(ComplaintActivity).from_select(
+            ["complaint_id", "action", "details", "previous_value", "new_value", "actor", "actor_id"],
+            activity_rows,
+        )
+    )
+
+    result = db.execute(
+        update(Complaint)
+        .where(*criteria)
+        .values(
+            assigned_to=payload.assigned_to,
+            assigned_department=payload.assigned_department,
+            # Core UPDATE skips the mapper events that normally derive this
+            department_key=resolve_department_key(payload.assigned_department),
+            assigned_at=datetime.now(timezone.utc),
+            status=case(
+                (Complaint.status.in_(["Submitted", "Pending"]), "Assigned"),
+                else_=Complaint.status,
+            ),
         )
+        .execution_options(synchronize_session=False)
+    )
+    versions.bump_global(db)
+    db.commit()
+
+    assigned = result.rowcount
+    if requested is None:
+        return BulkAssignOut(assigned=assigned)
+    return BulkAssignOut(
+        assigned=assigned, requested=len(requested), not_found=len(requested) - assigned
+    )
+
 
+def _management_error(current_user: User, complaint) -> Optional[str]:
+    """
+    Why `current_user` may not manage `complaint` (department, then ward), or None if allowed.
+    `complaint` only needs the department, category and ward columns.
+    """
     raw_dept = complaint.assigned_department or complaint.category or "General"
     complaint_dept = CATEGORY_TO_DEPARTMENT.get(raw_dept, raw_dept)
     if not is_same_dept(current_user.department, complaint_dept):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You can only manage complaints assigned to your department",
-        )
+        return "You can only manage complaints assigned to your department"
 
     if current_user.role == "officer":
         user_ward = (current_user.ward or "").replace(' ', '').lower()
         comp_ward = (complaint.incident_ward or complaint.ward or "").replace(' ', '').lower()
         if user_ward and user_ward != comp_ward:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You can only manage complaints within your assigned ward.",
+            return "You can only manage complaints within your assigned ward."
+    return None
+
+
+def enqueue_status_notifications(db: Session, complaint_ids: List[int], new_status: str):
+    """
+    Queues status-change emails for the reporters of `complaint_ids`, and of every duplicate
+    merged into them, in the caller's transaction. Recipients are resolved with one joined
+    query and the messages written with one INSERT; a reporter's updates within the digest
+    window are delivered as one email.
+    """
+    recipients = (
+        db.query(Complaint.title, User.email, User.full_name)
+        .join(User, User.id == Complaint.citizen_id)
+        .filter(
+            or_(Complaint.id.in_(complaint_ids), Complaint.merged_into_id.in_(complaint_ids))
+        )
+        .all()
+    )
+    evt = STATUS_EVENTS.get(new_status, "generic")
+    subj = STATUS_SUBJECTS.get(new_status, f"Ticket Update: {new_status} — JanSetu")
+    outbox.enqueue_many(db, "status_email", [
+        (email, {
+            "subject": subj, "event": evt, "title": title,
+            "citizen_name": full_name, "status": new_status,
+        })
+        for title, email, full_name in recipients
+        if email
+    ])
+
+
+@router.post("/bulk/status", response_model=BulkActionOut)
+def bulk_update_status(
+    payload: ComplaintBulkStatusUpdate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role("officer", "sudo")),
+):
+    """
+    Applies one status transition to many complaints in a single transaction.
+    Each id gets the same department/ward checks as PATCH /{id}/status; permitted ones are
+    moved with one UPDATE and their timeline entries written with one bulk INSERT.
+    Reporter emails are queued in the same transaction and delivered after it commits.
+    """
+    requested = list(dict.fromkeys(payload.complaint_ids))
+    rows = {
+        row.id: row
+        for row in db.query(
+            Complaint.id, Complaint.status, Complaint.citizen_id, Complaint.effective_ward_key,
+            Complaint.assigned_department, Complaint.category,
+            Complaint.incident_ward, Complaint.ward,
+            Complaint.latitude, Complaint.longitude, Complaint.priority, Complaint.is_merged,
+        ).filter(Complaint.id.in_(requested))
+    }
+
+    results, allowed = [], []
+    for complaint_id in requested:
+        row = rows.get(complaint_id)
+        denied = "Complaint not found" if row is None else _management_error(current_user, row)
+        if denied:
+            results.append(BulkItemResult(id=complaint_id, success=False, detail=denied))
+        else:
+            allowed.append(row)
+            results.append(BulkItemResult(id=complaint_id, success=True))
+
+    if allowed:
+        allowed_ids = [row.id for row in allowed]
+        db.execute(
+            update(Complaint)
+            .where(Complaint.id.in_(allowed_ids))
+            .values(
+                status=payload.status,
+                resolved_at=(
+                    datetime.now(timezone.utc) if payload.status == RESOLVED_STATUS else None
+                ),
             )
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            insert(ComplaintActivity),
+            [
+                {
+                    "complaint_id": row.id,
+                    "action": "Status Updated",
+                    "details": payload.note or f"Status changed to {payload.status}",
+                    "previous_value": row.status,
+                    "new_value": payload.status,
+                    "actor": payload.actor or current_user.full_name,
+                    "actor_id": current_user.id,
+                }
+                for row in allowed
+            ],
+        )
+        map_clusters.apply(db.connection(), [
+            (map_clusters.contribution(row.latitude, row.longitude, row.priority, state, row.is_merged), sign)
+            for row in allowed
+            for state, sign in ((row.status, -1), (payload.status, 1))
+        ])
+        versions.bump_complaint_rows(db, allowed)
+        enqueue_status_notifications(db, allowed_ids, payload.status)
+        db.commit()
+        outbox.schedule(background_tasks, SessionLocal)
+
+    return BulkActionOut(updated=len(allowed), failed=len(results) - len(allowed), results=results)
+
+
+@router.patch("/{complaint_id}/status", response_model=ComplaintOut)
+def update_complaint_status(
+    complaint_id: int,
+    payload: ComplaintStatusUpdate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role("officer", "sudo")),
+):
+    complaint = db.query(Complaint).filter(Complaint.id == complaint_id).first()
+    if not complaint:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Complaint not found"
+        )
+
+    denied = _management_error(current_user, complaint)
+    if denied:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=denied)
 
     old_status = complaint.status
     complaint.status = payload.status
@@ -590,43 +1237,10 @@ def update_complaint_status(
         actor=payload.actor or current_user.full_name,
         actor_id=current_user.id,
     )
-    
-    citizen = complaint.citizen
-    if citizen:
-        # Map API status string to event key
-        event_map = {
-            "In Progress": "in_progress",
-            "Assigned": "assigned",
-            "Resolved": "resolved",
-            "Closed": "closed",
-            "Rejected": "rejected",
-        }
-        evt = event_map.get(payload.status, "generic")
-        subject_map = {
-            "In Progress": "🔧 Your Complaint Is In Progress — JanSetu",
-            "Assigned": "📋 Complaint Assigned — JanSetu",
-            "Resolved": "✅ Complaint Resolved — JanSetu",
-            "Closed": "🎉 Complaint Closed — JanSetu",
-            "Rejected": "⚠️ Complaint Re-escalated — JanSetu",
-        }
-        subj = subject_map.get(payload.status, f"Ticket Update: {payload.status} — JanSetu")
-        
-        # Notify the primary reporter
-        send_email(
-            citizen.email, subj, "",
-            event=evt, title=complaint.title, citizen_name=citizen.full_name
-        )
-
-        # Notify all citizens who reported duplicate issues merged into this one
-        merged_complaints = db.query(Complaint).filter(Complaint.merged_into_id == complaint.id).all()
-        for mc in merged_complaints:
-            if mc.citizen and mc.citizen.email:
-                send_email(
-                    mc.citizen.email, subj, "",
-                    event=evt, title=mc.title, citizen_name=mc.citizen.full_name
-                )
-        
+    # Reporter emails (including every merged duplicate) are delivered after the commit
+    enqueue_status_notifications(db, [complaint.id], payload.status)
     db.commit()
+    outbox.schedule(background_tasks, SessionLocal)
     db.refresh(complaint)
     return complaint
 
@@ -648,22 +1262,9 @@ def add_progress_update(
             status_code=status.HTTP_404_NOT_FOUND, detail="Complaint not found"
         )
 
-    raw_dept = complaint.assigned_department or complaint.category or "General"
-    complaint_dept = CATEGORY_TO_DEPARTMENT.get(raw_dept, raw_dept)
-    if not is_same_dept(current_user.department, complaint_dept):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You can only manage complaints assigned to your department",
-        )
-
-    if current_user.role == "officer":
-        user_ward = (current_user.ward or "").replace(' ', '').lower()
-        comp_ward = (complaint.incident_ward or complaint.ward or "").replace(' ', '').lower()
-        if user_ward and user_ward != comp_ward:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You can only manage complaints within your assigned ward.",
-            )
+    denied = _management_error(current_user, complaint)
+    if denied:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=denied)
 
     progress = ComplaintUpdate(
         complaint_id=complaint_id,
@@ -756,46 +1357,87 @@ def upvote_complaint(
             detail="You can only upvote issues in your own locality.",
         )
 
-    existing_vote = (
-        db.query(ComplaintUpvote)
-        .filter(
-            ComplaintUpvote.complaint_id == complaint_id,
-            ComplaintUpvote.user_id == current_user.id,
-        )
-        .first()
-    )
-
-    if existing_vote:
+    # The unique (complaint_id, user_id) index arbitrates concurrent double-votes
+    vote = db.execute(
+        dialect_insert(db.get_bind(), ComplaintUpvote.__table__)
+        .values(complaint_id=complaint_id, user_id=current_user.id)
+        .on_conflict_do_nothing(index_elements=["complaint_id", "user_id"])
+        .returning(ComplaintUpvote.id)
+    ).scalar()
+    if vote is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="You have already upvoted this complaint.",
         )
 
-    new_upvote = ComplaintUpvote(complaint_id=complaint_id, user_id=current_user.id)
-    db.add(new_upvote)
-
-    complaint.upvotes += 1
-    
-    # Mathematical Priority Escalation
-    # Baseline priority is derived from the original text (AI or manual override)
-    baseline_priority, _ = predict_priority(complaint.title, complaint.description)
-    # Give +1 bonus priority level for every 10 upvotes, capped at 5
-    bonus_levels = complaint.upvotes // 10
-    new_priority = min(5, baseline_priority + bonus_levels)
-    
-    complaint.priority = new_priority
-    
-    # Generate the string label based on the new integer
-    labels = {0: "Low", 1: "Medium", 2: "High", 3: "Urgent", 4: "Critical", 5: "Emergency"}
-    complaint.priority_label = labels.get(new_priority, "Medium")
-
-    complaint.impact_score = calculate_impact_score(
-        complaint.reports_count, complaint.priority, complaint.upvotes
+    if upvote_buffer.is_running():
+        # Write-behind: the vote row and timeline entry are written now (plain INSERTs, no
+        # shared row locks); the counters, priority, impact, reporter points and cache
+        # versions are applied by the buffer's periodic flush
+        db.execute(
+            insert(ComplaintActivity).values(
+                complaint_id=complaint_id,
+                action="Complaint Upvoted",
+                details="Community member upvoted this issue",
+                actor=current_user.full_name,
+                actor_id=current_user.id,
+            )
+        )
+        db.commit()
+        upvote_buffer.add(complaint_id)
+        return APIMessage(message="Complaint upvoted successfully")
+
+    # Increment in the database: the row lock taken here serializes concurrent voters,
+    # and the returned count is the one this vote produced (no lost updates)
+    upvotes, reports_count, baseline_priority, old_priority = db.execute(
+        update(Complaint)
+        .where(Complaint.id == complaint_id)
+        .values(upvotes=Complaint.upvotes + 1)
+        .returning(
+            Complaint.upvotes, Complaint.reports_count,
+            Complaint.ai_baseline_priority, Complaint.priority,
+        )
+        .execution_options(synchronize_session=False)
+    ).one()
+
+    # Mathematical Priority Escalation on top of the stored AI baseline
+    if baseline_priority is None:
+        baseline_priority, _ = predict_priority(complaint.title, complaint.description)
+    new_priority = escalated_priority(baseline_priority, upvotes)
+    db.execute(
+        update(Complaint)
+        .where(Complaint.id == complaint_id)
+        .values(
+            ai_baseline_priority=baseline_priority,
+            priority=new_priority,
+            priority_label=PRIORITY_LABELS.get(new_priority, "Medium"),
+            impact_score=calculate_impact_score(reports_count, new_priority, upvotes),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    map_clusters.record_change(
+        db,
+        map_clusters.contribution(
+            complaint.latitude, complaint.longitude, old_priority,
+            complaint.status, complaint.is_merged,
+        ),
+        map_clusters.contribution(
+            complaint.latitude, complaint.longitude, new_priority,
+            complaint.status, complaint.is_merged,
+        ),
     )
 
     # Reward the citizen who reported it
-    if complaint.citizen:
-        complaint.citizen.points += 5
+    if complaint.citizen_id:
+        db.execute(
+            update(User)
+            .where(User.id == complaint.citizen_id)
+            .values(points=User.points + 5)
+            .execution_options(synchronize_session=False)
+        )
+        user_cache.invalidate_after_commit(db, complaint.citizen_id)
+    # Counters and priority show in list pages too; the ward/citizen bumps wait for commit
+    versions.bump_complaint_rows(db, [complaint])
 
     add_activity(
         db,
@@ -812,6 +1454,7 @@ def upvote_complaint(
 @router.post("/{complaint_id}/close", response_model=ComplaintOut)
 def close_complaint(
     complaint_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role("citizen"))
 ):
@@ -844,18 +1487,20 @@ def close_complaint(
     
     # if current_user.phone:
     #     send_sms(current_user.phone, "", event="closed", title=complaint.title)
-    send_email(
-        current_user.email, "🎉 Complaint Closed — JanSetu", "",
+    outbox.enqueue(
+        db, "email", current_user.email, subject="🎉 Complaint Closed — JanSetu", message="",
         event="closed", title=complaint.title, citizen_name=current_user.full_name
     )
     
     db.commit()
+    outbox.schedule(background_tasks, SessionLocal)
     return complaint
 
 
 @router.post("/{complaint_id}/re_escalate", response_model=ComplaintOut)
 def re_escalate_complaint(
     complaint_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role("citizen"))
 ):
@@ -883,8 +1528,7 @@ def re_escalate_complaint(
     new_priority = min(5, complaint.priority + 1)
     complaint.priority = new_priority
     
-    labels = {0: "Low", 1: "Medium", 2: "High", 3: "Urgent", 4: "Critical", 5: "Emergency"}
-    complaint.priority_label = labels.get(new_priority, "Medium")
+    complaint.priority_label = PRIORITY_LABELS.get(new_priority, "Medium")
     
     # Directly Breach SLA
     complaint.escalation_level += 1
@@ -903,9 +1547,13 @@ def re_escalate_complaint(
 
     # if current_user.phone:
     #     send_sms(current_user.phone, f"JanSetu: ALERT - Your ticket '{complaint.title}' has been severely Re-escalated to Priority Level {new_priority}.")
-    send_email(current_user.email, "Ticket Re-escalated", f"Your rejection for ticket '{complaint.title}' was received. The priority has been penalized and officers have been notified.")
+    outbox.enqueue(
+        db, "email", current_user.email, subject="Ticket Re-escalated",
+        message=f"Your rejection for ticket '{escape(complaint.title)}' was received. The priority has been penalized and officers have been notified.",
+    )
 
     db.commit()
+    outbox.schedule(background_tasks, SessionLocal)
     db.refresh(complaint)
     return complaint
 
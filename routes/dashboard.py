@@ -3,8 +3,6 @@ from datetime import timezone
 
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
-import re
 
 from database import get_db
 from dependencies import require_role
@@ -24,20 +22,10 @@ def dashboard_summary(
     if current_user.role == "officer":
         if current_user.ward:
             tw = current_user.ward.replace(' ', '').lower()
-            query = query.filter(
-                func.replace(func.coalesce(func.nullif(func.lower(Complaint.incident_ward), ''), func.lower(Complaint.ward)), ' ', '') == tw
-            )
+            query = query.filter(Complaint.effective_ward_key == tw)
         
-        dept = current_user.department
-        if dept:
-            # Loosen word length from 3 to 2 to catch "Water", "Roads", etc if split
-            words = [w for w in re.split(r'[^a-zA-Z0-9]', dept) if len(w) >= 2]
-            if words:
-                conds = []
-                for w in words:
-                    conds.append(func.coalesce(Complaint.assigned_department, '').ilike(f"%{w}%"))
-                    conds.append(func.coalesce(Complaint.category, '').ilike(f"%{w}%"))
-                query = query.filter(or_(*conds))
+        if current_user.department_key:
+            query = query.filter(Complaint.department_key == current_user.department_key)
 
     total = query.count()
     # Corrected statuses: Include Submitted and Assigned in Pending counts
@@ -3,9 +3,10 @@ Pydantic Schema definitions for API request/response validation.
 Ensures strong typing, bounds checking, and automatic OpenAPI documentation.
 """
 from datetime import datetime
-from typing import List, Literal, Optional
+from functools import lru_cache
+from typing import List, Literal, Optional, Tuple
 
-from pydantic import BaseModel, ConfigDict, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, TypeAdapter, create_model
 
 
 class APIMessage(BaseModel):
@@ -89,6 +90,31 @@ class ComplaintStatusUpdate(BaseModel):
     actor: Optional[str] = None
 
 
+class ComplaintBulkStatusUpdate(ComplaintStatusUpdate):
+    complaint_ids: List[int] = Field(min_length=1, max_length=500)
+
+
+class ComplaintAssignFilter(BaseModel):
+    ward: Optional[str] = None
+    category: Optional[str] = None
+    status: Optional[str] = None
+
+
+class ComplaintBulkAssign(BaseModel):
+    """Either `complaint_ids` or `filter` selects the complaints to assign."""
+    complaint_ids: Optional[List[int]] = Field(default=None, min_length=1, max_length=5000)
+    filter: Optional[ComplaintAssignFilter] = None
+    assigned_to: str = Field(min_length=2, max_length=120)
+    assigned_department: str = Field(min_length=2, max_length=120)
+    actor: Optional[str] = None
+
+
+class BulkAssignOut(BaseModel):
+    assigned: int
+    requested: Optional[int] = None
+    not_found: int = 0
+
+
 class ComplaintMergeRequest(BaseModel):
     source_complaint_id: int
     target_complaint_id: int
@@ -157,11 +183,74 @@ class ComplaintOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+# Built once: list endpoints validate projected rows and dump them straight to JSON bytes
+ComplaintListAdapter = TypeAdapter(List[ComplaintOut])
+
+COMPLAINT_OUT_FIELDS: Tuple[str, ...] = tuple(ComplaintOut.model_fields)
+# What feed cards render (`view=summary`)
+COMPLAINT_SUMMARY_FIELDS: Tuple[str, ...] = (
+    "id", "title", "category", "priority", "priority_label", "upvotes", "status", "created_at",
+)
+
+
+@lru_cache(maxsize=64)
+def complaint_list_adapter(fields: Tuple[str, ...]) -> TypeAdapter:
+    """
+    Returns a cached list adapter for a subset of ComplaintOut fields (in declaration order).
+    The partial model reuses the original field definitions, so values serialize exactly as
+    they do in the full response.
+    """
+    if fields == COMPLAINT_OUT_FIELDS:
+        return ComplaintListAdapter
+    partial = create_model(
+        "ComplaintPartialOut",
+        **{name: (ComplaintOut.model_fields[name].annotation, ComplaintOut.model_fields[name]) for name in fields},
+    )
+    return TypeAdapter(List[partial])
+
+
+class ComplaintNearbyOut(ComplaintOut):
+    distance_m: float
+
+
+class MapCluster(BaseModel):
+    latitude: float
+    longitude: float
+    count: int
+    worst_priority: int
+    worst_priority_label: str
+
+
+class ComplaintSearchResult(ComplaintOut):
+    rank: float
+    snippet: Optional[str] = None
+
+
 class ComplaintDetailOut(ComplaintOut):
     activities: List[ComplaintActivityOut] = Field(default_factory=list)
     updates: List[ComplaintProgressUpdateOut] = Field(default_factory=list)
 
 
+class ComplaintBatchItem(BaseModel):
+    """One entry of a multi-get: either the complaint or the error its single GET would return."""
+    id: int
+    status_code: int
+    complaint: Optional[ComplaintDetailOut] = None
+    detail: Optional[str] = None
+
+
+class BulkItemResult(BaseModel):
+    id: int
+    success: bool
+    detail: Optional[str] = None
+
+
+class BulkActionOut(BaseModel):
+    updated: int
+    failed: int
+    results: List[BulkItemResult] = Field(default_factory=list)
+
+
 class WardStat(BaseModel):
     ward: str
     total: int
@@ -1,6 +1,10 @@
+import asyncio
 import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict
+from typing import Any, Callable, Dict
 
 import bcrypt
 import jwt
@@ -11,15 +15,103 @@ JWT_ALGORITHM = "HS256"
 ACCESS_TOKEN_MINUTES = int(os.getenv("ACCESS_TOKEN_MINUTES", "30"))
 REFRESH_TOKEN_DAYS = int(os.getenv("REFRESH_TOKEN_DAYS", "7"))
 
+# bcrypt runs on its own small pool (it releases the GIL, so threads use every core) instead
+# of on whichever request thread asked. At most PASSWORD_HASH_WORKERS hashes run at once and
+# PASSWORD_HASH_QUEUE more may wait; beyond that the request is rejected with 503 right away.
+# The auth routes await the *_async variants, so a waiting login holds no request thread;
+# the blocking hash_password/verify_password are for scripts, seeding and tests.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", "16"))
 
-def hash_password(password: str) -> str:
+_hash_pool = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE)
+_stats_lock = threading.Lock()
+_stats = {"queued": 0, "running": 0, "completed": 0, "rejected": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0}
+
+
+def _timed(fn: Callable, args: tuple, submitted: float):
+    waited = time.perf_counter() - submitted
+    with _stats_lock:
+        _stats["queued"] -= 1
+        _stats["running"] += 1
+        _stats["wait_seconds"] += waited
+        _stats["max_wait_seconds"] = max(_stats["max_wait_seconds"], waited)
+    try:
+        return fn(*args)
+    finally:
+        with _stats_lock:
+            _stats["running"] -= 1
+            _stats["completed"] += 1
+
+
+def _submit_hashing(fn: Callable, *args) -> Future:
+    """Queues `fn` on the bcrypt pool; 503 when the pool's queue is full."""
+    if not _hash_slots.acquire(blocking=False):
+        with _stats_lock:
+            _stats["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-in requests right now. Please try again shortly.",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        with _stats_lock:
+            _stats["queued"] += 1
+        future = _hash_pool.submit(_timed, fn, args, time.perf_counter())
+    except BaseException:
+        _hash_slots.release()
+        raise
+    # Released when the hash finishes, even if the awaiting request was cancelled
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return future
+
+
+def _run_hashing(fn: Callable, *args):
+    """Runs `fn` on the bcrypt pool and blocks the calling thread until it is done."""
+    return _submit_hashing(fn, *args).result()
+
+
+def password_hashing_stats() -> Dict[str, Any]:
+    """Queue depth and counters of the bcrypt pool, for the health endpoint."""
+    with _stats_lock:
+        stats = dict(_stats)
+    started = stats["completed"] + stats["running"]
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "max_queue": PASSWORD_HASH_QUEUE,
+        "queued": stats["queued"],
+        "running": stats["running"],
+        "completed": stats["completed"],
+        "rejected": stats["rejected"],
+        "avg_wait_ms": round(stats["wait_seconds"] / started * 1000, 2) if started else 0.0,
+        "max_wait_ms": round(stats["max_wait_seconds"] * 1000, 2),
+    }
+
+
+def _hashpw(password: str) -> str:
     return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
 
 
-def verify_password(password: str, password_hash: str) -> bool:
+def _checkpw(password: str, password_hash: str) -> bool:
     return bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8"))
 
 
+def hash_password(password: str) -> str:
+    return _run_hashing(_hashpw, password)
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    return _run_hashing(_checkpw, password, password_hash)
+
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.wrap_future(_submit_hashing(_hashpw, password))
+
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    return await asyncio.wrap_future(_submit_hashing(_checkpw, password, password_hash))
+
+
 def _build_token(payload: Dict[str, Any], expires_delta: timedelta) -> str:
     expire_at = datetime.now(timezone.utc) + expires_delta
     data = {**payload, "exp": expire_at}
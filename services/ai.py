@@ -6,7 +6,7 @@ This module is isolated to ensure data-processing workload doesn't intermingle w
 import math
 import re
 from collections import Counter
-from typing import Iterable, Tuple
+from typing import Iterable, Optional, Tuple
 
 STOP_WORDS = {
     "a",
@@ -129,6 +129,25 @@ CATEGORY_TO_DEPARTMENT = {
     "Waste": "Sanitation",
 }
 
+# Words too generic to identify a department on their own
+_GENERIC_DEPARTMENT_WORDS = {
+    "public",
+    "general",
+    "administration",
+    "department",
+    "dept",
+    "board",
+    "office",
+    "division",
+    "municipal",
+}
+
+# Lookup of every alias and canonical department name (case-insensitive)
+_DEPARTMENT_ALIASES = {
+    **{dept.lower(): dept for dept in CATEGORY_TO_DEPARTMENT.values()},
+    **{alias.lower(): dept for alias, dept in CATEGORY_TO_DEPARTMENT.items()},
+}
+
 HIGH_URGENCY_KEYWORDS = {
     "fire",
     "flood",
@@ -213,6 +232,20 @@ def predict_priority(title: str, description: str) -> Tuple[int, str]:
     return 1, "Low"
 
 
+# Display label for each integer priority level
+PRIORITY_LABELS = {0: "Low", 1: "Medium", 2: "High", 3: "Urgent", 4: "Critical", 5: "Emergency"}
+# Community escalation: +1 priority level for every this many upvotes
+UPVOTES_PER_PRIORITY_LEVEL = 10
+
+
+def escalated_priority(baseline_priority: int, upvotes: int) -> int:
+    """
+    Priority after community escalation: the AI baseline plus one level
+    for every UPVOTES_PER_PRIORITY_LEVEL upvotes, capped at 5.
+    """
+    return min(5, baseline_priority + (upvotes or 0) // UPVOTES_PER_PRIORITY_LEVEL)
+
+
 def predict_category(title: str, description: str) -> Tuple[str, float]:
     """
     Predicts the appropriate civic category for a complaint using a weighted keyword-matching heuristic.
@@ -254,6 +287,46 @@ def predict_category(title: str, description: str) -> Tuple[str, float]:
     return best_match, confidence
 
 
+def _department_words(text: str) -> list[str]:
+    return [
+        word
+        for word in re.split(r"[^a-z0-9]", text.lower())
+        if len(word) >= 3
+        and word not in STOP_WORDS
+        and word not in _GENERIC_DEPARTMENT_WORDS
+    ]
+
+
+def resolve_department_key(name: Optional[str]) -> Optional[str]:
+    """
+    Maps a free-text department or category label (e.g. "Jal Board / Water Supply", "PWD & Roads")
+    onto a canonical department key such as "water_supply".
+    Exact aliases from CATEGORY_TO_DEPARTMENT win; otherwise the department sharing the most
+    words (with prefix/substring matching) is chosen. Unknown labels are keyed on themselves.
+    Resolved once at write time so officer filtering becomes an indexed equality.
+    """
+    if not name or not name.strip():
+        return None
+
+    canonical = _DEPARTMENT_ALIASES.get(name.strip().lower())
+    if canonical is None:
+        words = _department_words(name)
+        best_hits = 0
+        for alias, department in _DEPARTMENT_ALIASES.items():
+            hits = sum(
+                1
+                for alias_word in _department_words(alias)
+                for word in words
+                if alias_word in word or word in alias_word
+            )
+            if hits > best_hits:
+                canonical, best_hits = department, hits
+    if canonical is None:
+        canonical = name.strip()
+
+    return re.sub(r"[^a-z0-9]+", "_", canonical.lower()).strip("_")
+
+
 def calculate_impact_score(
     reports_count: int, priority: int, upvotes: int = 0
 ) -> float:
@@ -0,0 +1,64 @@
+"""
+Lightweight spatial indexing without PostGIS.
+Every complaint with coordinates gets an integer `geo_cell` on a fixed 0.01° grid
+(about 1.1 km north-south). A radius search becomes a handful of indexed BETWEEN ranges on
+that column plus a latitude/longitude bounding box, and only the survivors get the exact
+haversine distance check in Python. Works the same on Postgres and SQLite.
+"""
+import math
+from typing import List, Optional, Tuple
+
+EARTH_RADIUS_M = 6_371_000.0
+# Grid resolution: cells per degree on both axes
+CELLS_PER_DEGREE = 100
+# Number of longitude cells in one latitude row (360° * CELLS_PER_DEGREE)
+LNG_CELLS = 360 * CELLS_PER_DEGREE
+METERS_PER_DEGREE_LAT = math.pi * EARTH_RADIUS_M / 180.0
+
+
+def _lat_index(lat: float) -> int:
+    # Shifted to be non-negative, so truncation is floor (the migration backfill relies on it)
+    return int((lat + 90.0) * CELLS_PER_DEGREE)
+
+
+def _lng_index(lng: float) -> int:
+    return int((lng + 180.0) * CELLS_PER_DEGREE)
+
+
+def geo_cell(lat: Optional[float], lng: Optional[float]) -> Optional[int]:
+    """Grid cell id for a coordinate, or None when either part is missing."""
+    if lat is None or lng is None:
+        return None
+    return _lat_index(lat) * LNG_CELLS + min(_lng_index(lng), LNG_CELLS - 1)
+
+
+def bounding_box(lat: float, lng: float, radius_m: float) -> Tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lng, max_lng) enclosing the circle; clamped at the poles/antimeridian."""
+    dlat = radius_m / METERS_PER_DEGREE_LAT
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    dlng = dlat / cos_lat
+    return (
+        max(lat - dlat, -90.0),
+        min(lat + dlat, 90.0),
+        max(lng - dlng, -180.0),
+        min(lng + dlng, 180.0),
+    )
+
+
+def cell_ranges(min_lat: float, max_lat: float, min_lng: float, max_lng: float) -> List[Tuple[int, int]]:
+    """Inclusive geo_cell id ranges (one per grid row) covering the bounding box."""
+    lng_lo = min(_lng_index(min_lng), LNG_CELLS - 1)
+    lng_hi = min(_lng_index(max_lng), LNG_CELLS - 1)
+    return [
+        (row * LNG_CELLS + lng_lo, row * LNG_CELLS + lng_hi)
+        for row in range(_lat_index(min_lat), _lat_index(max_lat) + 1)
+    ]
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance in metres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
@@ -0,0 +1,59 @@
+"""
+Shared HTTP clients for outbound provider calls (Brevo email API).
+A module-level requests.post() opens a new TCP connection and TLS handshake per call; the
+pooled Session here keeps connections to each host alive and reuses them across calls and
+threads (the notification outbox workers share it).
+
+Tuning (environment):
+    HTTP_POOL_CONNECTIONS  distinct hosts kept in the pool          (default 4)
+    HTTP_POOL_MAXSIZE      keep-alive connections per host          (default 16)
+    HTTP_CONNECT_TIMEOUT   seconds to establish a connection        (default 5)
+    HTTP_READ_TIMEOUT      seconds to wait for the response         (default 15)
+"""
+import os
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "4"))
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "16"))
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "15"))
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+
+
+def get_session() -> requests.Session:
+    """The process-wide pooled Session (created on first use)."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session = requests.Session()
+                # No automatic retries: the notification outbox owns retry and backoff
+                adapter = HTTPAdapter(
+                    pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=0
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    """requests.post() over the pooled Session, with the default timeouts unless given."""
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    return get_session().post(url, **kwargs)
+
+
+def close():
+    """Closes the pooled Session (a new one is created on next use)."""
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -0,0 +1,71 @@
+"""
+In-process background job registry.
+Lets long-running maintenance work (e.g. bulk complaint reassignment) run after the
+HTTP response has been sent, while the caller polls its progress through a job id.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+# Finished jobs are only kept around long enough to be polled
+MAX_TRACKED_JOBS = 500
+
+_jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def create_job(kind: str, **meta: Any) -> str:
+    """Registers a queued job and returns its opaque id."""
+    job_id = uuid.uuid4().hex
+    with _lock:
+        _jobs[job_id] = {
+            "job_id": job_id,
+            "kind": kind,
+            "status": "queued",
+            "result": None,
+            "error": None,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "finished_at": None,
+            **meta,
+        }
+        while len(_jobs) > MAX_TRACKED_JOBS:
+            _jobs.popitem(last=False)
+    return job_id
+
+
+def _set(job_id: str, **fields: Any):
+    with _lock:
+        if job_id in _jobs:
+            _jobs[job_id].update(fields)
+
+
+def run_job(job_id: str, fn: Callable[..., Any], *args: Any, **kwargs: Any):
+    """
+    Executes `fn` and records its return value (or failure) against the job.
+    Intended to be scheduled through FastAPI's BackgroundTasks.
+    """
+    _set(job_id, status="running")
+    try:
+        result = fn(*args, **kwargs)
+    except Exception as exc:
+        _set(
+            job_id,
+            status="failed",
+            error=str(exc),
+            finished_at=datetime.now(timezone.utc).isoformat(),
+        )
+        raise
+    _set(
+        job_id,
+        status="completed",
+        result=result,
+        finished_at=datetime.now(timezone.utc).isoformat(),
+    )
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    with _lock:
+        job = _jobs.get(job_id)
+        return dict(job) if job else None
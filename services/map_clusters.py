@@ -0,0 +1,186 @@
+"""
+Precomputed multi-resolution grid for zoomed-out map views.
+complaint_map_cells holds, per grid level, cell and priority, the number of open complaints
+and the sums of their coordinates. A viewport query then aggregates a few hundred cell rows
+instead of shipping every complaint, and yields counts, centroids and the worst priority.
+
+The grid is maintained incrementally: an after_flush listener moves a complaint's
+contribution whenever it is created, deleted or its location, priority, status or merge
+flag changes. Core UPDATE paths that bypass the ORM call record_change() themselves.
+Only the fine levels (STORED_LEVELS) are written. A coarse cell spans a whole city, so
+writing it would make every complaint write in the city wait on the same few rows; coarse
+views are aggregated from BASE_LEVEL cells when read instead.
+"""
+from collections import defaultdict
+from itertools import chain
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+
+from database import dialect_insert
+from models import Complaint, ComplaintMapCell
+
+# Cells per degree at each level: ~111 km, ~11 km, ~1.1 km and ~110 m cells
+LEVEL_CELLS_PER_DEGREE = (1, 10, 100, 1000)
+# Levels kept in complaint_map_cells; coarser ones are read from BASE_LEVEL
+STORED_LEVELS = (2, 3)
+BASE_LEVEL = STORED_LEVELS[0]
+# Resolved/closed work and merged duplicates are not drawn on the map
+CLOSED_STATUSES = ("Resolved", "Closed")
+# Upper bound on clusters returned for one viewport
+MAX_CLUSTERS = 2000
+
+_cells = ComplaintMapCell.__table__
+_TRACKED = ("latitude", "longitude", "priority", "status", "is_merged")
+
+
+class Contribution(NamedTuple):
+    lat: float
+    lng: float
+    priority: int
+
+
+def contribution(
+    latitude: Optional[float],
+    longitude: Optional[float],
+    priority: Optional[int],
+    status: Optional[str],
+    is_merged: Optional[bool],
+) -> Optional[Contribution]:
+    """What a complaint adds to the grid, or None if it is not shown on the map."""
+    if latitude is None or longitude is None or is_merged or status in CLOSED_STATUSES:
+        return None
+    return Contribution(latitude, longitude, priority or 0)
+
+
+def cell_index(lat: float, lng: float, level: int) -> Tuple[int, int]:
+    cells = LEVEL_CELLS_PER_DEGREE[level]
+    # Shifted to be non-negative, so truncation is floor (matches the migration backfill)
+    return int((lat + 90.0) * cells), int((lng + 180.0) * cells)
+
+
+def level_for_zoom(zoom: int) -> int:
+    """Grid level for a web-map zoom level (0 = whole world, ~18 = street)."""
+    if zoom <= 7:
+        return 0
+    if zoom <= 10:
+        return 1
+    if zoom <= 13:
+        return 2
+    return 3
+
+
+def apply(connection, changes: Iterable[Tuple[Optional[Contribution], int]]):
+    """Adds each (contribution, +1/-1) to every stored level of the grid in one upsert."""
+    deltas: Dict[Tuple[int, int, int, int], List[float]] = defaultdict(lambda: [0, 0.0, 0.0])
+    for point, sign in changes:
+        if point is None:
+            continue
+        for level in STORED_LEVELS:
+            ilat, ilng = cell_index(point.lat, point.lng, level)
+            delta = deltas[(level, ilat, ilng, point.priority)]
+            delta[0] += sign
+            delta[1] += sign * point.lat
+            delta[2] += sign * point.lng
+
+    values = [
+        {
+            "level": level, "ilat": ilat, "ilng": ilng, "priority": priority,
+            "count": count, "sum_lat": sum_lat, "sum_lng": sum_lng,
+        }
+        for (level, ilat, ilng, priority), (count, sum_lat, sum_lng) in sorted(deltas.items())
+        if count
+    ]
+    if not values:
+        return
+    stmt = dialect_insert(connection, _cells).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[_cells.c.level, _cells.c.ilat, _cells.c.ilng, _cells.c.priority],
+        set_={
+            "count": _cells.c.count + stmt.excluded.count,
+            "sum_lat": _cells.c.sum_lat + stmt.excluded.sum_lat,
+            "sum_lng": _cells.c.sum_lng + stmt.excluded.sum_lng,
+        },
+    )
+    connection.execute(stmt)
+
+
+def record_change(db: Session, before: Optional[Contribution], after: Optional[Contribution]):
+    """For Core UPDATE paths: moves one complaint's contribution from `before` to `after`."""
+    if before != after:
+        apply(db.connection(), [(before, -1), (after, 1)])
+
+
+def _committed(complaint: Complaint) -> Optional[Contribution]:
+    # Attribute values as of the last load/flush (history is still pre-flush in after_flush)
+    attrs = inspect(complaint).attrs
+    values = []
+    for name in _TRACKED:
+        history = attrs[name].history
+        if history.deleted:
+            values.append(history.deleted[0])
+        elif history.unchanged:
+            values.append(history.unchanged[0])
+        else:
+            values.append(getattr(complaint, name))
+    return contribution(*values)
+
+
+def _current(complaint: Complaint) -> Optional[Contribution]:
+    return contribution(*(getattr(complaint, name) for name in _TRACKED))
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_complaints(session, flush_context):
+    changes = []
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if not isinstance(obj, Complaint):
+            continue
+        if obj in session.new:
+            before, after = None, _current(obj)
+        elif obj in session.deleted:
+            before, after = _committed(obj), None
+        else:
+            before, after = _committed(obj), _current(obj)
+        if before != after:
+            changes.extend(((before, -1), (after, 1)))
+    if changes:
+        apply(session.connection(), changes)
+
+
+def clusters(
+    db: Session, level: int, min_lat: float, max_lat: float, min_lng: float, max_lng: float
+) -> list:
+    """
+    Aggregated cells intersecting the viewport at `level`:
+    rows of (count, sum_lat, sum_lng, worst_priority), largest clusters first.
+    Levels coarser than BASE_LEVEL group BASE_LEVEL cells by their coarse cell.
+    """
+    source = max(level, BASE_LEVEL)
+    factor = LEVEL_CELLS_PER_DEGREE[source] // LEVEL_CELLS_PER_DEGREE[level]
+    low_lat, low_lng = cell_index(min_lat, min_lng, level)
+    high_lat, high_lng = cell_index(max_lat, max_lng, level)
+    ilat, ilng = ComplaintMapCell.ilat, ComplaintMapCell.ilng
+    if factor > 1:
+        # Non-negative indexes, so integer division is the coarse cell
+        ilat, ilng = ilat // factor, ilng // factor
+    total = func.sum(ComplaintMapCell.count)
+    return (
+        db.query(
+            total.label("count"),
+            func.sum(ComplaintMapCell.sum_lat).label("sum_lat"),
+            func.sum(ComplaintMapCell.sum_lng).label("sum_lng"),
+            func.max(ComplaintMapCell.priority).label("worst_priority"),
+        )
+        .filter(
+            ComplaintMapCell.level == source,
+            ComplaintMapCell.ilat.between(low_lat * factor, (high_lat + 1) * factor - 1),
+            ComplaintMapCell.ilng.between(low_lng * factor, (high_lng + 1) * factor - 1),
+            ComplaintMapCell.count > 0,
+        )
+        .group_by(ilat, ilng)
+        .order_by(total.desc())
+        .limit(MAX_CLUSTERS)
+        .all()
+    )
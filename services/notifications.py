@@ -1,37 +1,47 @@
 import logging
 import os
+import re
 import requests
 import json
+from html import escape, unescape
+from string import Formatter
+
 from dotenv import load_dotenv
 
+from logging_config import PREVIEW_LOGGER
+from services import http_client
+
 load_dotenv()
 
 BREVO_API_KEY = os.getenv("BREVO_API_KEY", "")
 BREVO_SENDER_EMAIL = os.getenv("BREVO_SENDER_EMAIL", os.getenv("GMAIL_USER", "jansetu.notifications@gmail.com"))
+BREVO_API_URL = os.getenv("BREVO_API_URL", "https://api.brevo.com/v3/smtp/email")
+# Brevo accepts at most this many messageVersions in one send
+BREVO_MAX_VERSIONS = 1000
 
 logger = logging.getLogger(__name__)
+# Simulated deliveries (no provider configured); LOG_LEVELS=JanSetu.preview=WARNING hides them
+preview_logger = logging.getLogger(PREVIEW_LOGGER)
+
+
+class NotificationError(Exception):
+    """A provider rejected or failed a delivery; the outbox retries it later."""
 
 # ────────────────────────────────────────────────────
 # EMAIL OTP SENDER (Brevo API — Works on Render)
 # ────────────────────────────────────────────────────
 
-def send_otp_email(to_email: str, otp_code: str):
-    """
-    Sends a professional HTML OTP email via Brevo REST API.
-    Works on Render because it uses Port 443 (HTTPS), not SMTP.
-    """
+def _otp_email_request(to_email: str, otp_code: str):
+    """Headers and JSON body of the Brevo call for an OTP email, or None without an API key."""
     if not BREVO_API_KEY:
-        # Fallback: Print to console for dev testing if no API key
-        print("\n" + "█" * 60)
-        print("🚨  BREVO API KEY MISSING: OTP FALLBACK LOG")
-        print("█" * 60)
-        print(f"  TARGET EMAIL : {to_email}")
-        print(f"  OTP CODE     : {otp_code}")
-        print("█" * 60 + "\n")
-        return True
+        # Fallback: log the code for dev testing if no API key
+        preview_logger.info(
+            "🚨  BREVO API KEY MISSING: OTP FALLBACK LOG\n  TARGET EMAIL : %s\n  OTP CODE     : %s",
+            to_email, otp_code,
+            extra={"channel": "otp_email", "to": to_email},
+        )
+        return None
 
-    url = "https://api.brevo.com/v3/smtp/email"
-    
     headers = {
         "accept": "application/json",
         "content-type": "application/json",
@@ -71,29 +81,47 @@ def send_otp_email(to_email: str, otp_code: str):
         "htmlContent": html_content
     }
 
+    return headers, json.dumps(payload)
+
+
+def _check_brevo_response(status_code: int, text: str, to_email: str, what: str = "OTP email"):
+    if status_code not in (200, 201, 202):
+        logger.error(f"Brevo API Error: {text}")
+        raise NotificationError(f"Brevo API returned {status_code}")
+    logger.info(f"{what} sent successfully to {to_email} via Brevo")
+
+
+def _post_brevo(payload: dict, to_email: str, what: str):
+    headers = {
+        "accept": "application/json",
+        "content-type": "application/json",
+        "api-key": BREVO_API_KEY
+    }
     try:
-        response = requests.post(url, headers=headers, data=json.dumps(payload), timeout=15)
-        if response.status_code in [201, 200, 202]:
-            logger.info(f"OTP email sent successfully to {to_email} via Brevo")
-            return True
-        else:
-            logger.error(f"Brevo API Error: {response.text}")
-            # Fallback to logs if API fails
-            raise Exception(f"Brevo API returned {response.status_code}")
-            
-    except Exception as e:
-        logger.warning(f"Brevo API failed: {e}")
-        # FALLBACK: Print to Render console so developer can still see it
-        print("\n" + "█" * 60)
-        print("🚨  BREVO API FAILED: OTP FALLBACK LOG")
-        print("█" * 60)
-        print(f"  TARGET EMAIL : {to_email}")
-        print(f"  OTP CODE     : {otp_code}")
-        print(f"  ERROR        : {str(e)}")
-        print("█" * 60 + "\n")
-        return True
+        response = http_client.post(BREVO_API_URL, headers=headers, data=json.dumps(payload))
+    except requests.RequestException as e:
+        raise NotificationError(f"Brevo API unreachable: {e}") from e
+    _check_brevo_response(response.status_code, response.text, to_email, what)
 
 
+def send_otp_email(to_email: str, otp_code: str):
+    """
+    Sends a professional HTML OTP email via Brevo REST API.
+    Works on Render because it uses Port 443 (HTTPS), not SMTP.
+    Goes through the shared keep-alive pool, so bursts reuse warm connections.
+    Called by the notification outbox workers, never from a request: raises
+    NotificationError on failure so the delivery is retried.
+    """
+    request = _otp_email_request(to_email, otp_code)
+    if request is None:
+        return True
+    headers, body = request
+    try:
+        response = http_client.post(BREVO_API_URL, headers=headers, data=body)
+    except requests.RequestException as e:
+        raise NotificationError(f"Brevo API unreachable: {e}") from e
+    _check_brevo_response(response.status_code, response.text, to_email)
+    return True
 
 
 # ─────────────────────────────────────────────────────────
@@ -115,29 +143,47 @@ def _sms_body(event: str, title: str, extra: str = "") -> str:
 
 def send_sms(phone: str, message: str, event: str = "generic", title: str = "", extra: str = ""):
     """
-    Simulation Mode: Print the SMS to the backend terminal log.
+    Simulation Mode: Log the SMS as a preview.
     In production, replace this with a Twilio / MSG91 API call.
     If `event` and `title` are provided, uses a structured template.
     Otherwise uses the raw `message` string.
     """
+    if not preview_logger.isEnabledFor(logging.INFO):
+        return
     body = _sms_body(event, title, extra) if (event != "generic" or title) else message
-
-    print("\n" + "═" * 55)
-    print("📱  JanSetu SMS NOTIFICATION")
-    print("═" * 55)
-    print(f"  To      : +91 {phone}")
-    print("  From    : JanSetu (VMID: NIC-JANSETU)")
-    print(f"  Message : {body}")
-    print("═" * 55 + "\n")
+    preview_logger.info(
+        "📱  JanSetu SMS NOTIFICATION\n  To      : +91 %s\n  From    : JanSetu (VMID: NIC-JANSETU)\n  Message : %s",
+        phone, body,
+        extra={"channel": "sms", "to": phone},
+    )
 
 
 # ─────────────────────────────────────────────────────────
 # EMAIL TEMPLATES (HTML)
 # ─────────────────────────────────────────────────────────
 
-def _email_html(subject: str, citizen_name: str, body_lines: list[str]) -> str:
-    body_html = "".join(f"<p style='margin:6px 0;color:#374151;'>{line}</p>" for line in body_lines)
-    return f"""<!DOCTYPE html>
+class _CompiledTemplate:
+    """
+    A str.format-style template parsed once into literal chunks and field names.
+    render() only joins the chunks with the values, so the ~2 KB layout is never rebuilt
+    or re-parsed per email. Values are inserted verbatim (braces in them are not fields).
+    """
+    __slots__ = ("_parts",)
+
+    def __init__(self, source: str):
+        self._parts = tuple((literal, field) for literal, field, _, _ in Formatter().parse(source))
+
+    def render(self, **values) -> str:
+        out = []
+        for literal, field in self._parts:
+            out.append(literal)
+            if field is not None:
+                out.append(values[field])
+        return "".join(out)
+
+
+# Layout and status bodies are compiled once at import; a render is a join of precomputed chunks
+_EMAIL_LAYOUT = _CompiledTemplate("""<!DOCTYPE html>
 <html lang="en">
 <head>
   <meta charset="UTF-8" />
@@ -189,44 +235,90 @@ def _email_html(subject: str, citizen_name: str, body_lines: list[str]) -> str:
     </tr>
   </table>
 </body>
-</html>"""
+</html>""")
+_PARAGRAPH = "<p style='margin:6px 0;color:#374151;'>{}</p>"
+_PREVIEW_TAG = re.compile(r"<[^>]+>")
+_PREVIEW_MARKUP = (("<strong>", "**"), ("</strong>", "**"), ("<br/>", ""), ("<em>", "_"), ("</em>", "_"))
+
+
+def _paragraphs(body_lines) -> str:
+    return "".join(_PARAGRAPH.format(line) for line in body_lines)
 
 
 STATUS_EMAIL_BODIES = {
-    "registered": lambda title: [
-        f"Your complaint <strong>'{title}'</strong> has been <span style='color:#2563eb;font-weight:700;'>successfully registered</span> in the JanSetu portal.",
+    "registered": (
+        "Your complaint <strong>'{title}'</strong> has been <span style='color:#2563eb;font-weight:700;'>successfully registered</span> in the JanSetu portal.",
         "Our AI system is currently categorizing your report and assigning it to the relevant department.",
         "You will receive further notifications as its status progresses.",
         "<br/><em>Please note your Ticket ID from the JanSetu app for future reference.</em>",
-    ],
-    "in_progress": lambda title: [
-        f"Great news! Your complaint <strong>'{title}'</strong> is now <span style='color:#d97706;font-weight:700;'>IN PROGRESS</span>.",
+    ),
+    "in_progress": (
+        "Great news! Your complaint <strong>'{title}'</strong> is now <span style='color:#d97706;font-weight:700;'>IN PROGRESS</span>.",
         "A member of the relevant department is actively working on resolving this issue.",
         "You will be notified again once it is marked as Resolved.",
-    ],
-    "assigned": lambda title: [
-        f"Your complaint <strong>'{title}'</strong> has been <span style='color:#7c3aed;font-weight:700;'>ASSIGNED</span> to the appropriate officer.",
+    ),
+    "assigned": (
+        "Your complaint <strong>'{title}'</strong> has been <span style='color:#7c3aed;font-weight:700;'>ASSIGNED</span> to the appropriate officer.",
         "Work will begin shortly. You can track live progress in your JanSetu dashboard.",
-    ],
-    "resolved": lambda title: [
-        f"Your complaint <strong>'{title}'</strong> has been marked as <span style='color:#059669;font-weight:700;'>RESOLVED</span> by the assigned officer.",
+    ),
+    "resolved": (
+        "Your complaint <strong>'{title}'</strong> has been marked as <span style='color:#059669;font-weight:700;'>RESOLVED</span> by the assigned officer.",
         "Please open your JanSetu portal and verify if the issue has been fixed to your satisfaction.",
         "You may click <strong>Verify &amp; Close</strong> to confirm, or <strong>Reject &amp; Re-Escalate</strong> if the problem persists.",
-    ],
-    "closed": lambda title: [
-        f"Your complaint <strong>'{title}'</strong> has been officially <span style='color:#16a34a;font-weight:700;'>CLOSED</span>.",
+    ),
+    "closed": (
+        "Your complaint <strong>'{title}'</strong> has been officially <span style='color:#16a34a;font-weight:700;'>CLOSED</span>.",
         "Thank you for using JanSetu and helping us build a smarter, cleaner civic environment.",
         "Your feedback matters. You may rate the resolution from within the JanSetu app.",
-    ],
-    "rejected": lambda title: [
-        f"We acknowledge your rejection of the resolution for <strong>'{title}'</strong>.",
+    ),
+    "rejected": (
+        "We acknowledge your rejection of the resolution for <strong>'{title}'</strong>.",
         "The ticket has been <span style='color:#dc2626;font-weight:700;'>RE-ESCALATED</span> with a higher priority level.",
         "Officers have been notified and are expected to respond with urgency.",
         "We apologize for the inconvenience and assure you of prompt action.",
-    ],
+    ),
+}
+
+
+# event -> (template of each line for the preview, template of the whole body)
+_STATUS_TEMPLATES = {
+    event: (tuple(_CompiledTemplate(line) for line in lines), _CompiledTemplate(_paragraphs(lines)))
+    for event, lines in STATUS_EMAIL_BODIES.items()
 }
 
 
+def render_email(
+    subject: str,
+    message: str,
+    event: str = "generic",
+    title: str = "",
+    citizen_name: str = "Citizen",
+) -> tuple[str, list[str]]:
+    """
+    Returns (html, body_lines) for an email; status events render from precompiled templates.
+    `subject`, `title` and `citizen_name` are plain text and escaped here; `message` is HTML,
+    so callers escape any user text they put in it.
+    """
+    if event in _STATUS_TEMPLATES and title:
+        line_templates, body_template = _STATUS_TEMPLATES[event]
+        title = escape(title)
+        body_lines = [line.render(title=title) for line in line_templates]
+        body_html = body_template.render(title=title)
+    else:
+        body_lines = [line for line in message.split("\n") if line.strip()]
+        body_html = _paragraphs(body_lines)
+    html = _EMAIL_LAYOUT.render(
+        subject=escape(subject), citizen_name=escape(citizen_name), body_html=body_html
+    )
+    return html, body_lines
+
+
+def _preview_line(line: str) -> str:
+    for markup, plain in _PREVIEW_MARKUP:
+        line = line.replace(markup, plain)
+    return unescape(_PREVIEW_TAG.sub("", line))
+
+
 def send_email(
     email: str,
     subject: str,
@@ -236,31 +328,81 @@ def send_email(
     citizen_name: str = "Citizen",
 ):
     """
-    Simulation Mode: Print a formatted HTML email to the backend terminal log.
-    In production, replace this with SendGrid / Resend / SMTP.
+    Sends one HTML email through Brevo when BREVO_API_KEY is set (raising NotificationError
+    on failure, so the outbox retries it).
+    Simulation Mode (no API key): Log a plain-text preview of the email body.
     """
-    if event in STATUS_EMAIL_BODIES and title:
-        body_lines = STATUS_EMAIL_BODIES[event](title)
-    else:
-        body_lines = [line for line in message.split("\n") if line.strip()]
+    if BREVO_API_KEY:
+        html, _ = render_email(subject, message, event, title, citizen_name)
+        _post_brevo(
+            {
+                "sender": {"name": "JanSetu", "email": BREVO_SENDER_EMAIL},
+                "to": [{"email": email, "name": citizen_name}],
+                "subject": subject,
+                "htmlContent": html,
+            },
+            email,
+            "Email",
+        )
+        return
+
+    if not preview_logger.isEnabledFor(logging.INFO):
+        return
+    _, body_lines = render_email(subject, message, event, title, citizen_name)
+    preview = "\n".join(f"  | {_preview_line(line)}" for line in body_lines)
+    preview_logger.info(
+        "📧  JanSetu EMAIL DISPATCHED\n  To      : %s\n  From    : no-reply@jansetu.gov.in\n"
+        "  Subject : %s\n  [HTML BODY PREVIEW]\n%s",
+        email, subject, preview,
+        extra={"channel": "email", "to": email, "subject": subject},
+    )
+
+
+def send_email_batch(messages: list[dict]):
+    """
+    Sends several emails (each a dict of send_email() arguments) with one Brevo call per
+    BREVO_MAX_VERSIONS messages: every recipient becomes a messageVersion carrying its own
+    subject and rendered HTML. Without an API key each message is simulated individually.
+    """
+    if not BREVO_API_KEY or len(messages) == 1:
+        for message in messages:
+            send_email(**message)
+        return
+
+    for start in range(0, len(messages), BREVO_MAX_VERSIONS):
+        versions = []
+        for message in messages[start:start + BREVO_MAX_VERSIONS]:
+            html, _ = render_email(
+                message["subject"],
+                message.get("message", ""),
+                message.get("event", "generic"),
+                message.get("title", ""),
+                message.get("citizen_name", "Citizen"),
+            )
+            versions.append({
+                "to": [{"email": message["email"], "name": message.get("citizen_name", "Citizen")}],
+                "subject": message["subject"],
+                "htmlContent": html,
+            })
+        _post_brevo(
+            {
+                "sender": {"name": "JanSetu", "email": BREVO_SENDER_EMAIL},
+                # Required defaults; every version overrides both
+                "subject": versions[0]["subject"],
+                "htmlContent": versions[0]["htmlContent"],
+                "messageVersions": versions,
+            },
+            f"{len(versions)} recipients",
+            "Batch email",
+        )
+
 
-    html = _email_html(subject, citizen_name, body_lines)
-
-    print("\n" + "═" * 70)
-    print("📧  JanSetu EMAIL DISPATCHED")
-    print("═" * 70)
-    print(f"  To      : {email}")
-    print("  From    : no-reply@jansetu.gov.in")
-    print(f"  Subject : {subject}")
-    print("  " + "─" * 66)
-    print("  [HTML BODY PREVIEW]")
-    for line in body_lines:
-        clean = line.replace("<strong>", "**").replace("</strong>", "**") \
-                    .replace("<br/>", "").replace("<em>", "_").replace("</em>", "_")
-        import re
-        clean = re.sub(r"<[^>]+>", "", clean)
-        print(f"  | {clean}")
-    print("  " + "─" * 66)
-    print("  | This is an automated notification. Do not reply.")
-    print("  | Secured by National Informatics Centre (NIC)")
-    print("═" * 70 + "\n")
+def status_digest(updates: list[tuple[str, str]]) -> tuple[str, str]:
+    """Subject and message of one email summarizing several (title, new status) updates."""
+    lines = [f"There have been {len(updates)} updates to your complaints:"]
+    lines += [
+        f"<strong>'{escape(title)}'</strong> is now <strong>{escape(status)}</strong>."
+        for title, status in updates
+    ]
+    lines.append("Open your JanSetu dashboard to track each of them.")
+    return f"🔔 {len(updates)} Complaint Updates — JanSetu", "\n".join(lines)
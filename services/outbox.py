@@ -0,0 +1,419 @@
+"""
+Transactional outbox for notifications.
+Request handlers never talk to the email provider. They enqueue() rows into
+notification_outbox inside their own transaction, so a message exists only if the change
+that triggered it committed. After commit a small worker pool delivers the rows concurrently.
+Failures are retried with exponential backoff, and a message that still fails after
+MAX_ATTEMPTS is dead-lettered (status "dead", last error kept) instead of retried forever.
+
+Status-change emails ("status_email") wait DIGEST_WINDOW_SECONDS before they are due. When
+the first one for a recipient comes due, every other waiting status email for that recipient
+is claimed with it and they go out as one digest. Email rows are delivered in batches of up
+to BATCH_SIZE recipients, each batch being one provider call (Brevo messageVersions).
+
+Delivered rows keep no payload (OTP codes must not sit in the table), nor do dead OTP rows.
+Sent rows are purged after OUTBOX_SENT_RETENTION_DAYS and dead ones after
+OUTBOX_DEAD_RETENTION_DAYS, at most once per PURGE_INTERVAL_SECONDS.
+
+Rows are claimed by pushing their next_attempt_at a lease into the future (with
+FOR UPDATE SKIP LOCKED on Postgres), so several processes can share the table and a worker
+that dies mid-delivery only delays its messages by one lease.
+"""
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import BackgroundTasks
+from sqlalchemy import delete, event, insert, update
+from sqlalchemy.orm import Session
+
+from models import NotificationOutbox
+from services import notifications
+
+PENDING = "pending"
+SENT = "sent"
+DEAD = "dead"
+
+OUTBOX_WORKERS = int(os.getenv("OUTBOX_WORKERS", "4"))
+POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "5.0"))
+MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "6"))
+# Retry n waits RETRY_BASE_SECONDS * 2**(n-1), capped at RETRY_MAX_SECONDS
+RETRY_BASE_SECONDS = float(os.getenv("OUTBOX_RETRY_BASE_SECONDS", "30"))
+RETRY_MAX_SECONDS = float(os.getenv("OUTBOX_RETRY_MAX_SECONDS", "3600"))
+# How long a claimed row stays invisible to other workers
+LEASE_SECONDS = 300
+# Status emails to one recipient within this window are merged into one digest email
+DIGEST_WINDOW_SECONDS = float(os.getenv("NOTIFICATION_DIGEST_WINDOW", "60"))
+# Emails per provider call
+BATCH_SIZE = min(int(os.getenv("OUTBOX_BATCH_SIZE", "50")), notifications.BREVO_MAX_VERSIONS)
+
+SENT_RETENTION_DAYS = float(os.getenv("OUTBOX_SENT_RETENTION_DAYS", "7"))
+DEAD_RETENTION_DAYS = float(os.getenv("OUTBOX_DEAD_RETENTION_DAYS", "30"))
+PURGE_INTERVAL_SECONDS = 3600
+
+# Kinds sent one message per call: kind -> callable(recipient, **payload) that raises on failure
+SENDERS: Dict[str, Callable] = {
+    "otp_email": notifications.send_otp_email,
+}
+# Kinds composed into emails and sent together through notifications.send_email_batch
+BATCHED_KINDS = ("email", "status_email")
+DIGEST_KINDS = ("status_email",)
+# Payloads cleared even when the message is dead-lettered
+SECRET_KINDS = ("otp_email",)
+
+logger = logging.getLogger("JanSetu")
+
+_ENQUEUED = "outbox_enqueued"
+_wake = threading.Event()
+_session_factory: Optional[Callable[[], Session]] = None
+_stop: Optional[threading.Event] = None
+_thread: Optional[threading.Thread] = None
+_last_purge: Optional[float] = None
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def enqueue(db: Session, kind: str, recipient: str, **payload):
+    """Adds one message to `db`'s transaction; it is delivered only if that transaction commits."""
+    enqueue_many(db, kind, [(recipient, payload)])
+
+
+def enqueue_many(db: Session, kind: str, messages: Iterable[Tuple[str, dict]]):
+    """
+    Adds several messages of one kind with a single INSERT.
+    Digestible kinds become due only after the digest window.
+    """
+    if kind not in SENDERS and kind not in BATCHED_KINDS:
+        raise ValueError(f"Unknown notification kind: {kind}")
+    now = _now()
+    if kind in DIGEST_KINDS:
+        now += timedelta(seconds=DIGEST_WINDOW_SECONDS)
+    rows = [
+        {
+            "kind": kind,
+            "recipient": recipient,
+            "payload": payload,
+            "status": PENDING,
+            "attempts": 0,
+            "next_attempt_at": now,
+        }
+        for recipient, payload in messages
+    ]
+    if rows:
+        db.execute(insert(NotificationOutbox), rows)
+        db.info[_ENQUEUED] = True
+
+
+def schedule(background_tasks: BackgroundTasks, session_factory: Callable[[], Session]):
+    """
+    Makes sure messages committed by this request get delivered. The worker pool is woken by
+    the commit itself; without a pool (tests, OUTBOX_WORKERS=0) the outbox is drained by a
+    background task once the response has been sent.
+    """
+    if not is_running():
+        background_tasks.add_task(drain, session_factory)
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_workers(session):
+    if session.info.pop(_ENQUEUED, False):
+        _wake.set()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_enqueued(session):
+    session.info.pop(_ENQUEUED, None)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS))
+
+
+def claim(db: Session, limit: int) -> List[List[int]]:
+    """
+    Leases up to `limit` due messages (plus the waiting status emails of the same recipients)
+    to the caller and returns them as delivery units: a one-id list per individually sent
+    message, one list per email batch. Commits.
+    """
+    now = _now()
+    due = (
+        db.query(NotificationOutbox.id, NotificationOutbox.kind, NotificationOutbox.recipient)
+        .filter(NotificationOutbox.status == PENDING, NotificationOutbox.next_attempt_at <= now)
+        .order_by(NotificationOutbox.next_attempt_at, NotificationOutbox.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    digest_recipients = {row.recipient for row in due if row.kind in DIGEST_KINDS}
+    if digest_recipients:
+        # Still inside their window and never attempted (so not leased by anyone else)
+        due += (
+            db.query(NotificationOutbox.id, NotificationOutbox.kind, NotificationOutbox.recipient)
+            .filter(
+                NotificationOutbox.status == PENDING,
+                NotificationOutbox.attempts == 0,
+                NotificationOutbox.next_attempt_at > now,
+                NotificationOutbox.kind.in_(DIGEST_KINDS),
+                NotificationOutbox.recipient.in_(digest_recipients),
+            )
+            .order_by(NotificationOutbox.id)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+    if due:
+        db.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id.in_([row.id for row in due]))
+            .values(
+                attempts=NotificationOutbox.attempts + 1,
+                next_attempt_at=now + timedelta(seconds=LEASE_SECONDS),
+            )
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+
+    units = [[row.id] for row in due if row.kind in SENDERS]
+    # Keep each recipient's rows in the same batch, so a digest is never split
+    by_recipient: Dict[str, List[int]] = defaultdict(list)
+    for row in due:
+        if row.kind in BATCHED_KINDS:
+            by_recipient[row.recipient].append(row.id)
+    batch: List[int] = []
+    for ids in by_recipient.values():
+        if batch and len(batch) + len(ids) > BATCH_SIZE:
+            units.append(batch)
+            batch = []
+        batch.extend(ids)
+    if batch:
+        units.append(batch)
+    return units
+
+
+def compose_emails(messages: List[NotificationOutbox]) -> List[dict]:
+    """
+    send_email() arguments for a batch of email rows: one email per plain message and one
+    per recipient for status emails, merged into a digest when there are several.
+    """
+    emails = []
+    status_updates: Dict[str, List[NotificationOutbox]] = defaultdict(list)
+    for message in messages:
+        if message.kind in DIGEST_KINDS:
+            status_updates[message.recipient].append(message)
+        else:
+            emails.append({"email": message.recipient, **message.payload})
+    for recipient, updates in status_updates.items():
+        if len(updates) == 1:
+            payload = dict(updates[0].payload)
+            payload.pop("status", None)
+            emails.append({"email": recipient, "message": "", **payload})
+            continue
+        subject, text = notifications.status_digest(
+            [(update.payload["title"], update.payload["status"]) for update in updates]
+        )
+        emails.append({
+            "email": recipient,
+            "subject": subject,
+            "message": text,
+            "citizen_name": updates[0].payload.get("citizen_name", "Citizen"),
+        })
+    return emails
+
+
+def deliver(session_factory: Callable[[], Session], message_ids: List[int]):
+    """
+    Sends one delivery unit from claim() and records the outcome on each of its rows:
+    sent, retry later, or dead. A batch is one provider call; if it fails, each recipient's
+    emails are re-sent on their own, so only the recipients that still fail are retried.
+    """
+    db = session_factory()
+    try:
+        messages = (
+            db.query(NotificationOutbox)
+            .filter(NotificationOutbox.id.in_(message_ids), NotificationOutbox.status == PENDING)
+            .order_by(NotificationOutbox.id)
+            .all()
+        )
+        if not messages:
+            return
+        try:
+            _send(messages)
+        except Exception as e:
+            by_recipient: Dict[str, List[NotificationOutbox]] = defaultdict(list)
+            for message in messages:
+                by_recipient[message.recipient].append(message)
+            if len(by_recipient) == 1:
+                _record_failure(messages, e)
+            else:
+                logger.warning(
+                    f"Batch of {len(messages)} notifications failed ({e}); "
+                    f"sending to its {len(by_recipient)} recipients one by one"
+                )
+                for recipient_messages in by_recipient.values():
+                    try:
+                        _send(recipient_messages)
+                    except Exception as recipient_error:
+                        _record_failure(recipient_messages, recipient_error)
+                    else:
+                        _record_sent(recipient_messages)
+        else:
+            _record_sent(messages)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _send(messages: List[NotificationOutbox]):
+    if len(messages) == 1 and messages[0].kind in SENDERS:
+        SENDERS[messages[0].kind](messages[0].recipient, **messages[0].payload)
+    else:
+        notifications.send_email_batch(compose_emails(messages))
+
+
+def _record_sent(messages: List[NotificationOutbox]):
+    sent_at = _now()
+    for message in messages:
+        message.status = SENT
+        message.sent_at = sent_at
+        message.last_error = None
+        message.payload = {}
+
+
+def _record_failure(messages: List[NotificationOutbox], error: Exception):
+    for message in messages:
+        message.last_error = str(error)[:500]
+        if message.attempts >= MAX_ATTEMPTS:
+            message.status = DEAD
+            if message.kind in SECRET_KINDS:
+                message.payload = {}
+            logger.error(
+                f"Notification {message.id} ({message.kind} to {message.recipient}) "
+                f"dead-lettered after {message.attempts} attempts: {error}"
+            )
+        else:
+            message.next_attempt_at = _now() + retry_delay(message.attempts)
+            logger.warning(f"Notification {message.id} failed (attempt {message.attempts}): {error}")
+
+
+def purge(db: Session) -> int:
+    """Deletes sent and dead messages past their retention; returns how many. Commits."""
+    now = _now()
+    deleted = db.execute(
+        delete(NotificationOutbox)
+        .where(
+            NotificationOutbox.status == SENT,
+            NotificationOutbox.sent_at < now - timedelta(days=SENT_RETENTION_DAYS),
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    # A dead row's next_attempt_at is the lease of its last attempt
+    deleted += db.execute(
+        delete(NotificationOutbox)
+        .where(
+            NotificationOutbox.status == DEAD,
+            NotificationOutbox.next_attempt_at < now - timedelta(days=DEAD_RETENTION_DAYS),
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return deleted
+
+
+def _purge_if_due(session_factory: Callable[[], Session]):
+    global _last_purge
+    if _last_purge is not None and time.monotonic() - _last_purge < PURGE_INTERVAL_SECONDS:
+        return
+    _last_purge = time.monotonic()
+    db = session_factory()
+    try:
+        deleted = purge(db)
+    except Exception:
+        logger.exception("Outbox purge failed; retrying after the purge interval")
+        return
+    finally:
+        db.close()
+    if deleted:
+        logger.info(f"Purged {deleted} delivered or dead notifications from the outbox")
+
+
+def drain(session_factory: Callable[[], Session]) -> int:
+    """Delivers every message that is due right now, in this thread; returns how many were tried."""
+    _purge_if_due(session_factory)
+    tried = 0
+    while True:
+        db = session_factory()
+        try:
+            units = claim(db, BATCH_SIZE)
+        finally:
+            db.close()
+        if not units:
+            return tried
+        for unit in units:
+            deliver(session_factory, unit)
+            tried += len(unit)
+
+
+def is_running() -> bool:
+    return _thread is not None
+
+
+def start(
+    session_factory: Callable[[], Session],
+    workers: int = OUTBOX_WORKERS,
+    poll_interval: float = POLL_INTERVAL,
+):
+    """Starts the dispatcher thread and its worker pool. With workers <= 0 the pool stays off."""
+    global _session_factory, _stop, _thread
+    if _thread is not None or workers <= 0:
+        return
+    _session_factory = session_factory
+    _stop = threading.Event()
+    _thread = threading.Thread(
+        target=_run, args=(_stop, workers, poll_interval), name="outbox-dispatcher", daemon=True
+    )
+    _thread.start()
+
+
+def stop():
+    """Stops the dispatcher once in-flight deliveries finish; pending rows stay in the table."""
+    global _thread
+    if _thread is None:
+        return
+    _stop.set()
+    _wake.set()
+    _thread.join()
+    _thread = None
+
+
+def _run(stop_event: threading.Event, workers: int, poll_interval: float):
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="outbox-worker") as pool:
+        while not stop_event.is_set():
+            _wake.clear()
+            _purge_if_due(_session_factory)
+            try:
+                db = _session_factory()
+                try:
+                    units = claim(db, workers * BATCH_SIZE)
+                finally:
+                    db.close()
+            except Exception:
+                logger.exception("Outbox claim failed; retrying after the poll interval")
+                units = []
+            if units:
+                wait([pool.submit(_deliver_logged, unit) for unit in units])
+                continue
+            _wake.wait(poll_interval)
+
+
+def _deliver_logged(message_ids: List[int]):
+    try:
+        deliver(_session_factory, message_ids)
+    except Exception:
+        # The lease expires and the messages are claimed again
+        logger.exception(f"Outbox delivery of notifications {message_ids} crashed")
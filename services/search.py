@@ -0,0 +1,136 @@
+"""
+Full-text search over complaints.
+On Postgres each complaint carries a weighted `search_vector` tsvector backed by a GIN index.
+SQLite (local runs and tests) falls back to an FTS5 virtual table keyed by complaint id.
+Both indexes are refreshed explicitly whenever a complaint's title or description is written.
+
+Snippets are safe to render as HTML: the database marks matches with control characters,
+the user-written text is HTML-escaped, and only then are the markers turned into <b> tags.
+"""
+import html
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import DDL, column, event, func, literal_column, table, text, update
+from sqlalchemy.orm import Session
+
+from database import Base
+from models import Complaint
+
+FTS_TABLE = "complaints_fts"
+# Match markers as emitted by ts_headline()/snippet(), replaced after escaping
+SNIPPET_START = "\x02"
+SNIPPET_STOP = "\x03"
+
+# Keep the FTS5 table in step with create_all/drop_all (local SQLite databases and tests)
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+        "USING fts5(title, description, tokenize='porter unicode61')"
+    ).execute_if(dialect="sqlite"),
+)
+event.listen(
+    Base.metadata,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {FTS_TABLE}").execute_if(dialect="sqlite"),
+)
+
+_fts = table(FTS_TABLE, column("rowid"), column("title"), column("description"))
+
+
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+
+def pg_search_vector(title, description):
+    """Title matches outrank description matches."""
+    return func.setweight(
+        func.to_tsvector("english", func.coalesce(title, "")), "A"
+    ).op("||")(
+        func.setweight(func.to_tsvector("english", func.coalesce(description, "")), "B")
+    )
+
+
+def index_complaint(db: Session, complaint: Complaint):
+    """
+    Refreshes the search index entry for `complaint` inside the caller's transaction.
+    Must be called after the complaint has been flushed (its id is required). The text is
+    bound from the object, since edits made since the last flush are not in the row yet.
+    """
+    dialect = _dialect(db)
+    if dialect == "postgresql":
+        db.execute(
+            update(Complaint)
+            .where(Complaint.id == complaint.id)
+            .values(search_vector=pg_search_vector(complaint.title, complaint.description))
+            .execution_options(synchronize_session=False)
+        )
+    elif dialect == "sqlite":
+        db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": complaint.id})
+        db.execute(
+            text(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, description) "
+                "VALUES (:id, :title, :description)"
+            ),
+            {
+                "id": complaint.id,
+                "title": complaint.title or "",
+                "description": complaint.description or "",
+            },
+        )
+
+
+def _fts5_query(q: str) -> str:
+    # Quote every token so user input can never be parsed as FTS5 query syntax
+    tokens = re.findall(r"\w+", q.lower())
+    return " ".join(f'"{token}"' for token in tokens)
+
+
+def highlight(snippet: Optional[str]) -> Optional[str]:
+    """HTML-escapes a marked snippet and wraps its matches in <b>...</b>."""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(SNIPPET_START, "<b>").replace(SNIPPET_STOP, "</b>")
+
+
+def search_complaints(
+    db: Session, q: str, filters: list, limit: int
+) -> List[Tuple[Complaint, float, str]]:
+    """
+    Returns up to `limit` (complaint, rank, snippet) tuples matching `q`, best match first.
+    Snippets are HTML-escaped with matches in <b> tags.
+    `filters` carries the caller's role and ward scoping and is applied in the same query.
+    """
+    if _dialect(db) == "postgresql":
+        tsquery = func.plainto_tsquery("english", q)
+        rank = func.ts_rank_cd(Complaint.search_vector, tsquery)
+        snippet = func.ts_headline(
+            "english",
+            Complaint.description,
+            tsquery,
+            f"StartSel={SNIPPET_START}, StopSel={SNIPPET_STOP}, MaxWords=24, MinWords=8",
+        )
+        query = (
+            db.query(Complaint, rank.label("rank"), snippet.label("snippet"))
+            .filter(Complaint.search_vector.op("@@")(tsquery), *filters)
+            .order_by(rank.desc(), Complaint.id.desc())
+        )
+    else:
+        match = _fts5_query(q)
+        if not match:
+            return []
+        fts = literal_column(FTS_TABLE)
+        # bm25() is lower-is-better; negate it so both backends rank descending.
+        # Column weights mirror the A/B setweight() used on Postgres.
+        rank = func.bm25(fts, 4.0, 1.0)
+        snippet = func.snippet(fts, -1, SNIPPET_START, SNIPPET_STOP, "…", 16)
+        query = (
+            db.query(Complaint, (-rank).label("rank"), snippet.label("snippet"))
+            .join(_fts, _fts.c.rowid == Complaint.id)
+            .filter(fts.op("MATCH")(match), *filters)
+            .order_by(rank, Complaint.id.desc())
+        )
+
+    return [(row[0], float(row[1] or 0.0), highlight(row[2])) for row in query.limit(limit).all()]
@@ -0,0 +1,215 @@
+"""
+Write-behind buffer for complaint upvote counters.
+A viral complaint takes hundreds of votes a minute; applying each one to the `complaints` row
+makes every voter queue on the same row lock. While the buffer is running, the upvote route
+still records the ComplaintUpvote row (the source of truth), but only adds +1 to an in-process
+delta here. A daemon thread applies the accumulated deltas every FLUSH_INTERVAL seconds with
+a single UPDATE per complaint, recomputing priority and impact from the new total.
+The reporter's points (+5 per vote) are credited by the same flush, since every vote on a
+viral complaint would otherwise lock the same users row too.
+The flush sets each counter from COUNT(*) of the complaint's vote rows rather than adding the
+in-memory delta, and credits points for the difference to the stored counter, so deltas lost
+with the process (crash, redeploy) are made up by the complaint's next flush.
+Reads overlay the pending delta, so voters see their vote immediately.
+"""
+import logging
+import os
+import threading
+from typing import Callable, Dict, Iterable, Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from models import Complaint, ComplaintUpvote, User
+from services import map_clusters, user_cache, versions
+from services.ai import PRIORITY_LABELS, calculate_impact_score, escalated_priority, predict_priority
+
+FLUSH_INTERVAL = float(os.getenv("UPVOTE_FLUSH_INTERVAL", "2.0"))
+POINTS_PER_UPVOTE = 5
+
+logger = logging.getLogger("JanSetu")
+
+_pending: Dict[int, int] = {}
+# Deltas taken by a flush that has not committed yet; still overlaid on reads
+_inflight: Dict[int, int] = {}
+_lock = threading.Lock()
+# Serializes flushes (the interval thread vs. stop() or an explicit call)
+_flush_lock = threading.Lock()
+# Bumped on every buffered vote and flush; folded into list ETags while votes are pending
+_generation = 0
+_session_factory: Optional[Callable[[], Session]] = None
+_stop: Optional[threading.Event] = None
+_thread: Optional[threading.Thread] = None
+
+
+def is_running() -> bool:
+    return _thread is not None
+
+
+def start(session_factory: Callable[[], Session], interval: float = FLUSH_INTERVAL):
+    """Starts the flush thread. With interval <= 0 the buffer stays off (write-through)."""
+    global _session_factory, _stop, _thread
+    if _thread is not None or interval <= 0:
+        return
+    _session_factory = session_factory
+    _stop = threading.Event()
+    _thread = threading.Thread(
+        target=_run, args=(_stop, interval), name="upvote-buffer", daemon=True
+    )
+    _thread.start()
+
+
+def stop():
+    """Stops the flush thread and applies whatever is still pending."""
+    global _thread
+    if _thread is None:
+        return
+    _stop.set()
+    _thread.join()
+    _thread = None
+    flush()
+
+
+def _run(stop_event: threading.Event, interval: float):
+    while not stop_event.wait(interval):
+        try:
+            flush()
+        except Exception:
+            logger.exception("Upvote buffer flush failed; deltas kept for the next run")
+
+
+def add(complaint_id: int):
+    """Records one committed upvote for `complaint_id`."""
+    global _generation
+    with _lock:
+        _pending[complaint_id] = _pending.get(complaint_id, 0) + 1
+        _generation += 1
+
+
+def pending(complaint_id: int) -> int:
+    return _pending.get(complaint_id, 0) + _inflight.get(complaint_id, 0)
+
+
+def generation() -> int:
+    return _generation
+
+
+def overlay(complaints: Iterable[Complaint]):
+    """Adds pending deltas to loaded complaints without marking them dirty."""
+    if not (_pending or _inflight):
+        return
+    for complaint in complaints:
+        delta = pending(complaint.id)
+        if delta:
+            set_committed_value(complaint, "upvotes", (complaint.upvotes or 0) + delta)
+
+
+def overlay_rows(rows: Iterable[dict]):
+    """Same as overlay() for projected row dicts (rows without an upvotes column are skipped)."""
+    if not (_pending or _inflight):
+        return
+    for row in rows:
+        delta = pending(row.get("id"))
+        if delta and "upvotes" in row:
+            row["upvotes"] = (row["upvotes"] or 0) + delta
+
+
+def flush() -> int:
+    """
+    Applies all pending deltas in one transaction and returns how many complaints changed.
+    Rows are locked up front (SELECT ... FOR UPDATE, in id order), then every counter is
+    recounted from complaint_upvotes and each complaint gets one UPDATE.
+    On failure the deltas are merged back for the next attempt.
+    """
+    with _flush_lock:
+        return _flush()
+
+
+def _flush() -> int:
+    global _generation
+    with _lock:
+        if not _pending:
+            return 0
+        deltas = dict(_pending)
+        _pending.clear()
+        _inflight.update(deltas)
+
+    db = _session_factory()
+    try:
+        current = (
+            db.query(
+                Complaint.id,
+                Complaint.upvotes,
+                Complaint.reports_count,
+                Complaint.ai_baseline_priority,
+                Complaint.title,
+                Complaint.description,
+                Complaint.citizen_id,
+                Complaint.effective_ward_key,
+                Complaint.latitude,
+                Complaint.longitude,
+                Complaint.priority,
+                Complaint.status,
+                Complaint.is_merged,
+            )
+            .filter(Complaint.id.in_(deltas))
+            .order_by(Complaint.id)
+            .with_for_update()
+            .all()
+        )
+        vote_counts = dict(
+            db.query(ComplaintUpvote.complaint_id, func.count(ComplaintUpvote.id))
+            .filter(ComplaintUpvote.complaint_id.in_(deltas))
+            .group_by(ComplaintUpvote.complaint_id)
+            .all()
+        )
+        cell_changes = []
+        for row in current:
+            upvotes = vote_counts.get(row.id, 0)
+            new_votes = max(upvotes - (row.upvotes or 0), 0)
+            baseline = row.ai_baseline_priority
+            if baseline is None:
+                baseline, _ = predict_priority(row.title or "", row.description or "")
+            priority = escalated_priority(baseline, upvotes)
+            db.execute(
+                update(Complaint)
+                .where(Complaint.id == row.id)
+                .values(
+                    upvotes=upvotes,
+                    ai_baseline_priority=baseline,
+                    priority=priority,
+                    priority_label=PRIORITY_LABELS.get(priority, "Medium"),
+                    impact_score=calculate_impact_score(row.reports_count, priority, upvotes),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            if row.citizen_id and new_votes:
+                db.execute(
+                    update(User)
+                    .where(User.id == row.citizen_id)
+                    .values(points=User.points + POINTS_PER_UPVOTE * new_votes)
+                    .execution_options(synchronize_session=False)
+                )
+                user_cache.invalidate_after_commit(db, row.citizen_id)
+            cell_changes.extend(
+                (map_clusters.contribution(row.latitude, row.longitude, level_priority, row.status, row.is_merged), sign)
+                for level_priority, sign in ((row.priority, -1), (priority, 1))
+            )
+        map_clusters.apply(db.connection(), cell_changes)
+        versions.bump_complaint_rows(db, current)
+        db.commit()
+    except Exception:
+        db.rollback()
+        with _lock:
+            _inflight.clear()
+            for complaint_id, delta in deltas.items():
+                _pending[complaint_id] = _pending.get(complaint_id, 0) + delta
+        raise
+    finally:
+        db.close()
+
+    with _lock:
+        _inflight.clear()
+        _generation += 1
+    return len(current)
@@ -0,0 +1,113 @@
+"""
+Short-lived cache of authenticated users for get_current_user.
+The JWT is verified without the database, but every request still loaded its user row. Users
+are cached here by id, as plain column values, for TTL_SECONDS (LRU-bounded to MAX_ENTRIES);
+a hit is returned as a transient User that is not attached to any session.
+
+Any ORM flush that updates or deletes a User (password reset, profile edits, ...) invalidates
+that user once its transaction commits. Set-based UPDATEs (upvote point credits) and the
+account-status routes (officer approval, rejection, deletion, suspension) register their
+users explicitly with invalidate_after_commit(). Lookups that began before an invalidation
+do not store their (possibly stale) row.
+The cache is per process: with several workers, a suspension or deactivation takes effect
+on the other workers within USER_CACHE_TTL seconds, so keep that short for multi-worker
+deployments (0 disables the cache).
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import User
+
+TTL_SECONDS = float(os.getenv("USER_CACHE_TTL", "30"))
+MAX_ENTRIES = int(os.getenv("USER_CACHE_SIZE", "10000"))
+
+_COLUMNS = tuple(attr.key for attr in User.__mapper__.column_attrs)
+_INVALIDATED = "user_cache_invalidated"
+
+_entries: "OrderedDict[int, Tuple[float, Dict]]" = OrderedDict()
+_lock = threading.Lock()
+# Bumped by every invalidation; put() drops rows read before the latest one
+_generation = 0
+
+
+def generation() -> int:
+    return _generation
+
+
+def get(user_id: int) -> Optional[User]:
+    """A transient copy of the cached user, or None on a miss or an expired entry."""
+    if TTL_SECONDS <= 0:
+        return None
+    with _lock:
+        entry = _entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, values = entry
+        if expires_at < time.monotonic():
+            del _entries[user_id]
+            return None
+        _entries.move_to_end(user_id)
+    return User(**values)
+
+
+def put(user: User, read_generation: int):
+    """Caches `user`'s columns, unless an invalidation happened since `read_generation`."""
+    if TTL_SECONDS <= 0:
+        return
+    values = {key: getattr(user, key) for key in _COLUMNS}
+    with _lock:
+        if read_generation != _generation:
+            return
+        _entries[user.id] = (time.monotonic() + TTL_SECONDS, values)
+        _entries.move_to_end(user.id)
+        while len(_entries) > MAX_ENTRIES:
+            _entries.popitem(last=False)
+
+
+def invalidate(*user_ids: int):
+    global _generation
+    with _lock:
+        _generation += 1
+        for user_id in user_ids:
+            _entries.pop(user_id, None)
+
+
+def invalidate_after_commit(session: Session, *user_ids: int):
+    """Invalidates `user_ids` when `session` commits, for UPDATEs that bypass the ORM."""
+    session.info.setdefault(_INVALIDATED, set()).update(
+        user_id for user_id in user_ids if user_id
+    )
+
+
+def clear():
+    global _generation
+    with _lock:
+        _generation += 1
+        _entries.clear()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    changed = session.info.setdefault(_INVALIDATED, set())
+    for obj in session.dirty:
+        if isinstance(obj, User) and session.is_modified(obj, include_collections=False):
+            changed.add(obj.id)
+    changed.update(obj.id for obj in session.deleted if isinstance(obj, User))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    changed = session.info.pop(_INVALIDATED, None)
+    if changed:
+        invalidate(*changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session):
+    session.info.pop(_INVALIDATED, None)
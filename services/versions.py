@@ -0,0 +1,144 @@
+"""
+Change versions and ETags for conditional GETs.
+Every flush that touches a complaint (or its activities, progress updates or upvotes) bumps
+the version of the scopes that complaint appears in: the complaint itself, its ward feed and
+its reporter's list. Set-based statements that bypass the ORM bump GLOBAL_SCOPE instead,
+which is folded into every ETag. Unchanged resources then cost one lookup to revalidate.
+
+A ward or reporter scope row is shared by every complaint write in that ward, so those bumps
+are held back until the transaction commits (before_commit): the row is locked only for the
+commit itself rather than for the whole transaction. This includes upvotes: their counters,
+priority and impact appear on list pages, so they bump the same scopes as any other write.
+"""
+import hashlib
+from itertools import chain
+from typing import Iterable, List, Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from database import dialect_insert
+from models import Complaint, ComplaintActivity, ComplaintUpdate, ComplaintUpvote, FeedVersion
+
+GLOBAL_SCOPE = "global"
+_LIST_SCOPES = "versions_list_scopes"
+
+_versions = FeedVersion.__table__
+
+
+def complaint_scope(complaint_id: int) -> str:
+    return f"complaint:{complaint_id}"
+
+
+def ward_scope(key: Optional[str]) -> Optional[str]:
+    return f"ward:{key}" if key else None
+
+
+def citizen_scope(citizen_id: Optional[int]) -> Optional[str]:
+    return f"citizen:{citizen_id}" if citizen_id else None
+
+
+def bump(connection, scopes: Iterable[Optional[str]]):
+    """
+    Increments the version of each scope in one upsert.
+    Scopes are written in sorted order so concurrent transactions lock rows consistently.
+    """
+    values = [{"scope": scope, "version": 1} for scope in sorted({s for s in scopes if s})]
+    if not values:
+        return
+    stmt = dialect_insert(connection, _versions).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[_versions.c.scope],
+        set_={"version": _versions.c.version + 1},
+    )
+    connection.execute(stmt)
+
+
+def bump_global(db: Session):
+    """For bulk UPDATE/INSERT ... SELECT paths whose affected rows are not known individually."""
+    bump(db.connection(), [GLOBAL_SCOPE])
+
+
+def bump_complaint_rows(db: Session, rows):
+    """
+    For bulk statements over known complaints. `rows` need id, citizen_id and
+    effective_ward_key (e.g. the column rows the bulk endpoint already selected).
+    """
+    rows = list(rows)
+    bump(db.connection(), [complaint_scope(row.id) for row in rows])
+    _defer_list_scopes(
+        db, chain.from_iterable((citizen_scope(row.citizen_id), ward_scope(row.effective_ward_key)) for row in rows)
+    )
+
+
+def _defer_list_scopes(session: Session, scopes: Iterable[Optional[str]]):
+    session.info.setdefault(_LIST_SCOPES, set()).update(scope for scope in scopes if scope)
+
+
+def _list_scopes(complaint: Complaint) -> List[Optional[str]]:
+    scopes = [citizen_scope(complaint.citizen_id), ward_scope(complaint.effective_ward_key)]
+    # A complaint moving wards leaves the old ward's feed too
+    history = inspect(complaint).attrs.effective_ward_key.history
+    scopes.extend(ward_scope(key) for key in history.deleted or ())
+    return scopes
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_flushed_scopes(session, flush_context):
+    scopes = []
+    list_scopes = []
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Complaint):
+            if obj in session.dirty and not session.is_modified(obj):
+                continue
+            scopes.append(complaint_scope(obj.id))
+            list_scopes.extend(_list_scopes(obj))
+        elif isinstance(obj, (ComplaintActivity, ComplaintUpdate, ComplaintUpvote)):
+            scopes.append(complaint_scope(obj.complaint_id))
+    if scopes:
+        bump(session.connection(), scopes)
+    if list_scopes:
+        _defer_list_scopes(session, list_scopes)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_list_scopes(session):
+    # Flush first: commit's own flush runs after this hook
+    session.flush()
+    scopes = session.info.pop(_LIST_SCOPES, None)
+    if scopes:
+        bump(session.connection(), scopes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_list_scopes(session):
+    session.info.pop(_LIST_SCOPES, None)
+
+
+def get_versions(db: Session, scopes: List[str]) -> List[int]:
+    """Current versions of `scopes`, in order; scopes never bumped are at version 0."""
+    rows = dict(
+        db.query(FeedVersion.scope, FeedVersion.version).filter(FeedVersion.scope.in_(scopes)).all()
+    )
+    return [rows.get(scope, 0) for scope in scopes]
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison against If-None-Match, as RFC 9110 requires for GET."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in header.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -1,3 +1,19 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Fail loudly on any relationship that is lazily loaded (N+1) and expose per-request query counts
+os.environ.setdefault("SQLALCHEMY_STRICT_LOADING", "1")
+os.environ.setdefault("DEBUG_QUERY_COUNT", "1")
+# Apply upvotes write-through: a flush thread would hold votes in memory and write them to the
+# application's database rather than the test one
+os.environ.setdefault("UPVOTE_FLUSH_INTERVAL", "0")
+# No outbox worker pool: each request drains its own messages from a background task
+os.environ.setdefault("OUTBOX_WORKERS", "0")
+# Deliver status emails as soon as the request's background drain runs
+os.environ.setdefault("NOTIFICATION_DIGEST_WINDOW", "0")
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -33,9 +49,13 @@ app.dependency_overrides[get_db] = override_get_db
 @pytest.fixture(scope="function")
 def test_db():
     # Patch the background task DB session imports
+    import routes.admin
+    import routes.auth
     import routes.complaints
 
     routes.complaints.SessionLocal = TestingSessionLocal
+    routes.admin.SessionLocal = TestingSessionLocal
+    routes.auth.SessionLocal = TestingSessionLocal
 
     # Create the database schema before each test
     Base.metadata.create_all(bind=engine)
@@ -53,8 +73,101 @@ def reset_rate_limiter():
     limiter._storage.reset()
 
 
+@pytest.fixture(scope="function", autouse=True)
+def reset_user_cache():
+    # Every test recreates the schema, so user ids are reused
+    from services import user_cache
+
+    user_cache.clear()
+
+
 @pytest.fixture(scope="function")
 def client(test_db):
     # The test_db fixture is requested to ensure the database is initialized
     with TestClient(app) as c:
         yield c
+
+
+@pytest.fixture(scope="function")
+def make_user(test_db):
+    """Factory for committed users whose password is "password123"."""
+    from models import User
+    from security import hash_password
+
+    def _make_user(email, role="citizen", ward="560001", department=None, is_active=True):
+        user = User(
+            full_name=email.split("@")[0].title(),
+            email=email,
+            password_hash=hash_password("password123"),
+            role=role,
+            ward=ward,
+            department=department,
+            is_active=is_active,
+        )
+        test_db.add(user)
+        test_db.commit()
+        test_db.refresh(user)
+        return user
+
+    return _make_user
+
+
+@pytest.fixture(scope="function")
+def auth_headers(client):
+    """Logs a make_user() user in; returns the Authorization header for its access token."""
+
+    def _auth_headers(email):
+        response = client.post(
+            "/api/auth/login", json={"email": email, "password": "password123"}
+        )
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    return _auth_headers
+
+
+@pytest.fixture(scope="function")
+def brevo_stub(monkeypatch):
+    """
+    Local stand-in for the Brevo email API. Records every JSON body it receives in
+    `stub.requests` and answers with the codes queued in `stub.statuses` (then 201).
+    Speaks keep-alive HTTP/1.1 and counts accepted TCP connections in `stub.connections`.
+    """
+    from services import http_client, notifications
+
+    class Stub:
+        requests = []
+        statuses = []
+        connections = 0
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            Stub.connections += 1
+            super().setup()
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            Stub.requests.append(json.loads(body or b"{}"))
+            code = Stub.statuses.pop(0) if Stub.statuses else 201
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(notifications, "BREVO_API_KEY", "test-key")
+    monkeypatch.setattr(
+        notifications, "BREVO_API_URL", f"http://127.0.0.1:{server.server_port}/v3/smtp/email"
+    )
+    yield Stub
+    http_client.close()
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,77 @@
+from models import Complaint, ComplaintActivity
+
+
+def add_complaint(db, citizen, activities=0, ward="560001"):
+    complaint = Complaint(
+        title="Overflowing drain",
+        description="Drain overflows every evening.",
+        ward=ward,
+        citizen_id=citizen.id,
+    )
+    db.add(complaint)
+    db.flush()
+    for i in range(activities):
+        db.add(ComplaintActivity(complaint_id=complaint.id, action=f"Step {i}"))
+    db.commit()
+    db.refresh(complaint)
+    return complaint
+
+
+def test_activities_are_paged_newest_first(client, test_db, make_user, auth_headers):
+    citizen = make_user("asha@test.com")
+    complaint = add_complaint(test_db, citizen, activities=7)
+    headers = auth_headers("asha@test.com")
+    url = f"/api/complaints/{complaint.id}/activities?limit=3"
+
+    pages, cursor = [], None
+    while True:
+        resp = client.get(url + (f"&cursor={cursor}" if cursor else ""), headers=headers)
+        assert resp.status_code == 200
+        pages.append([a["action"] for a in resp.json()])
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert pages == [
+        ["Step 6", "Step 5", "Step 4"],
+        ["Step 3", "Step 2", "Step 1"],
+        ["Step 0"],
+    ]
+
+
+def test_activities_respect_visibility(client, test_db, make_user, auth_headers):
+    citizen = make_user("asha@test.com")
+    make_user("ravi@test.com", ward="110001")
+    complaint = add_complaint(test_db, citizen, activities=1)
+    headers = auth_headers("ravi@test.com")
+
+    assert client.get(f"/api/complaints/{complaint.id}/activities", headers=headers).status_code == 403
+    assert client.get("/api/complaints/999/activities", headers=headers).status_code == 404
+
+
+def test_detail_embeds_only_the_latest_activities(client, test_db, make_user, auth_headers):
+    citizen = make_user("asha@test.com")
+    complaint = add_complaint(test_db, citizen, activities=6)
+    headers = auth_headers("asha@test.com")
+    url = f"/api/complaints/{complaint.id}"
+
+    latest = client.get(f"{url}?activities_limit=3", headers=headers)
+    assert [a["action"] for a in latest.json()["activities"]] == ["Step 3", "Step 4", "Step 5"]
+    assert len(client.get(url, headers=headers).json()["activities"]) == 6
+
+    none = client.get(f"{url}?activities_limit=0", headers=headers)
+    assert none.json()["activities"] == []
+    assert none.headers["ETag"] != latest.headers["ETag"]
+
+
+def test_batch_limits_each_timeline(client, test_db, make_user, auth_headers):
+    citizen = make_user("asha@test.com")
+    busy = add_complaint(test_db, citizen, activities=5)
+    quiet = add_complaint(test_db, citizen, activities=1)
+
+    items = client.get(
+        f"/api/complaints/batch?ids={busy.id},{quiet.id}&activities_limit=2",
+        headers=auth_headers("asha@test.com"),
+    ).json()
+    assert [a["action"] for a in items[0]["complaint"]["activities"]] == ["Step 3", "Step 4"]
+    assert [a["action"] for a in items[1]["complaint"]["activities"]] == ["Step 0"]
@@ -0,0 +1,62 @@
+from models import Complaint, ComplaintActivity
+
+
+def seed_complaints(db, count, ward="560001", department="Water Supply", status="Assigned"):
+    for i in range(count):
+        db.add(
+            Complaint(
+                title=f"Leak {i}",
+                description="Water pipe leaking near the market.",
+                ward=ward,
+                category="Water Supply",
+                status=status,
+                assigned_department=department,
+                assigned_to="Old Officer" if i % 2 else None,
+            )
+        )
+    db.commit()
+
+
+def test_approve_officer_reassigns_in_bulk(client, test_db, make_user, auth_headers):
+    make_user("root@test.com", "sudo", ward=None)
+    officer = make_user("newofficer@test.com", "officer", "560001", "Water Supply", is_active=False)
+    seed_complaints(test_db, 6)
+    seed_complaints(test_db, 2, status="Resolved")
+    seed_complaints(test_db, 2, ward="560002")
+
+    resp = client.post(
+        f"/api/admin/approve-officer/{officer.id}", headers=auth_headers("root@test.com")
+    )
+    assert resp.status_code == 200
+    assert resp.json()["reassigned_complaints"] == 6
+
+    test_db.expire_all()
+    reassigned = test_db.query(Complaint).filter(Complaint.assigned_to == "Newofficer").all()
+    assert len(reassigned) == 6
+
+    activities = (
+        test_db.query(ComplaintActivity)
+        .filter(ComplaintActivity.action == "System Reassignment")
+        .all()
+    )
+    assert len(activities) == 6
+    details = sorted(a.details for a in activities)
+    assert details[0] == "Automatically transitioned from Old Officer to new officer Newofficer"
+    assert details[-1] == "Automatically transitioned from Unassigned to new officer Newofficer"
+
+
+def test_approve_officer_async_mode_returns_job(client, test_db, make_user, auth_headers):
+    make_user("root@test.com", "sudo", ward=None)
+    officer = make_user("bulkofficer@test.com", "officer", "560001", "Water Supply", is_active=False)
+    seed_complaints(test_db, 3)
+    headers = auth_headers("root@test.com")
+
+    resp = client.post(
+        f"/api/admin/approve-officer/{officer.id}?async_mode=true", headers=headers
+    )
+    assert resp.status_code == 200
+    job_id = resp.json()["job_id"]
+
+    job = client.get(f"/api/admin/jobs/{job_id}", headers=headers).json()
+    assert job["status"] == "completed"
+    assert job["result"] == {"reassigned": 3}
@@ -1,4 +1,5 @@
-from services.ai import cosine_similarity, predict_category, predict_priority
+from services.ai import (cosine_similarity, predict_category, predict_priority,
+                         resolve_department_key)
 
 
 def test_predict_priority():
@@ -73,3 +74,19 @@ def test_cosine_similarity():
 
     # Complete mismatch
     assert cosine_similarity("apple orange", "car plane") == 0.0
+
+
+def test_resolve_department_key():
+    # Exact aliases and canonical names
+    assert resolve_department_key("Water") == "water_supply"
+    assert resolve_department_key("General") == "general_administration"
+    assert resolve_department_key("Roads & Transport") == "roads_transport"
+
+    # Free-text officer departments resolve through shared words
+    assert resolve_department_key("Jal Board / Water Supply") == "water_supply"
+    assert resolve_department_key("PWD & Roads") == "roads_transport"
+    assert resolve_department_key("Electrical Dept") == "electricity"
+
+    # Generic words alone do not pick a department
+    assert resolve_department_key("Public Works") == "public_works"
+    assert resolve_department_key(None) is None
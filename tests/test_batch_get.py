@@ -0,0 +1,59 @@
+from models import Complaint, ComplaintActivity
+
+
+def add_complaint(db, citizen, ward="560001", activities=0):
+    complaint = Complaint(
+        title="Broken streetlight",
+        description="Streetlight has been off for days.",
+        ward=ward,
+        citizen_id=citizen.id,
+    )
+    db.add(complaint)
+    db.flush()
+    for i in range(activities):
+        db.add(ComplaintActivity(complaint_id=complaint.id, action=f"Step {i}"))
+    db.commit()
+    db.refresh(complaint)
+    return complaint
+
+
+def test_batch_returns_request_order_with_per_id_errors(client, test_db, make_user, auth_headers):
+    asha = make_user("asha@test.com")
+    ravi = make_user("ravi@test.com", ward="110001")
+    first = add_complaint(test_db, asha, activities=2)
+    second = add_complaint(test_db, asha)
+    foreign = add_complaint(test_db, ravi, ward="110001")
+
+    resp = client.get(
+        f"/api/complaints/batch?ids={second.id},999,{foreign.id},{first.id}",
+        headers=auth_headers("asha@test.com"),
+    )
+    assert resp.status_code == 200
+    items = resp.json()
+    assert [i["id"] for i in items] == [second.id, 999, foreign.id, first.id]
+    assert [i["status_code"] for i in items] == [200, 404, 403, 200]
+    assert items[1]["complaint"] is None
+    assert items[3]["complaint"]["title"] == "Broken streetlight"
+    assert len(items[3]["complaint"]["activities"]) == 2
+
+
+def test_batch_query_count_is_flat(client, test_db, make_user, auth_headers):
+    asha = make_user("asha@test.com")
+    ids = [add_complaint(test_db, asha, activities=1).id for _ in range(6)]
+    headers = auth_headers("asha@test.com")
+    # Cache the caller first so both requests skip the user lookup
+    client.get("/api/auth/me", headers=headers)
+
+    few = client.get(f"/api/complaints/batch?ids={ids[0]}", headers=headers)
+    many = client.get(f"/api/complaints/batch?ids={','.join(map(str, ids))}", headers=headers)
+    assert len(many.json()) == 6
+    assert few.headers["X-Query-Count"] == many.headers["X-Query-Count"]
+
+
+def test_batch_validates_ids(client, make_user, auth_headers):
+    make_user("asha@test.com")
+    headers = auth_headers("asha@test.com")
+
+    assert client.get("/api/complaints/batch?ids=1,abc", headers=headers).status_code == 400
+    too_many = ",".join(str(i) for i in range(1, 102))
+    assert client.get(f"/api/complaints/batch?ids={too_many}", headers=headers).status_code == 400
@@ -0,0 +1,181 @@
+import logging
+
+from logging_config import PREVIEW_LOGGER
+from models import Complaint, ComplaintActivity
+
+
+def add_complaint(db, citizen, ward="560001", department="Water Supply", **fields):
+    complaint = Complaint(
+        title="Pipe burst",
+        description="Water main burst near the school.",
+        ward=ward,
+        category="Water",
+        assigned_department=department,
+        citizen_id=citizen.id,
+        **fields,
+    )
+    db.add(complaint)
+    db.commit()
+    db.refresh(complaint)
+    return complaint
+
+
+def test_bulk_status_applies_permitted_ids_only(client, test_db, make_user, auth_headers, caplog):
+    caplog.set_level(logging.INFO, logger=PREVIEW_LOGGER)
+    citizen = make_user("asha@test.com")
+    make_user("officer@test.com", role="officer", department="Water Supply")
+    mine = [add_complaint(test_db, citizen) for _ in range(3)]
+    other_ward = add_complaint(test_db, citizen, ward="110001")
+    other_dept = add_complaint(test_db, citizen, department="Roads & Transport")
+    merged = add_complaint(test_db, citizen, is_merged=True, merged_into_id=mine[0].id)
+
+    ids = [mine[0].id, other_ward.id, 999, mine[1].id, other_dept.id, mine[2].id]
+    resp = client.post(
+        "/api/complaints/bulk/status",
+        json={"complaint_ids": ids, "status": "Resolved", "note": "Fixed during drive"},
+        headers=auth_headers("officer@test.com"),
+    )
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["updated"] == 3
+    assert body["failed"] == 3
+    assert [r["id"] for r in body["results"]] == ids
+    assert [r["success"] for r in body["results"]] == [True, False, False, True, False, True]
+    assert "ward" in body["results"][1]["detail"]
+    assert body["results"][2]["detail"] == "Complaint not found"
+    assert "department" in body["results"][4]["detail"]
+
+    test_db.expire_all()
+    statuses = {c.id: (c.status, c.resolved_at) for c in test_db.query(Complaint)}
+    assert all(statuses[c.id][0] == "Resolved" and statuses[c.id][1] for c in mine)
+    assert statuses[other_ward.id][0] == "Submitted"
+    activities = test_db.query(ComplaintActivity).filter(ComplaintActivity.action == "Status Updated").all()
+    assert sorted(a.complaint_id for a in activities) == sorted(c.id for c in mine)
+    assert all(a.previous_value == "Submitted" and a.details == "Fixed during drive" for a in activities)
+
+    # Three primaries plus the duplicate merged into the first one, all reported by Asha:
+    # coalesced into a single digest email
+    out = caplog.text
+    assert out.count("Subject : ") == 1
+    assert "Subject : 🔔 4 Complaint Updates — JanSetu" in out
+    assert out.count("is now **Resolved**.") == 4
+    assert merged.id not in ids
+
+
+def test_bulk_status_rejects_citizens_and_empty_batches(client, make_user, auth_headers):
+    make_user("asha@test.com")
+    make_user("root@test.com", role="sudo", ward=None)
+
+    denied = client.post(
+        "/api/complaints/bulk/status",
+        json={"complaint_ids": [1], "status": "Closed"},
+        headers=auth_headers("asha@test.com"),
+    )
+    assert denied.status_code == 403
+
+    empty = client.post(
+        "/api/complaints/bulk/status",
+        json={"complaint_ids": [], "status": "Closed"},
+        headers=auth_headers("root@test.com"),
+    )
+    assert empty.status_code == 422
+
+
+def test_bulk_assign_by_ids_reports_counts(client, test_db, make_user, auth_headers):
+    citizen = make_user("asha@test.com")
+    make_user("root@test.com", role="sudo", ward=None)
+    fresh = add_complaint(test_db, citizen)
+    working = add_complaint(test_db, citizen, status="In Progress", assigned_to="Old Officer")
+
+    resp = client.post(
+        "/api/complaints/bulk/assign",
+        json={
+            "complaint_ids": [fresh.id, working.id, 999],
+            "assigned_to": "Field Team A",
+            "assigned_department": "Roads & Transport",
+        },
+        headers=auth_headers("root@test.com"),
+    )
+    assert resp.status_code == 200
+    assert resp.json() == {"assigned": 2, "requested": 3, "not_found": 1}
+
+    test_db.expire_all()
+    fresh, working = test_db.get(Complaint, fresh.id), test_db.get(Complaint, working.id)
+    assert fresh.status == "Assigned" and working.status == "In Progress"
+    assert fresh.assigned_to == working.assigned_to == "Field Team A"
+    assert fresh.department_key == "roads_transport"
+    assert fresh.assigned_at is not None
+
+    previous = {
+        a.complaint_id: a.previous_value
+        for a in test_db.query(ComplaintActivity).filter(ComplaintActivity.action == "Complaint Assigned")
+    }
+    assert previous == {fresh.id: "Unassigned", working.id: "Old Officer"}
+
+
+def test_bulk_assign_is_scoped_to_the_officers_ward_and_department(client, test_db, make_user, auth_headers):
+    citizen = make_user("asha@test.com")
+    make_user("officer@test.com", role="officer", department="Water Supply")
+    mine = add_complaint(test_db, citizen)
+    other_ward = add_complaint(test_db, citizen, ward="110001")
+    other_dept = add_complaint(test_db, citizen, department="Roads & Transport")
+    headers = auth_headers("officer@test.com")
+
+    by_ids = client.post(
+        "/api/complaints/bulk/assign",
+        json={
+            "complaint_ids": [mine.id, other_ward.id, other_dept.id],
+            "assigned_to": "Field Team A",
+            "assigned_department": "Water Supply",
+        },
+        headers=headers,
+    )
+    assert by_ids.json() == {"assigned": 1, "requested": 3, "not_found": 2}
+
+    by_filter = client.post(
+        "/api/complaints/bulk/assign",
+        json={"filter": {"status": "Submitted"}, "assigned_to": "Field Team B", "assigned_department": "Water Supply"},
+        headers=headers,
+    )
+    assert by_filter.json()["assigned"] == 0
+
+    test_db.expire_all()
+    assert test_db.get(Complaint, mine.id).assigned_to == "Field Team A"
+    assert test_db.get(Complaint, other_ward.id).assigned_to is None
+    assert test_db.get(Complaint, other_dept.id).assigned_to is None
+
+
+def test_bulk_assign_by_filter(client, test_db, make_user, auth_headers):
+    citizen = make_user("asha@test.com")
+    make_user("root@test.com", role="sudo", ward=None)
+    target = [add_complaint(test_db, citizen, ward="560 001") for _ in range(3)]
+    add_complaint(test_db, citizen, ward="110001")
+    add_complaint(test_db, citizen, status="Resolved")
+    add_complaint(test_db, citizen, is_merged=True, merged_into_id=target[0].id)
+    headers = auth_headers("root@test.com")
+
+    resp = client.post(
+        "/api/complaints/bulk/assign",
+        json={
+            "filter": {"ward": "560001", "status": "Submitted"},
+            "assigned_to": "Field Team B",
+            "assigned_department": "Water Supply",
+        },
+        headers=headers,
+    )
+    assert resp.status_code == 200
+    assert resp.json()["assigned"] == 3
+    assert test_db.query(ComplaintActivity).count() == 3
+
+    both = client.post(
+        "/api/complaints/bulk/assign",
+        json={"complaint_ids": [1], "filter": {"ward": "560001"}, "assigned_to": "X Team", "assigned_department": "Water"},
+        headers=headers,
+    )
+    assert both.status_code == 400
+    empty_filter = client.post(
+        "/api/complaints/bulk/assign",
+        json={"filter": {}, "assigned_to": "X Team", "assigned_department": "Water"},
+        headers=headers,
+    )
+    assert empty_filter.status_code == 400
@@ -0,0 +1,125 @@
+from models import Complaint, ComplaintActivity
+from services import versions
+
+
+def add_complaint(db, citizen, ward="560001"):
+    complaint = Complaint(
+        title="Overflowing drain",
+        description="Drain overflowing onto the road.",
+        ward=ward,
+        citizen_id=citizen.id,
+    )
+    db.add(complaint)
+    db.commit()
+    db.refresh(complaint)
+    return complaint
+
+
+def test_detail_revalidates_until_timeline_changes(client, test_db, make_user, auth_headers):
+    citizen = make_user("asha@test.com")
+    complaint = add_complaint(test_db, citizen)
+    headers = auth_headers("asha@test.com")
+    url = f"/api/complaints/{complaint.id}"
+
+    first = client.get(url, headers=headers)
+    etag = first.headers["ETag"]
+    cached = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert cached.content == b""
+
+    test_db.add(ComplaintActivity(complaint_id=complaint.id, action="Inspected"))
+    test_db.commit()
+
+    changed = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["activities"][0]["action"] == "Inspected"
+
+
+def test_not_modified_only_after_authorization(client, test_db, make_user, auth_headers):
+    citizen = make_user("asha@test.com")
+    make_user("ravi@test.com", ward="110001")
+    complaint = add_complaint(test_db, citizen)
+    url = f"/api/complaints/{complaint.id}"
+
+    etag = client.get(url, headers=auth_headers("asha@test.com")).headers["ETag"]
+    resp = client.get(url, headers={**auth_headers("ravi@test.com"), "If-None-Match": etag})
+    assert resp.status_code == 403
+
+
+def test_ward_feed_304_costs_a_version_lookup(client, test_db, make_user, auth_headers):
+    citizen = make_user("asha@test.com")
+    add_complaint(test_db, citizen)
+    headers = auth_headers("asha@test.com")
+    url = "/api/complaints/community?ward=560001"
+
+    etag = client.get(url, headers=headers).headers["ETag"]
+    cached = client.get(url, headers={**headers, "If-None-Match": f'W/{etag}, "other"'})
+    assert cached.status_code == 304
+    # current-user lookup + one version lookup
+    assert int(cached.headers["X-Query-Count"]) <= 2
+
+    # Changes in another ward leave this feed's ETag alone
+    add_complaint(test_db, citizen, ward="110001")
+    assert client.get(url, headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    add_complaint(test_db, citizen)
+    refreshed = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert len(refreshed.json()) == 2
+
+    # Different query strings never share an ETag
+    assert client.get(url + "&limit=1", headers=headers).headers["ETag"] != etag
+
+
+def test_upvotes_refresh_list_etags_at_commit(client, test_db, make_user, auth_headers):
+    reporter = make_user("asha@test.com")
+    make_user("ravi@test.com")
+    complaint = add_complaint(test_db, reporter)
+    headers = auth_headers("asha@test.com")
+    url = "/api/complaints/community?ward=560001"
+    etag = client.get(url, headers=headers).headers["ETag"]
+    assert client.get(url, headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    resp = client.post(f"/api/complaints/{complaint.id}/upvote", headers=auth_headers("ravi@test.com"))
+    assert resp.status_code == 200
+    refreshed = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.json()[0]["upvotes"] == 1
+
+    # The shared ward row is bumped once, when the transaction commits
+    scopes = [versions.complaint_scope(complaint.id), versions.ward_scope("560001")]
+    before = versions.get_versions(test_db, scopes)
+    complaint.status = "In Progress"
+    test_db.flush()
+    assert versions.get_versions(test_db, scopes) == [before[0] + 1, before[1]]
+    test_db.commit()
+    assert versions.get_versions(test_db, scopes)[1] == before[1] + 1
+
+
+def test_bulk_reassignment_invalidates_cached_views(client, test_db, make_user, auth_headers):
+    citizen = make_user("asha@test.com")
+    make_user("root@test.com", role="sudo", ward=None)
+    officer = make_user("officer@test.com", role="officer", department="Water Supply")
+    officer.is_active = False
+    complaint = add_complaint(test_db, citizen)
+    complaint.assigned_department = "Water Supply"
+    test_db.commit()
+
+    headers = auth_headers("asha@test.com")
+    url = f"/api/complaints/{complaint.id}"
+    etag = client.get(url, headers=headers).headers["ETag"]
+
+    approve = client.post(
+        f"/api/admin/approve-officer/{officer.id}", headers=auth_headers("root@test.com")
+    )
+    assert approve.status_code == 200
+    assert client.get(url, headers={**headers, "If-None-Match": etag}).status_code == 200
+
+
+def test_unscoped_sudo_listing_has_no_etag(client, make_user, auth_headers):
+    make_user("root@test.com", role="sudo", ward=None)
+    resp = client.get("/api/complaints", headers=auth_headers("root@test.com"))
+    assert resp.status_code == 200
+    assert "ETag" not in resp.headers
@@ -0,0 +1,36 @@
+from services.notifications import _preview_line, render_email, status_digest
+
+
+def test_status_email_renders_from_compiled_templates():
+    html, lines = render_email(
+        "✅ Complaint Resolved — JanSetu", "", event="resolved",
+        title="Leak at {gate} $2", citizen_name="Asha",
+    )
+    assert "<title>✅ Complaint Resolved — JanSetu</title>" in html
+    assert "Dear Asha," in html
+    assert "<strong>'Leak at {gate} $2'</strong>" in lines[0]
+    assert "".join(f"<p style='margin:6px 0;color:#374151;'>{line}</p>" for line in lines) in html
+    assert "{title}" not in html and "{body_html}" not in html
+    assert _preview_line(lines[0]).startswith("Your complaint **'Leak at {gate} $2'** has been marked as RESOLVED")
+
+
+def test_plain_message_becomes_paragraphs():
+    html, lines = render_email("Ticket Re-escalated", "First line\n\n  \nSecond {line}")
+    assert lines == ["First line", "Second {line}"]
+    assert "<p style='margin:6px 0;color:#374151;'>Second {line}</p>" in html
+    assert "Dear Citizen," in html
+
+
+def test_user_text_is_escaped():
+    html, lines = render_email(
+        "Ticket Update — JanSetu", "", event="assigned",
+        title='Drain <img src=x onerror="alert(1)">', citizen_name="<b>Asha</b> & co",
+    )
+    assert "<img" not in html and "<b>Asha" not in html
+    assert "<strong>'Drain &lt;img src=x onerror=&quot;alert(1)&quot;&gt;'</strong>" in lines[0]
+    assert "Dear &lt;b&gt;Asha&lt;/b&gt; &amp; co," in html
+    assert _preview_line(lines[0]).startswith("Your complaint **'Drain <img src=x onerror=\"alert(1)\">'**")
+
+    _, digest = status_digest([("<script>x</script>", "Resolved"), ("Pothole", "Closed")])
+    assert "<script>" not in digest
+    assert "<strong>'&lt;script&gt;x&lt;/script&gt;'</strong>" in digest
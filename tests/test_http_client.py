@@ -0,0 +1,18 @@
+from services import http_client, notifications
+
+
+def test_otp_burst_reuses_one_connection(brevo_stub):
+    for i in range(20):
+        notifications.send_otp_email(f"user{i}@test.com", "123456")
+
+    assert len(brevo_stub.requests) == 20
+    assert brevo_stub.connections == 1
+
+
+def test_pooled_session_is_shared_and_recreated_after_close():
+    session = http_client.get_session()
+    assert http_client.get_session() is session
+    assert session.get_adapter("https://api.brevo.com")._pool_maxsize == http_client.POOL_MAXSIZE
+
+    http_client.close()
+    assert http_client.get_session() is not session
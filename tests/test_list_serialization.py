@@ -0,0 +1,104 @@
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+
+from models import Complaint
+from schemas import ComplaintOut
+
+
+def seed(db, citizen):
+    db.add_all([
+        Complaint(
+            title="Pothole near Gandhi Chowk – ಬೆಂಗಳೂರು",
+            description='Deep pothole, "dangerous" at night.\nNeeds urgent fix.',
+            category="Road Damage",
+            ward="560001",
+            incident_ward="560001",
+            latitude=12.9716,
+            longitude=77.5946,
+            impact_score=87.5,
+            ai_confidence_score=0.93,
+            citizen_id=citizen.id,
+        ),
+        Complaint(
+            title="Garbage pile",
+            description="Garbage has not been collected for a week.",
+            ward="560001",
+            citizen_id=citizen.id,
+            upvotes=3,
+        ),
+    ])
+    db.commit()
+
+
+def legacy_body(db):
+    # What FastAPI produced before: from_attributes validation + jsonable_encoder + JSONResponse
+    complaints = (
+        db.query(Complaint)
+        .filter(Complaint.is_merged.is_(False))
+        .order_by(Complaint.created_at.desc(), Complaint.id.desc())
+        .all()
+    )
+    models = [ComplaintOut.model_validate(c) for c in complaints]
+    return JSONResponse(content=jsonable_encoder(models)).body
+
+
+def test_list_output_is_byte_compatible(client, test_db, make_user, auth_headers):
+    citizen = make_user("lister@test.com")
+    seed(test_db, citizen)
+    headers = auth_headers("lister@test.com")
+
+    expected = legacy_body(test_db)
+    own = client.get("/api/complaints", headers=headers)
+    community = client.get("/api/complaints/community?ward=560001", headers=headers)
+
+    assert own.status_code == 200
+    assert own.headers["content-type"] == "application/json"
+    assert own.content == expected
+    assert community.content == expected
+
+
+def test_sparse_fields_select_only_requested_columns(client, test_db, make_user, auth_headers):
+    citizen = make_user("lister@test.com")
+    seed(test_db, citizen)
+    headers = auth_headers("lister@test.com")
+
+    engine = test_db.get_bind()
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "FROM complaints" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        resp = client.get("/api/complaints?fields=title,status&limit=1", headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert resp.status_code == 200
+    assert list(resp.json()[0]) == ["id", "title", "status"]
+    assert resp.headers.get("X-Next-Cursor")
+    assert statements and "description" not in statements[-1]
+
+    following = client.get(
+        f"/api/complaints?fields=title,status&cursor={resp.headers['X-Next-Cursor']}",
+        headers=headers,
+    ).json()
+    assert [c["id"] for c in following] == [resp.json()[0]["id"] - 1]
+
+
+def test_summary_view_and_unknown_fields(client, test_db, make_user, auth_headers):
+    citizen = make_user("lister@test.com")
+    seed(test_db, citizen)
+    headers = auth_headers("lister@test.com")
+
+    summary = client.get("/api/complaints/community?ward=560001&view=summary", headers=headers)
+    assert summary.status_code == 200
+    assert set(summary.json()[0]) == {
+        "id", "title", "category", "priority", "priority_label", "upvotes", "status", "created_at",
+    }
+
+    bad = client.get("/api/complaints?fields=title,password_hash", headers=headers)
+    assert bad.status_code == 400
+    assert "password_hash" in bad.json()["detail"]
@@ -0,0 +1,68 @@
+import io
+import json
+import logging
+from logging.handlers import QueueHandler
+
+import pytest
+
+import logging_config
+from logging_config import PREVIEW_LOGGER, configure_logging, parse_levels, shutdown_logging
+from services import notifications
+
+
+@pytest.fixture
+def log_stream():
+    stream = io.StringIO()
+    preview = logging.getLogger(PREVIEW_LOGGER)
+    level = preview.level
+    yield stream
+    preview.setLevel(level)
+    configure_logging()
+
+
+def test_records_are_written_by_the_listener_thread(log_stream):
+    configure_logging(level="INFO", fmt="text", levels="", stream=log_stream)
+    configure_logging(level="INFO", fmt="text", levels="", stream=log_stream)
+    queue_handlers = [h for h in logging.getLogger().handlers if isinstance(h, QueueHandler)]
+    assert [type(h) for h in queue_handlers] == [logging_config._RecordQueueHandler]
+
+    logging.getLogger("JanSetu").info("Ticket %s escalated", 42)
+    shutdown_logging()
+    assert "INFO JanSetu: Ticket 42 escalated" in log_stream.getvalue()
+
+
+def test_json_format_keeps_extra_fields_and_traceback(log_stream):
+    configure_logging(level="INFO", fmt="json", levels="", stream=log_stream)
+    logger = logging.getLogger("JanSetu")
+    logger.warning("Delivery failed", extra={"notification_id": 7})
+    try:
+        raise ValueError("provider down")
+    except ValueError:
+        logger.exception("Outbox delivery crashed")
+    shutdown_logging()
+
+    first, second = [json.loads(line) for line in log_stream.getvalue().splitlines()]
+    assert first["level"] == "WARNING" and first["logger"] == "JanSetu"
+    assert first["message"] == "Delivery failed" and first["notification_id"] == 7
+    assert second["message"] == "Outbox delivery crashed"
+    assert "ValueError: provider down" in second["exc_info"]
+
+
+def test_per_module_levels_turn_off_previews(log_stream, monkeypatch):
+    assert parse_levels(" JanSetu.preview=warning, bad, sqlalchemy.engine=INFO") == {
+        "JanSetu.preview": "WARNING",
+        "sqlalchemy.engine": "INFO",
+    }
+    configure_logging(level="INFO", fmt="text", levels="JanSetu.preview=WARNING", stream=log_stream)
+    monkeypatch.setattr(notifications, "BREVO_API_KEY", "")
+    rendered = []
+    monkeypatch.setattr(notifications, "render_email", lambda *args: rendered.append(args))
+
+    notifications.send_email("asha@test.com", "Ticket Update", "Your complaint was resolved.")
+    notifications.send_sms("9876543210", "Your complaint was resolved.")
+    logging.getLogger("JanSetu").info("still logged")
+    shutdown_logging()
+
+    assert rendered == []
+    assert log_stream.getvalue().splitlines()[-1].endswith("INFO JanSetu: still logged")
+    assert "JanSetu.preview" not in log_stream.getvalue()
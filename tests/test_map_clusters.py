@@ -0,0 +1,98 @@
+from models import Complaint, ComplaintMapCell
+from services import map_clusters
+
+ORIGIN = (12.9716, 77.5946)
+CITY_VIEW = "min_lat=12.8&max_lat=13.2&min_lng=77.4&max_lng=77.8"
+
+
+def add_complaint(db, citizen, lat, lng, priority=2, **fields):
+    complaint = Complaint(
+        title="Pothole",
+        description="Reported from the map.",
+        ward="560001",
+        category="Roads",
+        assigned_department="Roads & Transport",
+        latitude=lat,
+        longitude=lng,
+        priority=priority,
+        citizen_id=citizen.id,
+        **fields,
+    )
+    db.add(complaint)
+    db.commit()
+    db.refresh(complaint)
+    return complaint
+
+
+def test_clusters_aggregate_open_complaints(client, test_db, make_user, auth_headers):
+    citizen = make_user("asha@test.com")
+    lat, lng = ORIGIN
+    add_complaint(test_db, citizen, lat, lng, priority=2)
+    urgent = add_complaint(test_db, citizen, lat + 0.002, lng + 0.002, priority=5)
+    add_complaint(test_db, citizen, lat + 0.004, lng, priority=1)
+    add_complaint(test_db, citizen, 28.61, 77.20)                     # outside the viewport
+    add_complaint(test_db, citizen, lat, lng, status="Resolved")
+    add_complaint(test_db, citizen, None, None)
+    headers = auth_headers("asha@test.com")
+
+    resp = client.get(f"/api/complaints/clusters?{CITY_VIEW}&zoom=9", headers=headers)
+    assert resp.status_code == 200
+    [cluster] = resp.json()
+    assert cluster["count"] == 3
+    assert cluster["worst_priority"] == 5
+    assert cluster["worst_priority_label"] == "Emergency"
+    assert abs(cluster["latitude"] - (lat + 0.002)) < 1e-6
+    assert abs(cluster["longitude"] - (lng + 0.002 / 3)) < 1e-6
+
+    # Resolving the worst one moves it off the map and lowers the cell's worst priority
+    urgent.status = "Resolved"
+    test_db.commit()
+    [cluster] = client.get(f"/api/complaints/clusters?{CITY_VIEW}&zoom=9", headers=headers).json()
+    assert (cluster["count"], cluster["worst_priority"]) == (2, 2)
+
+    # Street level splits the same complaints into separate ~110 m cells
+    street = client.get(f"/api/complaints/clusters?{CITY_VIEW}&zoom=17", headers=headers).json()
+    assert sorted(c["count"] for c in street) == [1, 1]
+
+
+def test_clusters_follow_bulk_status_and_upvote_updates(client, test_db, make_user, auth_headers):
+    citizen = make_user("asha@test.com")
+    make_user("voter@test.com")
+    make_user("officer@test.com", role="officer", department="Roads & Transport")
+    complaints = [add_complaint(test_db, citizen, *ORIGIN, priority=1) for _ in range(3)]
+
+    client.post(
+        f"/api/complaints/{complaints[0].id}/upvote", headers=auth_headers("voter@test.com")
+    )
+    test_db.refresh(complaints[0])
+    [cluster] = client.get(
+        f"/api/complaints/clusters?{CITY_VIEW}&zoom=12", headers=auth_headers("asha@test.com")
+    ).json()
+    assert cluster["worst_priority"] == complaints[0].priority
+
+    resp = client.post(
+        "/api/complaints/bulk/status",
+        json={"complaint_ids": [c.id for c in complaints[:2]], "status": "Closed"},
+        headers=auth_headers("officer@test.com"),
+    )
+    assert resp.json()["updated"] == 2
+    [cluster] = client.get(
+        f"/api/complaints/clusters?{CITY_VIEW}&zoom=12", headers=auth_headers("asha@test.com")
+    ).json()
+    assert (cluster["count"], cluster["worst_priority"]) == (1, 1)
+
+    # The incremental grid matches a from-scratch aggregation
+    totals = {}
+    for cell in test_db.query(ComplaintMapCell).filter(ComplaintMapCell.count != 0):
+        totals[cell.level] = totals.get(cell.level, 0) + cell.count
+    assert totals == {level: 1 for level in map_clusters.STORED_LEVELS}
+
+
+def test_clusters_validate_viewport(client, make_user, auth_headers):
+    make_user("asha@test.com")
+    resp = client.get(
+        "/api/complaints/clusters?min_lat=13&max_lat=12&min_lng=77&max_lng=78&zoom=5",
+        headers=auth_headers("asha@test.com"),
+    )
+    assert resp.status_code == 400
+    assert [map_clusters.level_for_zoom(z) for z in (3, 9, 12, 16)] == [0, 1, 2, 3]
@@ -0,0 +1,106 @@
+from sqlalchemy import event
+
+from models import Complaint
+from services import geo
+
+ORIGIN = (12.9716, 77.5946)
+
+
+def add_complaint(db, citizen, title, lat, lng, ward="560001"):
+    complaint = Complaint(
+        title=title,
+        description="Reported from the map.",
+        ward=ward,
+        latitude=lat,
+        longitude=lng,
+        citizen_id=citizen.id,
+    )
+    db.add(complaint)
+    db.commit()
+    db.refresh(complaint)
+    return complaint
+
+
+def test_geo_cell_is_derived_on_write(test_db, make_user):
+    citizen = make_user("asha@test.com")
+    complaint = add_complaint(test_db, citizen, "Pothole", *ORIGIN)
+    assert complaint.geo_cell == geo.geo_cell(*ORIGIN)
+
+    complaint.latitude = 13.5
+    test_db.commit()
+    assert complaint.geo_cell == geo.geo_cell(13.5, ORIGIN[1])
+
+    nowhere = add_complaint(test_db, citizen, "No location", None, None)
+    assert nowhere.geo_cell is None
+
+
+def test_nearby_returns_complaints_inside_radius_nearest_first(client, test_db, make_user, auth_headers):
+    citizen = make_user("asha@test.com")
+    lat, lng = ORIGIN
+    near = add_complaint(test_db, citizen, "Near", lat + 0.0018, lng)          # ~200 m
+    mid = add_complaint(test_db, citizen, "Mid", lat, lng + 0.0083)            # ~900 m
+    add_complaint(test_db, citizen, "Corner", lat + 0.0075, lng + 0.0075)      # in bbox, ~1.16 km
+    add_complaint(test_db, citizen, "Far", lat + 0.027, lng)                   # ~3 km
+    add_complaint(test_db, citizen, "Unlocated", None, None)
+    headers = auth_headers("asha@test.com")
+
+    engine = test_db.get_bind()
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        resp = client.get(f"/api/complaints/nearby?lat={lat}&lng={lng}&radius_m=1000", headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [c["id"] for c in body] == [near.id, mid.id]
+    assert 190 < body[0]["distance_m"] < 210
+    assert 880 < body[1]["distance_m"] < 920
+    assert any("geo_cell BETWEEN" in s for s in statements)
+    # Only the ranked candidates leave the database
+    assert any("LIMIT" in s for s in statements if "geo_cell BETWEEN" in s)
+
+
+def test_nearby_reads_a_bounded_number_of_candidates(client, test_db, make_user, auth_headers):
+    citizen = make_user("asha@test.com")
+    lat, lng = ORIGIN
+    # A dense block: 30 complaints, the closest ones last
+    for i in range(30, 0, -1):
+        add_complaint(test_db, citizen, f"Pothole {i}", lat + i * 0.0001, lng)
+    headers = auth_headers("asha@test.com")
+
+    resp = client.get(f"/api/complaints/nearby?lat={lat}&lng={lng}&radius_m=5000&limit=3", headers=headers)
+    assert resp.status_code == 200
+    assert [c["title"] for c in resp.json()] == ["Pothole 1", "Pothole 2", "Pothole 3"]
+
+
+def test_nearby_respects_citizen_visibility(client, test_db, make_user, auth_headers):
+    asha = make_user("asha@test.com")
+    ravi = make_user("ravi@test.com", ward="560002")
+    lat, lng = ORIGIN
+    add_complaint(test_db, ravi, "Other ward", lat + 0.001, lng, ward="560002")
+    own = add_complaint(test_db, asha, "Mine", lat, lng + 0.001)
+
+    body = client.get(
+        f"/api/complaints/nearby?lat={lat}&lng={lng}&radius_m=500", headers=auth_headers("asha@test.com")
+    ).json()
+    assert [c["id"] for c in body] == [own.id]
+
+    too_far = client.get(
+        f"/api/complaints/nearby?lat={lat}&lng={lng}&radius_m=50000", headers=auth_headers("asha@test.com")
+    )
+    assert too_far.status_code == 422
+
+
+def test_cell_ranges_cover_the_bounding_box():
+    box = geo.bounding_box(*ORIGIN, 2500)
+    ranges = geo.cell_ranges(*box)
+    for lat in (box[0], ORIGIN[0], box[1]):
+        for lng in (box[2], ORIGIN[1], box[3]):
+            cell = geo.geo_cell(lat, lng)
+            assert any(low <= cell <= high for low, high in ranges)
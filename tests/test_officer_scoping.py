@@ -0,0 +1,50 @@
+from models import Complaint
+
+
+def add_complaint(db, title, ward, category, assigned_department=None, status="Assigned"):
+    complaint = Complaint(
+        title=title,
+        description=f"{title} reported by residents.",
+        ward=ward,
+        category=category,
+        assigned_department=assigned_department,
+        status=status,
+    )
+    db.add(complaint)
+    db.commit()
+    db.refresh(complaint)
+    return complaint
+
+
+def seed(db):
+    add_complaint(db, "Pipe burst", "560001", "Water Supply", "Jal Board / Water Supply")
+    add_complaint(db, "Low pressure", "560001", "Water")
+    add_complaint(db, "Pothole", "560001", "Roads & Transport", "Roads & Transport")
+    add_complaint(db, "Leak elsewhere", "560002", "Water Supply", "Water Supply", "In Progress")
+
+
+def test_officer_list_scoped_by_ward_and_department_key(client, test_db, make_user, auth_headers):
+    make_user("jal@test.com", "officer", "560001", "Water Supply Dept")
+    seed(test_db)
+
+    resp = client.get("/api/complaints", headers=auth_headers("jal@test.com"))
+    assert resp.status_code == 200
+    assert sorted(c["title"] for c in resp.json()) == ["Low pressure", "Pipe burst"]
+
+
+def test_dashboard_scoped_by_department_key(client, test_db, make_user, auth_headers):
+    make_user("pwd@test.com", "officer", "560001", "PWD & Roads")
+    seed(test_db)
+
+    summary = client.get("/api/dashboard/summary", headers=auth_headers("pwd@test.com")).json()
+    assert summary["total_complaints"] == 1
+    assert summary["category_stats"] == [{"category": "Roads & Transport", "total": 1}]
+
+
+def test_department_key_follows_reassignment(test_db):
+    complaint = add_complaint(test_db, "Garbage pile", "560001", "General")
+    assert complaint.department_key == "general_administration"
+
+    complaint.assigned_department = "Sanitation"
+    test_db.commit()
+    assert complaint.department_key == "sanitation"
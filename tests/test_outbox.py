@@ -0,0 +1,174 @@
+import time
+from datetime import timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import EmailOTP, NotificationOutbox
+from services import outbox
+
+
+def test_otp_is_delivered_after_commit(client, test_db, brevo_stub):
+    resp = client.post("/api/auth/send-email-otp", json={"email": "asha@test.com"})
+    assert resp.status_code == 200
+
+    code = test_db.query(EmailOTP).one().otp_code
+    [sent] = brevo_stub.requests
+    assert sent["to"] == [{"email": "asha@test.com"}]
+    assert code in sent["htmlContent"]
+
+    message = test_db.query(NotificationOutbox).one()
+    assert (message.kind, message.status, message.attempts) == ("otp_email", outbox.SENT, 1)
+    assert message.payload == {}
+
+
+def test_rolled_back_messages_are_never_sent(test_db, brevo_stub):
+    outbox.enqueue(test_db, "otp_email", "asha@test.com", otp_code="123456")
+    test_db.rollback()
+
+    assert outbox.drain(sessionmaker(bind=test_db.get_bind())) == 0
+    assert brevo_stub.requests == []
+
+
+def test_failures_are_retried_then_dead_lettered(test_db, brevo_stub, monkeypatch):
+    assert [outbox.retry_delay(n).total_seconds() for n in (1, 2, 3)] == [30, 60, 120]
+    monkeypatch.setattr(outbox, "RETRY_BASE_SECONDS", 0)
+    monkeypatch.setattr(outbox, "MAX_ATTEMPTS", 3)
+    factory = sessionmaker(bind=test_db.get_bind())
+
+    brevo_stub.statuses.extend([503, 201])
+    outbox.enqueue(test_db, "otp_email", "asha@test.com", otp_code="111111")
+    test_db.commit()
+    outbox.drain(factory)
+
+    brevo_stub.statuses.extend([500, 500, 500, 500])
+    outbox.enqueue(test_db, "otp_email", "ravi@test.com", otp_code="222222")
+    test_db.commit()
+    outbox.drain(factory)
+
+    recovered, dead = test_db.query(NotificationOutbox).order_by(NotificationOutbox.id).all()
+    assert (recovered.status, recovered.attempts, recovered.last_error) == (outbox.SENT, 2, None)
+    assert (dead.status, dead.attempts) == (outbox.DEAD, 3)
+    assert "500" in dead.last_error
+    assert recovered.payload == dead.payload == {}
+    assert len(brevo_stub.requests) == 5
+
+
+def test_old_sent_and_dead_messages_are_purged(test_db):
+    now = outbox._now()
+    rows = [
+        (outbox.SENT, now - timedelta(days=8), now - timedelta(days=8)),
+        (outbox.SENT, now - timedelta(days=1), now - timedelta(days=1)),
+        (outbox.DEAD, None, now - timedelta(days=31)),
+        (outbox.DEAD, None, now - timedelta(days=2)),
+        (outbox.PENDING, None, now - timedelta(days=40)),
+    ]
+    test_db.add_all(
+        NotificationOutbox(
+            kind="email", recipient=f"user{i}@test.com", payload={}, status=status,
+            sent_at=sent_at, next_attempt_at=next_attempt_at,
+        )
+        for i, (status, sent_at, next_attempt_at) in enumerate(rows)
+    )
+    test_db.commit()
+
+    assert outbox.purge(test_db) == 2
+    kept = test_db.query(NotificationOutbox.recipient).order_by(NotificationOutbox.id).all()
+    assert [r.recipient for r in kept] == ["user1@test.com", "user3@test.com", "user4@test.com"]
+
+
+def status_update(title, status="Resolved", name="Asha"):
+    return {
+        "subject": f"Ticket Update: {status} — JanSetu", "event": "generic",
+        "title": title, "citizen_name": name, "status": status,
+    }
+
+
+def test_status_emails_in_the_window_become_one_digest(test_db, brevo_stub, monkeypatch):
+    monkeypatch.setattr(outbox, "DIGEST_WINDOW_SECONDS", 60)
+    factory = sessionmaker(bind=test_db.get_bind())
+    outbox.enqueue_many(test_db, "status_email", [
+        ("asha@test.com", status_update("Pothole")),
+        ("ravi@test.com", status_update("Streetlight", "In Progress", "Ravi")),
+        ("asha@test.com", status_update("Drain")),
+    ])
+    test_db.commit()
+    assert outbox.drain(factory) == 0
+
+    later = outbox._now() + timedelta(seconds=61)
+    monkeypatch.setattr(outbox, "_now", lambda: later)
+    outbox.enqueue(test_db, "status_email", "asha@test.com", **status_update("Garbage", "Closed"))
+    test_db.commit()
+    assert outbox.drain(factory) == 4
+
+    # One provider call: Asha's updates as one digest (including the one still in its window)
+    # plus Ravi's single email
+    [call] = brevo_stub.requests
+    versions = {v["to"][0]["email"]: v for v in call["messageVersions"]}
+    assert versions["asha@test.com"]["subject"] == "🔔 3 Complaint Updates — JanSetu"
+    assert "<strong>'Drain'</strong> is now <strong>Resolved</strong>." in versions["asha@test.com"]["htmlContent"]
+    assert "<strong>'Garbage'</strong> is now <strong>Closed</strong>." in versions["asha@test.com"]["htmlContent"]
+    assert versions["ravi@test.com"]["subject"] == "Ticket Update: In Progress — JanSetu"
+    assert {m.status for m in test_db.query(NotificationOutbox)} == {outbox.SENT}
+
+
+def test_emails_are_batched_per_provider_call(test_db, brevo_stub, monkeypatch):
+    monkeypatch.setattr(outbox, "BATCH_SIZE", 2)
+    outbox.enqueue_many(test_db, "email", [
+        (f"user{i}@test.com", {"subject": "Ticket Re-escalated", "message": f"Ticket {i}"}) for i in range(5)
+    ])
+    test_db.commit()
+    outbox.drain(sessionmaker(bind=test_db.get_bind()))
+
+    assert [len(call.get("messageVersions", [])) for call in brevo_stub.requests] == [2, 2, 0]
+    assert brevo_stub.requests[-1]["to"] == [{"email": "user4@test.com", "name": "Citizen"}]
+    assert {m.status for m in test_db.query(NotificationOutbox)} == {outbox.SENT}
+
+
+def test_worker_pool_drains_on_commit(tmp_path, brevo_stub):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'outbox.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+
+    # A long poll interval: only the commit's wake-up can get these delivered in time
+    outbox.start(factory, workers=3, poll_interval=60)
+    try:
+        db = factory()
+        outbox.enqueue_many(db, "otp_email", [(f"user{i}@test.com", {"otp_code": "123456"}) for i in range(8)])
+        db.commit()
+        db.close()
+
+        deadline = time.monotonic() + 10
+        while len(brevo_stub.requests) < 8 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        outbox.stop()
+
+    db = factory()
+    assert {m.status for m in db.query(NotificationOutbox)} == {outbox.SENT}
+    db.close()
+    assert sorted(r["to"][0]["email"] for r in brevo_stub.requests) == sorted(
+        f"user{i}@test.com" for i in range(8)
+    )
+    engine.dispose()
+
+
+def test_failed_batch_only_retries_the_failing_recipient(test_db, brevo_stub):
+    outbox.enqueue_many(test_db, "email", [
+        (f"user{i}@test.com", {"subject": "Ticket Re-escalated", "message": f"Ticket {i}"}) for i in range(3)
+    ])
+    test_db.commit()
+    # The batch call is rejected, then each recipient is sent alone: user1 is still refused
+    brevo_stub.statuses.extend([400, 201, 400, 201])
+    outbox.drain(sessionmaker(bind=test_db.get_bind()))
+
+    assert [len(call.get("messageVersions", [])) for call in brevo_stub.requests] == [3, 0, 0, 0]
+    rows = {m.recipient: m for m in test_db.query(NotificationOutbox)}
+    assert {r: m.status for r, m in rows.items()} == {
+        "user0@test.com": outbox.SENT, "user1@test.com": outbox.PENDING, "user2@test.com": outbox.SENT,
+    }
+    assert "400" in rows["user1@test.com"].last_error
+    assert rows["user1@test.com"].payload["message"] == "Ticket 1"
@@ -0,0 +1,80 @@
+from models import Complaint
+
+
+def seed(db, citizen, count, ward="560001"):
+    for i in range(count):
+        db.add(
+            Complaint(
+                title=f"Streetlight {i}",
+                description="Streetlight not working on the main road.",
+                ward=ward,
+                incident_ward=ward,
+                citizen_id=citizen.id,
+            )
+        )
+    db.commit()
+
+
+def walk_pages(client, url, headers):
+    seen, cursor, pages = [], None, 0
+    while True:
+        page_url = f"{url}&cursor={cursor}" if cursor else url
+        resp = client.get(page_url, headers=headers)
+        assert resp.status_code == 200
+        seen.extend(c["id"] for c in resp.json())
+        pages += 1
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            return seen, pages
+
+
+def test_cursor_pagination_walks_every_row_once(client, test_db, make_user, auth_headers):
+    citizen = make_user("pager@test.com")
+    seed(test_db, citizen, 7)
+    headers = auth_headers("pager@test.com")
+
+    seen, pages = walk_pages(client, "/api/complaints?limit=3", headers)
+    assert pages == 3
+    assert len(seen) == 7
+    assert seen == sorted(seen, reverse=True)
+
+    community, _ = walk_pages(client, "/api/complaints/community?ward=560001&limit=2", headers)
+    assert community == seen
+
+
+def test_offset_pagination_still_supported(client, test_db, make_user, auth_headers):
+    citizen = make_user("pager@test.com")
+    seed(test_db, citizen, 5)
+    headers = auth_headers("pager@test.com")
+
+    first = client.get("/api/complaints?limit=2&offset=0", headers=headers).json()
+    second = client.get("/api/complaints?limit=2&offset=2", headers=headers).json()
+    assert [c["id"] for c in first + second] == [5, 4, 3, 2]
+
+
+def test_invalid_cursor_rejected(client, test_db, make_user, auth_headers):
+    make_user("pager@test.com")
+    headers = auth_headers("pager@test.com")
+    resp = client.get("/api/complaints?cursor=not-a-cursor", headers=headers)
+    assert resp.status_code == 400
+
+
+def test_community_feed_matches_normalized_incident_ward(client, test_db, make_user, auth_headers):
+    citizen = make_user("pager@test.com")
+    test_db.add(
+        Complaint(
+            title="Open drain",
+            description="Drain cover missing near the school.",
+            ward="560002",
+            incident_ward=" 560 001",
+            citizen_id=citizen.id,
+        )
+    )
+    test_db.commit()
+    headers = auth_headers("pager@test.com")
+
+    feed = client.get("/api/complaints/community?ward=560001", headers=headers).json()
+    assert [c["title"] for c in feed] == ["Open drain"]
+
+    stored = test_db.query(Complaint).one()
+    assert stored.effective_ward_key == "560001"
@@ -0,0 +1,118 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import security
+from security import create_access_token, hash_password, password_hashing_stats, verify_password
+
+
+@pytest.fixture
+def small_pool(monkeypatch):
+    """One bcrypt worker and one queue slot, with a way to hold both."""
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bcrypt")
+    monkeypatch.setattr(security, "_hash_pool", pool)
+    monkeypatch.setattr(security, "_hash_slots", threading.BoundedSemaphore(2))
+    release = threading.Event()
+    holders = [
+        threading.Thread(target=security._run_hashing, args=(release.wait,)) for _ in range(2)
+    ]
+    yield holders, release
+    release.set()
+    for holder in holders:
+        holder.join()
+    pool.shutdown()
+
+
+def test_hashing_runs_on_the_bcrypt_pool(monkeypatch):
+    threads = []
+    real_checkpw = security._checkpw
+    monkeypatch.setattr(
+        security, "_checkpw",
+        lambda *args: threads.append(threading.current_thread().name) or real_checkpw(*args),
+    )
+    before = password_hashing_stats()["completed"]
+
+    hashed = hash_password("password123")
+    assert verify_password("password123", hashed)
+    assert not verify_password("wrong-password", hashed)
+
+    assert len(threads) == 2 and all(name.startswith("bcrypt") for name in threads)
+    assert password_hashing_stats()["completed"] == before + 3
+
+
+def test_full_queue_rejects_logins_without_blocking_reads(client, make_user, small_pool):
+    citizen = make_user("asha@test.com")
+    holders, release = small_pool
+    for holder in holders:
+        holder.start()
+    deadline = time.monotonic() + 5
+    while password_hashing_stats()["running"] + password_hashing_stats()["queued"] < 2:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    rejected = password_hashing_stats()["rejected"]
+
+    started = time.perf_counter()
+    resp = client.post("/api/auth/login", json={"email": "asha@test.com", "password": "password123"})
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+    assert time.perf_counter() - started < 1
+
+    # Requests that need no hashing are unaffected
+    token = create_access_token(citizen.id, citizen.role)
+    assert client.get("/api/complaints/", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+
+    stats = client.get("/api/health").json()["password_hashing"]
+    assert stats["running"] == 1 and stats["queued"] == 1
+    assert stats["rejected"] == rejected + 1
+
+    release.set()
+    for holder in holders:
+        holder.join()
+    assert client.post(
+        "/api/auth/login", json={"email": "asha@test.com", "password": "password123"}
+    ).status_code == 200
+
+
+def test_waiting_logins_hold_no_request_thread(client, make_user, monkeypatch):
+    from anyio import to_thread
+
+    citizen = make_user("asha@test.com")
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bcrypt")
+    monkeypatch.setattr(security, "_hash_pool", pool)
+    release = threading.Event()
+    pool.submit(release.wait)
+    # A single request thread: a login blocked on bcrypt would leave none for anyone else
+    limiter = client.portal.call(to_thread.current_default_thread_limiter)
+    tokens = limiter.total_tokens
+    client.portal.call(setattr, limiter, "total_tokens", 1)
+    results = {}
+
+    def request(name, *args, **kwargs):
+        results[name] = client.request(*args, **kwargs).status_code
+
+    login = threading.Thread(target=request, args=("login", "POST", "/api/auth/login"), kwargs={
+        "json": {"email": "asha@test.com", "password": "password123"},
+    })
+    try:
+        login.start()
+        deadline = time.monotonic() + 5
+        while password_hashing_stats()["queued"] < 1:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+        token = create_access_token(citizen.id, citizen.role)
+        read = threading.Thread(target=request, args=("read", "GET", "/api/complaints/"), kwargs={
+            "headers": {"Authorization": f"Bearer {token}"},
+        })
+        read.start()
+        read.join(5)
+        assert results.get("read") == 200
+        assert "login" not in results
+    finally:
+        release.set()
+        login.join()
+        client.portal.call(setattr, limiter, "total_tokens", tokens)
+        pool.shutdown()
+    assert results["login"] == 200
@@ -0,0 +1,93 @@
+import logging
+
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+
+from logging_config import PREVIEW_LOGGER
+from models import Complaint, ComplaintActivity, ComplaintUpdate
+
+
+def seed_complaint(db, citizen, activities=0, updates=0, **fields):
+    complaint = Complaint(
+        title="Broken footpath",
+        description="Tiles uprooted along the footpath.",
+        ward="560001",
+        citizen_id=citizen.id,
+        **fields,
+    )
+    db.add(complaint)
+    db.flush()
+    for i in range(activities):
+        db.add(ComplaintActivity(complaint_id=complaint.id, action=f"Step {i}"))
+    for i in range(updates):
+        db.add(ComplaintUpdate(complaint_id=complaint.id, note=f"Update {i}"))
+    db.commit()
+    db.refresh(complaint)
+    return complaint
+
+
+def test_lazy_relationships_raise_in_strict_mode(test_db, make_user):
+    citizen = make_user("asha@test.com", "citizen", "560001")
+    complaint = seed_complaint(test_db, citizen, activities=1)
+    test_db.expire_all()
+
+    loaded = test_db.query(Complaint).filter(Complaint.id == complaint.id).one()
+    with pytest.raises(InvalidRequestError):
+        loaded.activities
+
+
+def test_detail_query_count_is_independent_of_timeline_size(client, test_db, make_user, auth_headers):
+    citizen = make_user("asha@test.com", "citizen", "560001")
+    small = seed_complaint(test_db, citizen, activities=1, updates=1)
+    large = seed_complaint(test_db, citizen, activities=25, updates=10)
+    headers = auth_headers("asha@test.com")
+    # Cache the caller first so both requests skip the user lookup
+    client.get("/api/auth/me", headers=headers)
+
+    small_resp = client.get(f"/api/complaints/{small.id}", headers=headers)
+    large_resp = client.get(f"/api/complaints/{large.id}", headers=headers)
+    assert large_resp.status_code == 200
+    assert len(large_resp.json()["activities"]) == 25
+    assert small_resp.headers["X-Query-Count"] == large_resp.headers["X-Query-Count"]
+
+
+def test_status_update_fans_out_after_commit(client, test_db, make_user, auth_headers, caplog):
+    caplog.set_level(logging.INFO, logger=PREVIEW_LOGGER)
+    make_user("root@test.com", "sudo", ward=None)
+    headers = auth_headers("root@test.com")
+    # Cache the caller first so both requests skip the user lookup
+    client.get("/api/auth/me", headers=headers)
+    counts = []
+    for n, merged in enumerate((1, 6)):
+        citizen = make_user(f"asha{n}@test.com", "citizen", "560001")
+        primary = seed_complaint(test_db, citizen)
+        for i in range(merged):
+            dup_reporter = make_user(f"dup{n}-{i}@test.com", "citizen", "560001")
+            seed_complaint(test_db, dup_reporter, is_merged=True, merged_into_id=primary.id)
+
+        resp = client.patch(
+            f"/api/complaints/{primary.id}/status", json={"status": "Resolved"}, headers=headers
+        )
+        assert resp.status_code == 200
+        counts.append(resp.headers["X-Query-Count"])
+        # Primary reporter plus every merged duplicate's reporter
+        assert caplog.text.count("Subject : ✅ Complaint Resolved") == merged + 1
+        caplog.clear()
+
+    assert counts[0] == counts[1]
+
+
+def test_status_update_eager_loads_reporters(client, test_db, make_user, auth_headers):
+    citizen = make_user("asha@test.com", "citizen", "560001")
+    make_user("root@test.com", "sudo", ward=None)
+    primary = seed_complaint(test_db, citizen)
+    for _ in range(3):
+        seed_complaint(test_db, citizen, is_merged=True, merged_into_id=primary.id)
+
+    resp = client.patch(
+        f"/api/complaints/{primary.id}/status",
+        json={"status": "In Progress"},
+        headers=auth_headers("root@test.com"),
+    )
+    assert resp.status_code == 200
+    assert resp.json()["status"] == "In Progress"
@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from models import Complaint
+from services import search
+
+
+def report(client, headers, title, description, ward):
+    resp = client.post(
+        "/api/complaints",
+        json={
+            "title": title,
+            "description": description,
+            "ward": ward,
+            "latitude": 12.97,
+            "longitude": 77.59,
+        },
+        headers=headers,
+    )
+    assert resp.status_code == 201
+    return resp.json()
+
+
+def test_search_is_ranked_and_scoped(client, make_user, auth_headers):
+    make_user("asha@test.com", "citizen", "560001")
+    make_user("vikram@test.com", "citizen", "560002")
+    asha = auth_headers("asha@test.com")
+    vikram = auth_headers("vikram@test.com")
+
+    report(client, asha, "Deep pothole near bus stop", "Two wheelers are skidding every evening.", "560001")
+    report(client, asha, "Streetlight flickering", "The pothole next to it is invisible at night.", "560001")
+    report(client, vikram, "Pothole on ring road", "Large crater on the service lane.", "560002")
+
+    resp = client.get("/api/complaints/search?q=pothole", headers=asha)
+    assert resp.status_code == 200
+    hits = resp.json()
+    # Title matches rank above description-only matches; other wards are out of scope
+    assert [h["title"] for h in hits] == ["Deep pothole near bus stop", "Streetlight flickering"]
+    assert "<b>" in hits[1]["snippet"].lower()
+
+    assert client.get("/api/complaints/search?q=crater", headers=asha).json() == []
+
+
+def test_search_index_follows_admin_update(client, make_user, auth_headers):
+    make_user("asha@test.com", "citizen", "560001")
+    make_user("root@test.com", "sudo", ward=None)
+    complaint = report(
+        client, auth_headers("asha@test.com"), "Overflowing drain", "Sewage water on the street.", "560001"
+    )
+    root = auth_headers("root@test.com")
+
+    resp = client.patch(
+        f"/api/complaints/{complaint['id']}",
+        json={"description": "Manhole cover stolen, open pit on footpath."},
+        headers=root,
+    )
+    assert resp.status_code == 200
+
+    assert [h["id"] for h in client.get("/api/complaints/search?q=manhole", headers=root).json()] == [complaint["id"]]
+    assert client.get("/api/complaints/search?q=sewage", headers=root).json() == []
+
+
+def test_postgres_index_binds_unflushed_edits():
+    # The session does not autoflush, so the vector must not be built from the stored row
+    executed = []
+    session = SimpleNamespace(
+        get_bind=lambda: SimpleNamespace(dialect=postgresql.dialect()),
+        execute=lambda statement, *args: executed.append(statement),
+    )
+    complaint = Complaint(id=7, title="Overflowing drain", description="Sewage water on the street.")
+    complaint.title = "Manhole cover stolen"
+
+    search.index_complaint(session, complaint)
+    [statement] = executed
+    compiled = statement.compile(dialect=postgresql.dialect())
+    assert "Manhole cover stolen" in compiled.params.values()
+    assert "coalesce(complaints.title" not in str(compiled)
+
+
+def test_snippets_escape_user_markup(client, make_user, auth_headers):
+    make_user("asha@test.com", "citizen", "560001")
+    asha = auth_headers("asha@test.com")
+    report(
+        client, asha, "Broken bench",
+        'Garbage <img src=x onerror="alert(1)"> dumped beside the bench.', "560001",
+    )
+
+    [hit] = client.get("/api/complaints/search?q=garbage", headers=asha).json()
+    assert "<img" not in hit["snippet"]
+    assert "&lt;img src=x onerror=&quot;alert(1)&quot;&gt;" in hit["snippet"]
+    assert "<b>Garbage</b>" in hit["snippet"]
@@ -0,0 +1,144 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from models import Complaint, ComplaintActivity, ComplaintUpvote, User
+from services import upvote_buffer, user_cache
+
+
+def add_complaint(db, citizen, **fields):
+    complaint = Complaint(
+        title="Fire hazard from open wires",
+        description="Live wires hanging near the market.",
+        ward="560001",
+        citizen_id=citizen.id,
+        **fields,
+    )
+    db.add(complaint)
+    db.commit()
+    db.refresh(complaint)
+    return complaint
+
+
+def test_upvote_increments_counters_once(client, test_db, make_user, auth_headers):
+    reporter = make_user("asha@test.com")
+    make_user("ravi@test.com")
+    complaint = add_complaint(test_db, reporter)
+    headers = auth_headers("ravi@test.com")
+    url = f"/api/complaints/{complaint.id}/upvote"
+
+    assert client.post(url, headers=headers).status_code == 200
+    again = client.post(url, headers=headers)
+    assert again.status_code == 400
+    assert again.json()["detail"] == "You have already upvoted this complaint."
+
+    test_db.expire_all()
+    complaint = test_db.get(Complaint, complaint.id)
+    assert complaint.upvotes == 1
+    assert test_db.get(User, reporter.id).points == 5
+    assert test_db.query(ComplaintUpvote).count() == 1
+    # Baseline was computed once (keyword "fire") and stored for later votes
+    assert complaint.ai_baseline_priority == 5
+
+
+def test_upvote_escalates_from_stored_baseline(client, test_db, make_user, auth_headers, monkeypatch):
+    reporter = make_user("asha@test.com")
+    make_user("ravi@test.com")
+    complaint = add_complaint(test_db, reporter, ai_baseline_priority=2, upvotes=9, reports_count=1)
+
+    def fail(*args):
+        raise AssertionError("priority keywords should not be re-scanned")
+
+    monkeypatch.setattr("routes.complaints.predict_priority", fail)
+    resp = client.post(f"/api/complaints/{complaint.id}/upvote", headers=auth_headers("ravi@test.com"))
+    assert resp.status_code == 200
+
+    test_db.expire_all()
+    complaint = test_db.get(Complaint, complaint.id)
+    assert complaint.upvotes == 10
+    assert complaint.priority == 3
+    assert complaint.priority_label == "Urgent"
+
+
+def test_duplicate_vote_rows_are_rejected_by_the_database(test_db, make_user):
+    reporter = make_user("asha@test.com")
+    complaint = add_complaint(test_db, reporter)
+    test_db.add_all([
+        ComplaintUpvote(complaint_id=complaint.id, user_id=reporter.id),
+        ComplaintUpvote(complaint_id=complaint.id, user_id=reporter.id),
+    ])
+    with pytest.raises(IntegrityError):
+        test_db.commit()
+    test_db.rollback()
+
+
+def add_earlier_votes(db, complaint, count):
+    """Vote rows behind a seeded counter, from voters who never log in."""
+    voters = [
+        User(full_name=f"Past Voter {i}", email=f"past{i}-{complaint.id}@test.com", password_hash="-", role="citizen")
+        for i in range(count)
+    ]
+    db.add_all(voters)
+    db.flush()
+    db.add_all(ComplaintUpvote(complaint_id=complaint.id, user_id=voter.id) for voter in voters)
+    db.commit()
+
+
+@pytest.fixture
+def buffered_upvotes(test_db):
+    # Long interval: the test drives flushes explicitly
+    upvote_buffer.start(sessionmaker(bind=test_db.get_bind()), interval=3600)
+    yield upvote_buffer
+    upvote_buffer.stop()
+
+
+def test_buffered_upvotes_are_visible_before_flush(client, test_db, make_user, auth_headers, buffered_upvotes):
+    reporter = make_user("asha@test.com")
+    voters = [make_user(f"voter{i}@test.com") for i in range(3)]
+    complaint = add_complaint(test_db, reporter, ai_baseline_priority=1, upvotes=8, reports_count=1)
+    add_earlier_votes(test_db, complaint, 8)
+
+    for voter in voters:
+        resp = client.post(
+            f"/api/complaints/{complaint.id}/upvote", headers=auth_headers(voter.email)
+        )
+        assert resp.status_code == 200
+
+    # Votes and timeline entries are durable, the counter row has not been touched yet
+    test_db.expire_all()
+    assert test_db.get(Complaint, complaint.id).upvotes == 8
+    assert test_db.query(ComplaintUpvote).count() == 11
+    assert test_db.query(ComplaintActivity).count() == 3
+
+    headers = auth_headers("asha@test.com")
+    assert client.get(f"/api/complaints/{complaint.id}", headers=headers).json()["upvotes"] == 11
+    feed = client.get("/api/complaints/community?ward=560001", headers=headers).json()
+    assert feed[0]["upvotes"] == 11
+    assert user_cache.get(reporter.id) is not None
+
+    assert buffered_upvotes.flush() == 1
+    assert user_cache.get(reporter.id) is None
+    test_db.expire_all()
+    stored = test_db.get(Complaint, complaint.id)
+    assert (stored.upvotes, stored.priority, stored.priority_label) == (11, 2, "High")
+    assert test_db.get(User, reporter.id).points == 15
+    assert buffered_upvotes.pending(complaint.id) == 0
+    assert client.get(f"/api/complaints/{complaint.id}", headers=headers).json()["upvotes"] == 11
+
+
+def test_flush_recounts_votes_lost_with_the_buffer(client, test_db, make_user, auth_headers, buffered_upvotes):
+    reporter = make_user("asha@test.com")
+    voters = [make_user(f"voter{i}@test.com") for i in range(2)]
+    complaint = add_complaint(test_db, reporter, ai_baseline_priority=1, upvotes=0, reports_count=1)
+
+    for voter in voters:
+        headers = auth_headers(voter.email)
+        assert client.post(f"/api/complaints/{complaint.id}/upvote", headers=headers).status_code == 200
+        if voter is voters[0]:
+            # The process dies before flushing: the first vote's delta is gone
+            buffered_upvotes._pending.clear()
+
+    assert buffered_upvotes.flush() == 1
+    test_db.expire_all()
+    assert test_db.get(Complaint, complaint.id).upvotes == 2
+    assert test_db.get(User, reporter.id).points == 10
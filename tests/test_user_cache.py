@@ -0,0 +1,119 @@
+import time
+
+from sqlalchemy import update
+
+from models import Complaint, User
+from services import user_cache
+
+
+def test_cached_user_skips_the_lookup(client, make_user, auth_headers):
+    make_user("asha@test.com")
+    headers = auth_headers("asha@test.com")
+
+    first = client.get("/api/complaints/", headers=headers)
+    second = client.get("/api/complaints/", headers=headers)
+    assert first.status_code == second.status_code == 200
+    assert int(second.headers["X-Query-Count"]) == int(first.headers["X-Query-Count"]) - 1
+
+
+def test_committed_changes_invalidate_the_user(client, test_db, make_user, auth_headers):
+    asha = make_user("asha@test.com")
+    headers = auth_headers("asha@test.com")
+    assert client.get("/api/complaints/", headers=headers).status_code == 200
+    assert user_cache.get(asha.id) is not None
+
+    asha.is_active = False
+    test_db.rollback()
+    assert user_cache.get(asha.id) is not None
+
+    asha.is_active = False
+    test_db.commit()
+    assert user_cache.get(asha.id) is None
+    resp = client.get("/api/complaints/", headers=headers)
+    assert resp.status_code == 403
+    assert resp.json()["detail"] == "User is disabled"
+
+
+def test_deleting_an_officer_revokes_cached_access(client, make_user, auth_headers):
+    make_user("root@test.com", role="sudo", ward=None)
+    officer = make_user("officer@test.com", role="officer", department="Water Supply")
+    officer_headers = auth_headers("officer@test.com")
+    assert client.get("/api/complaints/", headers=officer_headers).status_code == 200
+
+    resp = client.delete(f"/api/admin/delete-officer/{officer.id}", headers=auth_headers("root@test.com"))
+    assert resp.status_code == 200
+    resp = client.get("/api/complaints/", headers=officer_headers)
+    assert resp.status_code == 401
+    assert resp.json()["detail"] == "User not found"
+
+
+def test_me_reads_points_from_the_database(client, test_db, make_user, auth_headers):
+    asha = make_user("asha@test.com")
+    headers = auth_headers("asha@test.com")
+    assert client.get("/api/auth/me", headers=headers).json()["points"] == 0
+
+    # Set-based, like upvote credits: bypasses the invalidation listener
+    test_db.execute(update(User).where(User.id == asha.id).values(points=15))
+    test_db.commit()
+    assert client.get("/api/auth/me", headers=headers).json()["points"] == 15
+
+
+def test_upvote_credit_invalidates_the_reporter(client, test_db, make_user, auth_headers):
+    asha = make_user("asha@test.com")
+    make_user("ravi@test.com")
+    complaint = Complaint(title="Open drain", description="Uncovered drain.", ward="560001", citizen_id=asha.id)
+    test_db.add(complaint)
+    test_db.commit()
+    assert client.get("/api/complaints/", headers=auth_headers("asha@test.com")).status_code == 200
+    assert user_cache.get(asha.id) is not None
+
+    resp = client.post(f"/api/complaints/{complaint.id}/upvote", headers=auth_headers("ravi@test.com"))
+    assert resp.status_code == 200
+    assert user_cache.get(asha.id) is None
+
+
+def test_suspension_revokes_a_cached_officer(client, make_user, auth_headers):
+    make_user("root@test.com", role="sudo", ward=None)
+    officer = make_user("officer@test.com", role="officer", department="Water Supply")
+    officer_headers = auth_headers("officer@test.com")
+    root_headers = auth_headers("root@test.com")
+
+    # Officers are served from the cache like everyone else
+    first = client.get("/api/complaints/", headers=officer_headers)
+    second = client.get("/api/complaints/", headers=officer_headers)
+    assert first.status_code == second.status_code == 200
+    assert int(second.headers["X-Query-Count"]) == int(first.headers["X-Query-Count"]) - 1
+
+    resp = client.post(f"/api/admin/suspend-officer/{officer.id}", headers=root_headers)
+    assert resp.status_code == 200
+    assert user_cache.get(officer.id) is None
+    resp = client.get("/api/complaints/", headers=officer_headers)
+    assert resp.status_code == 403
+    assert resp.json()["detail"] == "your account has been suspended"
+
+    resp = client.post(f"/api/admin/unsuspend-officer/{officer.id}", headers=root_headers)
+    assert resp.status_code == 200
+    assert client.get("/api/complaints/", headers=officer_headers).status_code == 200
+
+
+def test_entries_expire_and_stale_reads_are_dropped(make_user, monkeypatch):
+    asha = make_user("asha@test.com")
+    ravi = make_user("ravi@test.com")
+
+    read_generation = user_cache.generation()
+    user_cache.invalidate(ravi.id)
+    user_cache.put(asha, read_generation)
+    assert user_cache.get(asha.id) is None
+
+    monkeypatch.setattr(user_cache, "MAX_ENTRIES", 1)
+    user_cache.put(asha, user_cache.generation())
+    user_cache.put(ravi, user_cache.generation())
+    assert user_cache.get(asha.id) is None
+    cached = user_cache.get(ravi.id)
+    assert (cached.id, cached.email, cached.role) == (ravi.id, "ravi@test.com", "citizen")
+
+    monkeypatch.setattr(user_cache, "TTL_SECONDS", 0.05)
+    user_cache.put(ravi, user_cache.generation())
+    assert user_cache.get(ravi.id) is not None
+    time.sleep(0.06)
+    assert user_cache.get(ravi.id) is None